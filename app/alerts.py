@@ -0,0 +1,152 @@
+"""Event-driven price alert engine shared by every session."""
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict, deque
+
+
+def _threshold(entry):
+    return entry[0]
+
+
+class AlertEngine:
+    """Index price alert thresholds by symbol and fire them when a price update crosses them.
+
+    Each symbol keeps two sorted lists of ``(threshold, user_id)``: one for
+    alerts that fire when the price rises to the threshold and one for
+    alerts that fire when it falls to it. A price update only touches the
+    slice between the previous and the new price, so finding the crossed
+    thresholds costs O(log n + k).
+    """
+
+    def __init__(self, queue_size=50):
+        self._above = defaultdict(list)
+        self._below = defaultdict(list)
+        self._user_alerts = defaultdict(dict)  # user_id -> {(symbol, direction): threshold}
+        self._last_price = {}
+        self._queues = defaultdict(lambda: deque(maxlen=queue_size))
+        self._lock = threading.Lock()
+
+    # ----------------------------
+    # Registration
+    # ----------------------------
+    def add_alert(self, user_id, symbol, threshold, direction="above"):
+        """Register (or move) a user's alert for a symbol."""
+        threshold = float(threshold)
+        with self._lock:
+            key = (symbol, direction)
+            previous = self._user_alerts[user_id].get(key)
+            if previous == threshold:
+                return
+            if previous is not None:
+                self._remove(user_id, symbol, previous, direction)
+            self._user_alerts[user_id][key] = threshold
+            insort(self._index(direction)[symbol], (threshold, user_id))
+
+            # Fire straight away if the last known price already satisfies the alert
+            last = self._last_price.get(symbol)
+            if last is not None and self._satisfied(last, threshold, direction):
+                self._deliver(user_id, symbol, threshold, direction, last)
+
+    def remove_alert(self, user_id, symbol, direction="above"):
+        """Drop a user's alert for a symbol, if any."""
+        with self._lock:
+            threshold = self._user_alerts[user_id].pop((symbol, direction), None)
+            if threshold is not None:
+                self._remove(user_id, symbol, threshold, direction)
+
+    def sync_user(self, user, owner=None):
+        """Mirror ``user['settings']['price_alerts']`` ({symbol: threshold}) into the index.
+
+        ``owner`` keys the alerts and their event queue (the user id by
+        default); pass a per-session key when the same user ids exist in
+        several sessions.
+        """
+        wanted = user.get("settings", {}).get("price_alerts", {}) or {}
+        user_id = user["user_id"] if owner is None else owner
+        current = {symbol for symbol, direction in self._user_alerts.get(user_id, {}) if direction == "above"}
+        for symbol in current - set(wanted):
+            self.remove_alert(user_id, symbol)
+        for symbol, threshold in wanted.items():
+            self.add_alert(user_id, symbol, threshold)
+
+    def forget(self, user_id):
+        """Drop every alert and pending event for a user (or session owner)."""
+        with self._lock:
+            for (symbol, direction), threshold in self._user_alerts.pop(user_id, {}).items():
+                self._remove(user_id, symbol, threshold, direction)
+            self._queues.pop(user_id, None)
+
+    def symbols(self):
+        """Symbols with at least one registered alert."""
+        with self._lock:
+            return {s for s, entries in self._above.items() if entries} | {s for s, entries in self._below.items() if entries}
+
+    # ----------------------------
+    # Price updates
+    # ----------------------------
+    def on_price(self, symbol, price):
+        """Feed a new price; returns the list of ``(user_id, threshold, direction)`` fired."""
+        price = float(price)
+        fired = []
+        with self._lock:
+            last = self._last_price.get(symbol)
+            self._last_price[symbol] = price
+
+            above = self._above.get(symbol, [])
+            below = self._below.get(symbol, [])
+            if last is None:
+                # First observation: every alert already satisfied fires once
+                hit_above = above[:bisect_right(above, price, key=_threshold)]
+                hit_below = below[bisect_left(below, price, key=_threshold):]
+            else:
+                hit_above = above[bisect_right(above, last, key=_threshold):bisect_right(above, price, key=_threshold)] if price > last else []
+                hit_below = below[bisect_left(below, price, key=_threshold):bisect_left(below, last, key=_threshold)] if price < last else []
+
+            for threshold, user_id in hit_above:
+                self._deliver(user_id, symbol, threshold, "above", price)
+                fired.append((user_id, threshold, "above"))
+            for threshold, user_id in hit_below:
+                self._deliver(user_id, symbol, threshold, "below", price)
+                fired.append((user_id, threshold, "below"))
+        return fired
+
+    def drain(self, user_id):
+        """Pop every pending alert event for a user."""
+        with self._lock:
+            queue = self._queues.get(user_id)
+            if not queue:
+                return []
+            events = list(queue)
+            queue.clear()
+            return events
+
+    # ----------------------------
+    # Internals (call with the lock held)
+    # ----------------------------
+    def _index(self, direction):
+        if direction == "above":
+            return self._above
+        if direction == "below":
+            return self._below
+        raise ValueError(f"Unknown alert direction: {direction}")
+
+    @staticmethod
+    def _satisfied(price, threshold, direction):
+        return price >= threshold if direction == "above" else price <= threshold
+
+    def _remove(self, user_id, symbol, threshold, direction):
+        entries = self._index(direction)[symbol]
+        i = bisect_left(entries, (threshold, user_id))
+        if i < len(entries) and entries[i] == (threshold, user_id):
+            del entries[i]
+
+    def _deliver(self, user_id, symbol, threshold, direction, price):
+        self._queues[user_id].append({
+            "symbol": symbol,
+            "threshold": threshold,
+            "direction": direction,
+            "price": price,
+        })
+
+
+alert_engine = AlertEngine()
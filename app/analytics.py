@@ -1,4 +1,4 @@
-from app.banking import TRANSACTIONS
+import streamlit as st
 from app.market_data import get_cached_data
 
 def track_event(event_name, metadata=None):
@@ -6,8 +6,8 @@ def track_event(event_name, metadata=None):
     return {"event": event_name, "metadata": metadata or {}}
 
 def user_activity_summary(user_id):
-    """Summarize a user's transactions."""
-    txs = [t for t in TRANSACTIONS if t["sender_id"] == user_id or t["recipient_id"] == user_id]
+    """Summarize a user's transactions from the session ledger ``app.banking`` writes to."""
+    txs = [t for t in st.session_state.transactions if t["sender_id"] == user_id or t["recipient_id"] == user_id]
     total_sent = sum(t["amount"] for t in txs if t["sender_id"] == user_id)
     total_received = sum(t["amount"] for t in txs if t["recipient_id"] == user_id)
     return {
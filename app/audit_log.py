@@ -0,0 +1,246 @@
+"""Append-only security/audit log with a background segment writer."""
+import atexit
+import json
+import os
+import queue
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+from app.metrics import record_error
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class AuditLog:
+    """Non-blocking audit log that batches entries into rotating JSON-lines segments.
+
+    ``append``/``log`` only enqueue, so callers on the transaction path never
+    wait on disk. A daemon thread drains the queue in batches, writes them to
+    ``audit-NNNNNN.jsonl`` segments under ``directory`` and keeps an in-memory
+    index of ``(segment, byte offset)`` by transaction id and by event type,
+    so lookups read only the matching lines.
+    """
+
+    def __init__(self, directory, batch_size=100, flush_interval=1.0,
+                 segment_max_entries=10_000, max_segments=20, queue_size=10_000):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_max_entries = segment_max_entries
+        self.max_segments = max_segments
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._by_transaction = defaultdict(list)
+        self._by_event = defaultdict(list)
+        self._count = 0
+        self._segment = 0
+        self._segment_entries = 0
+        self._file = None
+        self._index_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    # ----------------------------
+    # Producer side
+    # ----------------------------
+    def append(self, entry):
+        """Enqueue an entry dict; returns False (and counts a drop) if the queue is full.
+
+        Entries whose batch fails to write are counted in ``dropped`` too.
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(dict(entry))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def log(self, event, transaction_id=None, details="", **fields):
+        """Enqueue a structured security event."""
+        return self.append({
+            "timestamp": datetime.now(),
+            "event": event,
+            "transaction_id": transaction_id,
+            "details": details,
+            **fields,
+        })
+
+    def flush(self, timeout=5.0):
+        """Block until everything enqueued so far is on disk; False if that took longer than ``timeout``."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)  # never hang (e.g. at exit) on a full queue
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self):
+        """Flush pending entries and close the current segment."""
+        self.flush()
+        with self._index_lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def by_transaction(self, transaction_id):
+        """Every written entry for a transaction id, oldest first."""
+        with self._index_lock:
+            locations = list(self._by_transaction.get(transaction_id, ()))
+        return self._read(locations)
+
+    def by_event(self, event, limit=None):
+        """Written entries of one event type, newest first."""
+        with self._index_lock:
+            locations = self._by_event.get(event, [])
+            locations = locations[::-1] if limit is None else locations[:-limit - 1:-1]
+        return self._read(locations)
+
+    def __len__(self):
+        return self._count
+
+    # ----------------------------
+    # Writer thread
+    # ----------------------------
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._rebuild_index()
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            entries = [item for item in batch if not isinstance(item, threading.Event)]
+            if entries:
+                try:
+                    self._write(entries)
+                except Exception as e:  # e.g. disk full; keep the writer alive for later batches
+                    self.dropped += len(entries)
+                    record_error("audit_log.write", e)
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _write(self, entries):
+        with self._index_lock:
+            pending = []
+            for entry in entries:
+                if self._file is None or self._segment_entries >= self.segment_max_entries:
+                    self._commit(pending)
+                    self._rotate()
+                offset = self._file.tell()
+                self._file.write((json.dumps(entry, default=_json_default) + "\n").encode("utf-8"))
+                self._segment_entries += 1
+                pending.append((entry, (self._segment, offset)))
+            self._commit(pending)
+
+    def _commit(self, pending):
+        """Flush the current segment, then index what was written to it."""
+        if not pending:
+            return
+        # Only index what is already flushed, so readers never see a partial line
+        self._file.flush()
+        for entry, location in pending:
+            self._index(entry, location)
+        pending.clear()
+
+    def _rotate(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        self._segment += 1
+        self._segment_entries = 0
+        self._file = open(self._segment_path(self._segment), "ab")
+        expired = self._segment - self.max_segments
+        if expired > 0 and os.path.exists(self._segment_path(expired)):
+            os.remove(self._segment_path(expired))
+            self._purge(expired)
+
+    # ----------------------------
+    # Index helpers (call with the index lock held)
+    # ----------------------------
+    def _index(self, entry, location):
+        if entry.get("transaction_id"):
+            self._by_transaction[entry["transaction_id"]].append(location)
+        self._by_event[entry.get("event")].append(location)
+        self._count += 1
+
+    def _purge(self, segment):
+        for index in (self._by_transaction, self._by_event):
+            for key in list(index):
+                kept = [loc for loc in index[key] if loc[0] != segment]
+                if index is self._by_event:
+                    self._count -= len(index[key]) - len(kept)
+                if kept:
+                    index[key] = kept
+                else:
+                    del index[key]
+
+    def _rebuild_index(self):
+        """Re-index segments left by a previous process and continue after the last one."""
+        segments = sorted(
+            int(name[len("audit-"):-len(".jsonl")])
+            for name in os.listdir(self.directory)
+            if name.startswith("audit-") and name.endswith(".jsonl")
+        )
+        with self._index_lock:
+            for segment in segments:
+                with open(self._segment_path(segment), "rb") as f:
+                    offset = 0
+                    for line in f:
+                        try:
+                            self._index(json.loads(line), (segment, offset))
+                        except ValueError:
+                            pass  # torn line from a crash
+                        offset += len(line)
+                # New writes always start a fresh segment after the last one
+                self._segment = segment
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"audit-{segment:06d}.jsonl")
+
+    def _read(self, locations):
+        entries = []
+        handles = {}
+        try:
+            for segment, offset in locations:
+                if segment not in handles:
+                    try:
+                        handles[segment] = open(self._segment_path(segment), "rb")
+                    except FileNotFoundError:
+                        handles[segment] = None
+                f = handles[segment]
+                if f is None:
+                    continue
+                f.seek(offset)
+                entries.append(json.loads(f.readline()))
+        finally:
+            for f in handles.values():
+                if f:
+                    f.close()
+        return entries
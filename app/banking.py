@@ -1,4 +1,5 @@
 import streamlit as st
+from datetime import datetime
 from app.common import get_user, find_user
 from app.utils import uid, format_money
 
@@ -58,7 +59,7 @@ def send_money(sender_id, recipient_identifier, amount, note=""):
         "fee": 0.0,
         "note": note,
         "status": "completed",
-        "ts": st.datetime.now()
+        "ts": datetime.now()
     }
     st.session_state.transactions.append(transaction)
     
@@ -77,7 +78,7 @@ def request_money(requestor_id, recipient_identifier, amount, note=""):
         "amount": amount,
         "note": note,
         "status": "pending",
-        "ts": st.datetime.now()
+        "ts": datetime.now()
     }
     st.session_state.requests.append(request_data)
     return True, "Money request sent"
@@ -0,0 +1,199 @@
+"""Per-provider circuit breakers, so a provider that is down costs one timeout rather than one per call.
+
+A breaker trips open after ``FAILURE_THRESHOLD`` failures (exceptions,
+5xx/429 responses, or calls slower than ``SLOW_CALL``) within ``WINDOW``
+seconds. While open, ``protected`` provider functions skip the upstream
+entirely and answer with their last live result for the same arguments,
+or with demo data. After ``COOLDOWN`` seconds one caller is let through as
+a half-open trial: success closes the breaker, failure re-opens it.
+Callers that lose that race get ``CircuitOpen`` from ``call``; protected
+functions let it propagate so ``protected`` answers it like an open breaker.
+
+    @timed("coingecko.get_crypto_prices")
+    @protected("coingecko", get_crypto_demo_data)
+    def get_crypto_prices():
+        response = call("coingecko", requests.get, url, timeout=10)
+"""
+import functools
+import threading
+import time
+from collections import deque
+
+from app.metrics import is_demo, registry
+
+FAILURE_THRESHOLD = 3
+WINDOW = 60.0  # seconds of outcomes counted towards tripping
+COOLDOWN = 30.0  # seconds open before a half-open trial
+SLOW_CALL = 5.0  # seconds; slower successful calls count as failures
+STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"{name} circuit open; retrying in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+def failed_response(result):
+    """Server errors and rate limiting count against a provider; other responses (and non-responses) don't."""
+    status = getattr(result, "status_code", None)
+    return status is not None and (status >= 500 or status == 429)
+
+
+class CircuitBreaker:
+    """Closed, open or half-open, from recent failures and latency of one provider."""
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, window=WINDOW, cooldown=COOLDOWN,
+                 slow_call=SLOW_CALL, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.slow_call = slow_call
+        self.clock = clock
+        self.state = "closed"
+        self.failures = deque()  # clock times of recent failures
+        self.opened_at = None
+        self.trial = False  # a half-open call is in flight
+        self.last_latency = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        registry.set("circuit_state", {"provider": name}, STATES["closed"])
+
+    def _move(self, state):
+        self.state = state
+        registry.set("circuit_state", {"provider": self.name}, STATES[state])
+        registry.inc("circuit_transitions_total", {"provider": self.name, "state": state})
+
+    def retry_in(self):
+        if self.state == "closed" or self.opened_at is None:
+            return 0.0
+        return max(self.opened_at + self.cooldown - self.clock(), 0.0)
+
+    def is_open(self):
+        """Whether a call now would be refused (open and cooling down, or a half-open trial already in flight)."""
+        with self._lock:
+            if self.state == "open":
+                return self.clock() - self.opened_at < self.cooldown
+            return self.state == "half_open" and self.trial
+
+    def acquire(self):
+        """Claim permission for one call; moves an open breaker past its cooldown to half-open."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and self.clock() - self.opened_at >= self.cooldown:
+                self._move("half_open")
+            if self.state == "half_open" and not self.trial:
+                self.trial = True
+                return True
+            return False
+
+    def record(self, ok, seconds=None, error=None):
+        """Outcome of a call made after ``acquire()``."""
+        if seconds is not None:
+            self.last_latency = seconds
+            ok = ok and seconds <= self.slow_call
+        now = self.clock()
+        with self._lock:
+            if self.state == "half_open":
+                self.trial = False
+                if ok:
+                    self.failures.clear()
+                    self._move("closed")
+                else:
+                    self.opened_at = now
+                    self._move("open")
+            elif not ok:
+                self.failures.append(now)
+                while self.failures and self.failures[0] <= now - self.window:
+                    self.failures.popleft()
+                if self.state == "closed" and len(self.failures) >= self.failure_threshold:
+                    self.opened_at = now
+                    self._move("open")
+            if not ok:
+                self.last_error = error or (f"slow call ({seconds:.1f}s)" if seconds else "failed response")
+
+    def call(self, fn, *args, **kwargs):
+        """``fn(*args, **kwargs)`` through the breaker; raises ``CircuitOpen`` without calling it while open."""
+        if not self.acquire():
+            raise CircuitOpen(self.name, self.retry_in())
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record(False, time.perf_counter() - start, type(e).__name__)
+            raise
+        self.record(not failed_response(result), time.perf_counter() - start)
+        return result
+
+    def row(self):
+        with self._lock:
+            now = self.clock()
+            recent = sum(1 for t in self.failures if t > now - self.window)
+        return {"provider": self.name, "state": self.state, "recent_failures": recent,
+                "last_latency_ms": self.last_latency * 1000 if self.last_latency is not None else None,
+                "retry_in_s": self.retry_in() if self.state != "closed" else None, "last_error": self.last_error}
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(name):
+    """The shared breaker for ``name``, created on first use."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def call(name, fn, *args, **kwargs):
+    """``fn(*args, **kwargs)`` through ``name``'s breaker (see ``CircuitBreaker.call``)."""
+    return breaker(name).call(fn, *args, **kwargs)
+
+
+def rows():
+    """One row per breaker for the admin page."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return sorted((b.row() for b in breakers), key=lambda r: r["provider"])
+
+
+def protected(name, fallback):
+    """Decorator for a provider function: while ``name``'s breaker is open, return the last live result
+    for the same arguments, else ``fallback(*args, **kwargs)``, without calling the provider.
+
+    The same answer covers a ``CircuitOpen`` escaping ``fn``: the breaker looked
+    closed on entry but was half-open with another caller's trial in flight.
+    """
+    def decorate(fn):
+        last_live = {}
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                key = None
+
+            def short_circuit():
+                registry.inc("circuit_short_circuits_total", {"provider": name})
+                stale = last_live.get(key)
+                return stale if stale is not None else fallback(*args, **kwargs)
+
+            if breaker(name).is_open():
+                return short_circuit()
+            try:
+                result = fn(*args, **kwargs)
+            except CircuitOpen:
+                return short_circuit()
+            if key is not None and not is_demo(result):
+                last_live[key] = result
+            return result
+        return wrapper
+    return decorate
@@ -0,0 +1,168 @@
+"""Downsampled, cached price charts.
+
+A browser chart can't show more points than it has pixels, so long
+histories are reduced before they are sent: line charts with
+Largest-Triangle-Three-Buckets (keeps the visual shape, peaks included) or
+min/max decimation, candlesticks by merging neighbouring bars into one
+OHLC bar. Built figures are kept as serialized JSON in a process-wide LRU
+keyed by (symbol, period, chart type, data version), so every session
+asking for the same chart reuses the same work.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.lazy import lazy_module
+
+go = lazy_module("plotly.graph_objects")
+
+DEFAULT_WIDTH = 800  # px; charts render at container width, roughly this on a laptop
+CANDLE_PX = 4  # narrowest readable candlestick
+OHLC = ["Open", "High", "Low", "Close"]
+
+
+# ----------------------------
+# Downsampling (return positions into the original series)
+# ----------------------------
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: ``threshold`` indices that best keep the line's shape."""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # threshold - 2 buckets over the points between the fixed first and last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    edges = np.r_[edges, n]
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        # Twice the triangle area between the last kept point, each candidate and the next bucket's mean
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def minmax(y, buckets):
+    """Min/max decimation: the first and last point plus the lowest and highest of each of ``buckets`` equal buckets, in order."""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if 2 * buckets >= n or buckets < 1:
+        return np.arange(n)
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    rows = padded.reshape(buckets, size)
+    rows = rows[~np.isnan(rows).all(axis=1)]
+    offsets = np.arange(len(rows)) * size
+    return np.unique(np.r_[0, offsets + np.nanargmin(rows, axis=1), offsets + np.nanargmax(rows, axis=1), n - 1])
+
+
+def time_axis(index):
+    """A numeric x for the downsamplers (nanoseconds for datetime indexes, positions otherwise)."""
+    nanos = getattr(index, "asi8", None)
+    if nanos is not None:
+        return np.asarray(nanos, dtype=float)
+    return np.arange(len(index), dtype=float)
+
+
+def downsample(history, width=DEFAULT_WIDTH, method="lttb", column="Close"):
+    """Rows of ``history`` to plot a line of ``column`` at ``width`` pixels."""
+    if len(history) <= width:
+        return history
+    if method == "minmax":
+        keep = minmax(history[column].to_numpy(), (width - 2) // 2)
+    else:
+        keep = lttb(time_axis(history.index), history[column].to_numpy(), width)
+    return history.iloc[keep]
+
+
+def resample_ohlc(history, width=DEFAULT_WIDTH):
+    """Merge neighbouring bars so at most ``width / CANDLE_PX`` candles remain."""
+    bars = max(width // CANDLE_PX, 1)
+    n = len(history)
+    if n <= bars:
+        return history
+    starts = np.linspace(0, n, bars, endpoint=False).astype(int)
+    ends = np.r_[starts[1:], n] - 1
+    frame = history[OHLC].iloc[starts].copy()
+    frame["High"] = np.maximum.reduceat(history["High"].to_numpy(), starts)
+    frame["Low"] = np.minimum.reduceat(history["Low"].to_numpy(), starts)
+    frame["Close"] = history["Close"].to_numpy()[ends]
+    return frame
+
+
+def data_version(history):
+    """Cheap fingerprint that changes whenever a refreshed history differs at the ends or in length."""
+    if history is None or history.empty:
+        return None
+    last = history.iloc[-1]
+    return len(history), str(history.index[0]), str(history.index[-1]), float(last.get("Close", np.nan))
+
+
+# ----------------------------
+# Figure cache
+# ----------------------------
+class FigureCache:
+    """LRU of serialized figure JSON, shared across sessions."""
+
+    def __init__(self, size=256):
+        self.size = size
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key, build):
+        """A fresh figure for ``key``, building it with ``build()`` only on a miss."""
+        with self._lock:
+            text = self._figures.get(key)
+            if text is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+        if text is None:
+            text = build().to_json()
+            with self._lock:
+                self.misses += 1
+                self._figures[key] = text
+                while len(self._figures) > self.size:
+                    self._figures.popitem(last=False)
+        return go.Figure(json.loads(text))
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+
+figure_cache = FigureCache()
+
+
+def price_figure(history, title, chart_type="line", symbol=None, period=None, width=DEFAULT_WIDTH,
+                 method="lttb", color=None, name=None, layout=None):
+    """Cached, downsampled price chart; ``None`` for an empty history."""
+    if history is None or history.empty:
+        return None
+    if chart_type == "candlestick" and not all(c in history.columns for c in OHLC):
+        chart_type = "line"
+    layout = {"title": title, "xaxis_title": "Date", "yaxis_title": "Price ($)", "height": 400, **(layout or {})}
+    key = (symbol or title, period, chart_type, data_version(history), width, method, color, name,
+           tuple(sorted((k, repr(v)) for k, v in layout.items())))
+
+    def build():
+        fig = go.Figure()
+        if chart_type == "candlestick":
+            bars = resample_ohlc(history, width)
+            fig.add_trace(go.Candlestick(x=bars.index, open=bars["Open"], high=bars["High"], low=bars["Low"],
+                                         close=bars["Close"], name=name or title))
+        else:
+            points = downsample(history, width, method)
+            fig.add_trace(go.Scatter(x=points.index, y=points["Close"], mode="lines", name=name or title,
+                                     line=dict(color=color) if color else None))
+        fig.update_layout(**layout)
+        return fig
+
+    return figure_cache.get(key, build)
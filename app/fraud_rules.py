@@ -0,0 +1,272 @@
+"""Declarative fraud rules compiled into one pass over shared per-sender features."""
+import math
+import operator
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+# Strongest action wins when several rules fire
+ACTION_SEVERITY = {"allow": 0, "warn": 1, "review": 2, "2fa": 3, "block": 4}
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "in": lambda a, b: a in b,
+    "not in": lambda a, b: a not in b,
+}
+
+# Each rule: all ``when`` conditions must hold. A condition is
+# (feature, operator, value); a string value names another feature.
+DEFAULT_RULES = [
+    {"name": "transaction_over_limit", "when": [("amount", ">", "transaction_limit")],
+     "action": "block", "details": "Amount: {amount}, Limit: {transaction_limit}"},
+    {"name": "unusual_activity", "when": [("txn_count_24h", ">", 10)],
+     "action": "block", "details": "High frequency: {txn_count_24h} transactions in 24h"},
+    {"name": "large_amount_new_recipient", "when": [("amount", ">", 500), ("new_recipient", "==", True)],
+     "action": "2fa", "details": "Amount: {amount}, New recipient: {recipient_id}"},
+    {"name": "large_transaction", "when": [("amount", ">", 10000)],
+     "action": "warn", "details": "Large transaction amount"},
+]
+
+
+@dataclass
+class RuleHit:
+    name: str
+    action: str
+    details: str
+
+
+@dataclass
+class Decision:
+    action: str = "allow"
+    hits: list = field(default_factory=list)
+
+    @property
+    def allowed(self):
+        return self.action != "block"
+
+
+# ----------------------------
+# Per-sender feature aggregates
+# ----------------------------
+class SenderStats:
+    """Incremental aggregates for one sender: 24h window, recipients and amount moments."""
+    __slots__ = ("recent", "recipients", "n", "mean", "m2")
+
+    def __init__(self):
+        self.recent = deque()
+        self.recipients = set()
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def observe(self, recipient_id, amount, ts, window):
+        if not self.recent or ts >= self.recent[-1]:
+            self.recent.append(ts)
+        else:
+            insort(self.recent, ts)
+        # Only the newest timestamp ages entries out, so earlier checks still see their window
+        while self.recent[0] <= self.recent[-1] - window:
+            self.recent.popleft()
+        self.recipients.add(recipient_id)
+        # Welford's running mean/variance
+        self.n += 1
+        delta = amount - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (amount - self.mean)
+
+    def count_between(self, cutoff, ts):
+        """Recorded transactions in ``(cutoff, ts]``; read-only, so checks can run in any order."""
+        return bisect_right(self.recent, ts) - bisect_right(self.recent, cutoff)
+
+    def zscore(self, amount):
+        if self.n < 2:
+            return 0.0
+        std = math.sqrt(self.m2 / (self.n - 1))
+        return (amount - self.mean) / std if std else 0.0
+
+
+class FeatureStore:
+    """Shared per-sender aggregates, updated once per recorded transaction."""
+
+    def __init__(self, window=timedelta(hours=24)):
+        self.window = window
+        self._senders = defaultdict(SenderStats)
+        self._lock = threading.Lock()
+
+    def observe(self, sender_id, recipient_id, amount, ts=None):
+        """Fold a recorded transaction into its sender's aggregates."""
+        with self._lock:
+            self._senders[sender_id].observe(recipient_id, amount, ts or datetime.now(), self.window)
+
+    def rebuild(self, transactions):
+        """Reset and replay a ledger of objects or dicts (``timestamp`` or ``ts``)."""
+        with self._lock:
+            self._senders.clear()
+        for t in sorted(transactions, key=_ts):
+            self.observe(_get(t, "sender_id"), _get(t, "recipient_id"), _get(t, "amount"), _ts(t))
+
+    def features(self, sender_id, recipient_id, amount, ts=None, **context):
+        """Feature dict for a candidate transaction; extra context (e.g. limits) is passed through."""
+        ts = ts or datetime.now()
+        with self._lock:
+            stats = self._senders.get(sender_id)
+            if stats is None:
+                count, new_recipient, zscore = 0, True, 0.0
+            else:
+                count = stats.count_between(ts - self.window, ts)
+                new_recipient = recipient_id not in stats.recipients
+                zscore = stats.zscore(amount)
+        return {
+            "sender_id": sender_id,
+            "recipient_id": recipient_id,
+            "amount": amount,
+            "txn_count_24h": count,
+            "new_recipient": new_recipient,
+            "amount_zscore": zscore,
+            "hour": ts.hour,
+            **context,
+        }
+
+
+def _get(t, key):
+    return t[key] if isinstance(t, dict) else getattr(t, key)
+
+
+def _ts(t):
+    if isinstance(t, dict):
+        return t.get("timestamp") or t.get("ts")
+    return t.timestamp
+
+
+# ----------------------------
+# Rules engine
+# ----------------------------
+def _compile_condition(feature, op, value):
+    fn = OPERATORS[op]
+    if isinstance(value, str):
+        def condition(features):
+            a, b = features.get(feature), features.get(value)
+            return a is not None and b is not None and fn(a, b)
+    else:
+        def condition(features):
+            a = features.get(feature)
+            return a is not None and fn(a, value)
+    return condition
+
+
+def _guard(conditions):
+    """First ``feature <op> number`` condition of a rule, used to index it by threshold."""
+    for feature, op, value in conditions:
+        if op in (">", ">=", "<", "<=") and isinstance(value, (int, float)) and not isinstance(value, bool):
+            return feature, op, value
+    return None
+
+
+def compile_rules(rules):
+    """Compile rule specs into a single ``evaluate(features) -> Decision`` function.
+
+    Rules with a numeric threshold condition are indexed by that threshold, so
+    one bisect per (feature, operator) finds the rules that can still fire and
+    the rest are never looked at; evaluation cost tracks the rules that match,
+    not the size of the rule set.
+    """
+    compiled = []
+    guarded = defaultdict(list)  # (feature, op) -> [(threshold, rule index)]
+    unguarded = []
+    for i, rule in enumerate(rules):
+        if rule["action"] not in ACTION_SEVERITY:
+            raise ValueError(f"Unknown action for rule {rule['name']}: {rule['action']}")
+        conditions = tuple(_compile_condition(*c) for c in rule["when"])
+        compiled.append((rule["name"], rule["action"], rule.get("details", rule["name"]), conditions))
+        guard = _guard(rule["when"])
+        if guard:
+            guarded[guard[:2]].append((guard[2], i))
+        else:
+            unguarded.append(i)
+
+    buckets = []
+    for (feature, op), entries in guarded.items():
+        entries.sort()
+        buckets.append((feature, op, [t for t, _ in entries], [i for _, i in entries]))
+
+    def evaluate(features):
+        candidates = list(unguarded)
+        for feature, op, thresholds, indices in buckets:
+            a = features.get(feature)
+            if a is None:
+                continue
+            if op == ">":
+                candidates.extend(indices[:bisect_left(thresholds, a)])
+            elif op == ">=":
+                candidates.extend(indices[:bisect_right(thresholds, a)])
+            elif op == "<":
+                candidates.extend(indices[bisect_right(thresholds, a):])
+            else:
+                candidates.extend(indices[bisect_left(thresholds, a):])
+
+        decision = Decision()
+        for i in sorted(candidates):
+            name, action, details, conditions = compiled[i]
+            if all(condition(features) for condition in conditions):
+                decision.hits.append(RuleHit(name, action, details.format_map(defaultdict(str, features))))
+                if ACTION_SEVERITY[action] > ACTION_SEVERITY[decision.action]:
+                    decision.action = action
+        return decision
+
+    return evaluate
+
+
+class RulesEngine:
+    """Evaluate a pluggable rule set, caching decisions per transaction id."""
+
+    def __init__(self, rules=None, features=None, cache_size=10_000):
+        self.features = features or FeatureStore()
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self.set_rules(DEFAULT_RULES if rules is None else rules)
+
+    @property
+    def rules(self):
+        return list(self._rules)
+
+    def set_rules(self, rules):
+        """Replace the rule set; cached decisions are discarded."""
+        evaluate = compile_rules(rules)
+        with self._lock:
+            self._rules = list(rules)
+            self._evaluate = evaluate
+            self._cache = OrderedDict()
+
+    def add_rule(self, rule):
+        """Add one rule spec to the active set."""
+        self.set_rules(self._rules + [rule])
+
+    def evaluate(self, features, transaction_id=None):
+        """Decision for a feature dict; repeated calls for the same transaction id are cached."""
+        if transaction_id is not None:
+            with self._lock:
+                cached = self._cache.get(transaction_id)
+                if cached is not None:
+                    self._cache.move_to_end(transaction_id)
+                    return cached
+        decision = self._evaluate(features)
+        if transaction_id is not None:
+            with self._lock:
+                self._cache[transaction_id] = decision
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return decision
+
+    def check(self, transaction_id, sender_id, recipient_id, amount, ts=None, **context):
+        """Build features for a candidate transaction and evaluate it."""
+        return self.evaluate(self.features.features(sender_id, recipient_id, amount, ts, **context), transaction_id)
+
+
+fraud_engine = RulesEngine()
@@ -0,0 +1,134 @@
+"""FX rates for display-currency conversion.
+
+Everything in the app is priced in USD. This module keeps one table of USD
+per unit of each supported currency, refreshed from Yahoo FX pairs in a
+background thread, so renders only do an in-memory lookup and a vectorized
+multiply. Until the first refresh lands the seed rates below are used.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app.refresher import Refresher
+
+BASE = "USD"
+REFRESH_INTERVAL = 900  # seconds
+MAX_MOVE = 0.5  # a refreshed rate further than this from the last live one is treated as bad data
+# USD per unit, used until the first refresh (approximate, Sep 2025)
+SEED_RATES = {
+    "USD": 1.0, "EUR": 1.17, "GBP": 1.35, "CAD": 0.72, "JPY": 0.0068,
+    "MXN": 0.054, "NGN": 0.00066, "GHS": 0.083, "JMD": 0.0062,
+}
+SYMBOLS = {
+    "USD": "$", "EUR": "€", "GBP": "£", "CAD": "CA$", "JPY": "¥",
+    "MXN": "MX$", "NGN": "₦", "GHS": "GH₵", "JMD": "J$",
+}
+ZERO_DECIMAL = {"JPY"}
+
+
+def fetch_yahoo(currencies):
+    """USD per unit for each currency from Yahoo ``XXXUSD=X`` pairs; missing pairs are skipped."""
+    import yfinance as yf
+    rates = {}
+    for currency in currencies:
+        if currency == BASE:
+            continue
+        hist = yf.Ticker(f"{currency}{BASE}=X").history(period="5d")
+        if not hist.empty:
+            rates[currency] = float(hist["Close"].iloc[-1])
+    return rates
+
+
+class FxRates:
+    """USD-per-unit table with a cached cross-rate matrix; reads never touch the network."""
+
+    def __init__(self, seed=SEED_RATES, fetcher=fetch_yahoo, refresh_interval=REFRESH_INTERVAL):
+        self.fetcher = fetcher
+        self.refresh_interval = refresh_interval
+        self.updated_at = None
+        self._live = set()  # currencies refreshed at least once; the rest still carry seed rates
+        self._refresher = Refresher(self.refresh, refresh_interval, "fx-rates")
+        self._set(pd.Series(seed, dtype=float))
+
+    def _set(self, usd_per_unit):
+        # Published together as one tuple so readers never see a table and matrix from different refreshes
+        matrix = pd.DataFrame(
+            np.outer(usd_per_unit.to_numpy(), 1 / usd_per_unit.to_numpy()),
+            index=usd_per_unit.index, columns=usd_per_unit.index,
+        )
+        self._tables = (usd_per_unit, matrix)
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def currencies(self):
+        return list(self._tables[0].index)
+
+    def matrix(self):
+        """Cross rates: ``matrix().loc[a, b]`` units of ``b`` per unit of ``a``."""
+        return self._tables[1]
+
+    def rate(self, source, target):
+        return float(self._tables[1].at[source, target])
+
+    def convert(self, values, source=BASE, target=BASE):
+        """Convert a scalar, array, Series or DataFrame from one currency to another in one multiply."""
+        if source == target:
+            return values
+        return values * self.rate(source, target)
+
+    def convert_frame(self, frame, columns, target, currency_column=None, source=BASE):
+        """Convert ``columns`` of a frame to ``target``; rows may carry their own currency in ``currency_column``."""
+        usd_per_unit = self._tables[0]
+        if currency_column:
+            factor = frame[currency_column].map(usd_per_unit).to_numpy() / usd_per_unit[target]
+        else:
+            factor = usd_per_unit[source] / usd_per_unit[target]
+        converted = frame.copy()
+        converted[columns] = frame[columns].to_numpy(dtype=float) * np.reshape(factor, (-1, 1))
+        if currency_column:
+            converted[currency_column] = target
+        return converted
+
+    # ----------------------------
+    # Refresh
+    # ----------------------------
+    def refresh(self):
+        """Fetch new rates; currencies that fail or jump implausibly keep their previous rate."""
+        try:
+            fetched = self.fetcher(self.currencies())
+        except Exception:
+            return False
+        usd_per_unit = self._tables[0].copy()
+        # A seed rate may be far off by now, so only live rates are held to MAX_MOVE
+        fetched = {
+            c: r for c, r in fetched.items()
+            if c in usd_per_unit.index and r and r > 0
+            and (c not in self._live or abs(r / usd_per_unit[c] - 1) <= MAX_MOVE)
+        }
+        if not fetched:
+            return False
+        usd_per_unit.update(pd.Series(fetched, dtype=float))
+        self._set(usd_per_unit)
+        self._live.update(fetched)
+        self.updated_at = datetime.now()
+        return True
+
+    def start(self):
+        """Start the background refresh thread (idempotent)."""
+        self._refresher.start()
+
+    def stop(self):
+        self._refresher.stop()
+
+
+def format_amount(amount, currency=BASE):
+    """Format an amount with its currency symbol, e.g. ``€1,234.50`` or ``-¥1,235``."""
+    decimals = 0 if currency in ZERO_DECIMAL else 2
+    rounded = round(amount, decimals)
+    sign = "-" if rounded < 0 else ""
+    return f"{sign}{SYMBOLS.get(currency, currency + ' ')}{abs(rounded):,.{decimals}f}"
+
+
+fx_rates = FxRates()
@@ -1,17 +1,135 @@
 # app/investing.py
+import pandas as pd
+import streamlit as st
+import core
+from app.common import get_user
+from app.lots import LotLedger, lot_ledger, unrealized_pnl
+from app.market_data import get_cached_data
+from app.orders import InMemoryLedger, Order, OrderManager, cached_quote_feed
+from app.projection import project_risk
+from app.rebalance import DEFAULT_INSTRUMENTS, drift, rebalance_frame
+from app.risk import risk_engine
+from app.valuation import PortfolioValuer, asset_class
 
-def place_order(user_id, symbol, shares, price):
-    """Simulate placing a stock order."""
-    return {"status": "success", "message": f"Placed order for {shares} shares of {symbol} at ${price:.2f}"}
+def order_manager():
+    """This session's order manager; fills settle against session users and transactions."""
+    if "order_manager" not in st.session_state:
+        st.session_state.setdefault("orders", [])
+        st.session_state.setdefault("transactions", [])
+        st.session_state.setdefault("lots", LotLedger())
+        ledger = InMemoryLedger(st.session_state.users, st.session_state.transactions, st.session_state.lots)
+        st.session_state.order_manager = OrderManager(ledger, cached_quote_feed, st.session_state.orders)
+    return st.session_state.order_manager
+
+def place_order(user_id, symbol, shares, price=None, side="buy", lot_method="fifo", lot_id=None):
+    """Queue a market order (``price=None``) or a limit order, then run a matching batch."""
+    order_type = "market" if price is None else "limit"
+    manager = order_manager()
+    order = manager.submit(Order(user_id, symbol.upper(), side, float(shares), order_type, price, lot_method, lot_id))
+    if order.status == "rejected":
+        return {"status": "error", "message": order.reason, "order_id": order.order_id}
+    manager.process_batch()
+    limit = f" limit ${price:.2f}" if price is not None else ""
+    return {
+        "status": "success",
+        "message": f"{side.title()} {shares} {order.symbol}{limit}: {order.status.replace('_', ' ')} "
+                   f"({order.filled:g} filled)",
+        "order_id": order.order_id,
+    }
+
+def match_resting_orders():
+    """Re-match this session's resting orders against the latest quotes; returns the fills.
+
+    Limit orders otherwise only get another look when a new order is placed,
+    so the sidebar runs this on its refresh timer.
+    """
+    if "order_manager" not in st.session_state:
+        return []
+    manager = st.session_state.order_manager
+    fills = manager.process_batch()
+    return [(manager.orders[order_id], quantity, price) for order_id, quantity, price in fills]
+
+def holdings(user_id):
+    """All units a user holds: app portfolio symbols plus core bullion/treasury units."""
+    user = get_user(user_id) or {}
+    combined = dict(user.get("portfolio", {}))
+    for asset_type, units in core.user_portfolios.get(user_id, {}).items():
+        combined[asset_type] = combined.get(asset_type, 0.0) + units
+    return combined
+
+def latest_quotes(symbols):
+    """Latest price per symbol: the core price oracle, otherwise the shared quote cache (never demo prices)."""
+    quotes = {}
+    for symbol in symbols:
+        if symbol in core.investment_assets:
+            quotes[symbol] = core.asset_price(symbol)[0]
+        else:
+            data = get_cached_data(symbol, "1d")
+            if data and "demo" not in data["source"].lower():
+                quotes[symbol] = data["current_price"]
+    return quotes
+
+def session_valuer():
+    """This session's valuer; every demo session reuses the same user ids, so they can't share one."""
+    if "portfolio_valuer" not in st.session_state:
+        st.session_state.portfolio_valuer = PortfolioValuer()
+    return st.session_state.portfolio_valuer
+
+def valuation(user_id):
+    """Memoized valuation for a user, refreshed against the latest quotes."""
+    valuer = session_valuer()
+    valuer.set_holdings(user_id, holdings(user_id))
+    valuer.update_quotes(latest_quotes(valuer.value(user_id)["positions"]))
+    return valuer.value(user_id)
 
 def portfolio_value(user_id):
-    """Return a dummy portfolio value."""
-    return 10000.00
+    """Market value of a user's holdings at the latest cached quotes."""
+    return round(valuation(user_id)["total"], 2)
+
+def open_lots(user_id):
+    """Open cost-basis lots from this session's fills and core investments, marked to market."""
+    lots = pd.concat([order_manager().ledger.lots.open_lots(user_id), lot_ledger.open_lots(user_id)], ignore_index=True)
+    return unrealized_pnl(lots, latest_quotes(lots["symbol"].unique()))
 
 def unrealized_gains(user_id):
-    """Return placeholder unrealized gains."""
-    return {"AAPL": 250.00, "MSFT": -100.00}
+    """Unrealized gain per symbol over open lots; symbols without a quote are left out."""
+    gains = open_lots(user_id).groupby("symbol")["gain"].sum(min_count=1).dropna()
+    return {symbol: round(gain, 2) for symbol, gain in gains.items()}
+
+def portfolio_risk(user_id, window="1y"):
+    """Volatility, correlation, beta and drawdown for a user's market-traded holdings."""
+    market = {s: u for s, u in holdings(user_id).items() if s not in core.investment_assets}
+    return risk_engine.analyze(market, window)
+
+def project_portfolio(user_id, years=5, paths=5_000, contributions=(), window="1y", seed=7):
+    """Monte Carlo projection of a user's market holdings, or ``None`` without enough history."""
+    risk = portfolio_risk(user_id, window)
+    if not risk:
+        return None
+    positions = valuation(user_id)["positions"]
+    value = sum(positions[s]["value"] for s in risk["symbols"] if s in positions)
+    return project_risk(risk, value, years=years, paths=paths, contributions=contributions, seed=seed)
+
+def rebalance_plan(user_id, tolerance=0.02, include_cash=True):
+    """Fee-aware trades that bring a user back to the target allocation, plus the current drift."""
+    user = get_user(user_id) or {}
+    positions = pd.DataFrame(
+        [(user_id, s, p["value"], p["price"]) for s, p in valuation(user_id)["positions"].items()],
+        columns=["user_id", "symbol", "value", "price"],
+    )
+    cash = {user_id: user.get("balance", 0.0)}
+    trades = rebalance_frame(positions, cash, latest_quotes(DEFAULT_INSTRUMENTS.values()),
+                             tolerance=tolerance, include_cash=include_cash)
+    return {"trades": trades, "drift": drift(positions, cash).loc[user_id]}
 
 def allocation_breakdown(user_id):
-    """Return a simple allocation breakdown."""
-    return {"Stocks": 0.7, "Bonds": 0.2, "Cash": 0.1}
+    """Share of net worth by asset class, including cash."""
+    user = get_user(user_id) or {}
+    totals = {"Cash": user.get("balance", 0.0)}
+    for symbol, position in valuation(user_id)["positions"].items():
+        cls = asset_class(symbol)
+        totals[cls] = totals.get(cls, 0.0) + position["value"]
+    net_worth = sum(totals.values())
+    if net_worth <= 0:
+        return {}
+    return {cls: value / net_worth for cls, value in totals.items()}
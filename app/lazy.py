@@ -0,0 +1,40 @@
+"""Deferred imports for heavy modules.
+
+``pd = lazy_module("pandas")`` binds a placeholder that imports pandas on
+first attribute access, so a page that never touches a DataFrame (the
+login screen) never pays for the import. Use it for modules referenced as
+``module.attr``; ``from x import y`` still imports eagerly.
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module placeholder that imports the real module on first attribute access."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_module(name):
+    """The module itself if it is already imported, otherwise a ``LazyModule`` for it."""
+    return sys.modules.get(name) or LazyModule(name)
@@ -0,0 +1,195 @@
+"""Cost-basis lot ledger: every buy opens a lot, every sell realizes lots FIFO, LIFO or by ID."""
+import heapq
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app.utils import uid
+
+LOT_METHODS = ("fifo", "lifo", "specific")
+LOT_COLUMNS = ["user_id", "symbol", "lot_id", "units", "cost_basis", "acquired_at"]
+
+
+@dataclass
+class Lot:
+    lot_id: str
+    units: float
+    price: float
+    fee: float = 0.0
+    acquired_at: datetime = field(default_factory=datetime.now)
+
+    @property
+    def unit_cost(self):
+        """Acquisition price per unit with the buy fee folded in."""
+        return self.price + self.fee / self.units if self.units else self.price
+
+
+class LotBook:
+    """Open lots for one (user, symbol).
+
+    Lots sit in a dict by ID plus two heaps keyed by acquisition order
+    (oldest-first and newest-first), so FIFO and LIFO realization and
+    specific-lot sells are all O(log n). Closed lots are dropped from the
+    heaps lazily, the same way the order books handle filled orders.
+    """
+
+    def __init__(self):
+        self.lots = {}
+        self.units = 0.0
+        self.cost = 0.0
+        self._fifo = []
+        self._lifo = []
+        self._seq = 0
+
+    def add(self, lot):
+        self._seq += 1
+        self.lots[lot.lot_id] = lot
+        heapq.heappush(self._fifo, (self._seq, lot.lot_id))
+        heapq.heappush(self._lifo, (-self._seq, lot.lot_id))
+        self.units += lot.units
+        self.cost += lot.units * lot.unit_cost
+
+    def next_lot(self, method):
+        heap = self._fifo if method == "fifo" else self._lifo
+        while heap and heap[0][1] not in self.lots:
+            heapq.heappop(heap)
+        return self.lots[heap[0][1]] if heap else None
+
+    def take(self, lot, units):
+        """Remove ``units`` from a lot; returns the cost basis removed."""
+        basis = units * lot.unit_cost
+        fee_share = lot.fee * units / lot.units
+        lot.fee -= fee_share
+        lot.units -= units
+        if lot.units <= 1e-12:
+            del self.lots[lot.lot_id]
+        self.units -= units
+        self.cost -= basis
+        if not self.lots:
+            self.units = self.cost = 0.0  # drop float drift once the position is flat
+        return basis
+
+
+class LotLedger:
+    """Lot books for every (user, symbol) plus the realized gains history."""
+
+    def __init__(self):
+        self._books = {}
+        self.realized = []
+        self._lock = threading.Lock()
+
+    # ----------------------------
+    # Buys and sells
+    # ----------------------------
+    def buy(self, user_id, symbol, units, price, fee=0.0, lot_id=None, acquired_at=None):
+        """Open a lot; ``fee`` is added to its cost basis. Returns the lot ID."""
+        if units <= 0:
+            raise ValueError("Lot units must be positive")
+        with self._lock:
+            book = self._books.get((user_id, symbol))
+            if book is None:
+                book = self._books[(user_id, symbol)] = LotBook()
+            if lot_id is None:
+                lot_id = uid()
+                while lot_id in book.lots:  # short IDs; re-draw on the rare collision
+                    lot_id = uid()
+            elif lot_id in book.lots:
+                raise ValueError(f"Lot {lot_id} already exists")
+            lot = Lot(lot_id, float(units), float(price), float(fee), acquired_at or datetime.now())
+            book.add(lot)
+        return lot.lot_id
+
+    def sell(self, user_id, symbol, units, price, fee=0.0, method="fifo", lot_id=None):
+        """Realize ``units`` against open lots; returns one realized record per lot touched.
+
+        Units beyond the open lots (holdings that predate lot tracking) are
+        left unrealized since they have no basis. ``fee`` reduces proceeds
+        pro rata across the lots sold.
+        """
+        if method not in LOT_METHODS:
+            raise ValueError(f"Unknown lot method: {method}")
+        if method == "specific" and lot_id is None:
+            raise ValueError("Specific-lot sells need a lot_id")
+        now = datetime.now()
+        records = []
+        with self._lock:
+            book = self._books.get((user_id, symbol))
+            if method == "specific" and (book is None or lot_id not in book.lots):
+                raise ValueError(f"Lot {lot_id} is not open")
+            if book is None:
+                return records
+            remaining = float(units)
+            while remaining > 1e-12:
+                lot = book.lots.get(lot_id) if method == "specific" else book.next_lot(method)
+                if lot is None:
+                    break
+                quantity = min(remaining, lot.units)
+                acquired_at = lot.acquired_at
+                basis = book.take(lot, quantity)
+                proceeds = quantity * price - fee * quantity / units
+                records.append({
+                    "user_id": user_id, "symbol": symbol, "lot_id": lot.lot_id, "units": quantity,
+                    "cost_basis": basis, "proceeds": proceeds, "gain": proceeds - basis,
+                    "acquired_at": acquired_at, "sold_at": now,
+                    "holding_days": (now - acquired_at).days,
+                })
+                remaining -= quantity
+            self.realized.extend(records)
+        return records
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def position(self, user_id, symbol):
+        """``(units, cost_basis)`` over a symbol's open lots, kept as running totals."""
+        with self._lock:
+            book = self._books.get((user_id, symbol))
+            return (book.units, book.cost) if book else (0.0, 0.0)
+
+    def has_lot(self, user_id, symbol, lot_id):
+        return self.lot_units(user_id, symbol, lot_id) > 0
+
+    def lot_units(self, user_id, symbol, lot_id):
+        """Units left in an open lot (0 when it is closed or unknown)."""
+        with self._lock:
+            book = self._books.get((user_id, symbol))
+            lot = book.lots.get(lot_id) if book else None
+            return lot.units if lot else 0.0
+
+    def open_lots(self, user_id=None):
+        """Open lots as a frame with columns ``LOT_COLUMNS``."""
+        with self._lock:
+            rows = [
+                (u, symbol, lot.lot_id, lot.units, lot.units * lot.unit_cost, lot.acquired_at)
+                for (u, symbol), book in self._books.items() if user_id is None or u == user_id
+                for lot in book.lots.values()
+            ]
+        return pd.DataFrame(rows, columns=LOT_COLUMNS)
+
+    def realized_gains(self, user_id=None):
+        with self._lock:
+            return [r for r in self.realized if user_id is None or r["user_id"] == user_id]
+
+    def unrealized(self, prices, user_id=None):
+        return unrealized_pnl(self.open_lots(user_id), prices)
+
+
+def unrealized_pnl(lots, prices):
+    """Mark open lots to ``prices`` ({symbol: price}) in one vectorized pass.
+
+    Adds ``price``, ``market_value``, ``gain`` and ``gain_pct`` columns; lots without a
+    quote get NaN so they drop out of sums instead of showing a full loss.
+    """
+    lots = lots.copy()
+    lots["price"] = lots["symbol"].map(prices).astype(float)
+    lots["market_value"] = lots["units"].to_numpy() * lots["price"].to_numpy()
+    lots["gain"] = lots["market_value"] - lots["cost_basis"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lots["gain_pct"] = lots["gain"] / lots["cost_basis"]
+    return lots
+
+
+lot_ledger = LotLedger()
@@ -1,50 +1,48 @@
-import yfinance as yf
-import requests
+import importlib.util
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import time
+from app.lazy import lazy_module
+from app.breaker import CircuitOpen, protected
+from app.metrics import count_cache, record_error, timed
+from data_providers.base import METALS, ProviderError, quote_from_bars
+
+# Provider and charting libraries load on first use
+pd = lazy_module("pandas")
+# Optional: charts degrade to a warning without plotly
+go = lazy_module("plotly.graph_objects") if importlib.util.find_spec("plotly") else None
+yield_curve = lazy_module("app.yield_curve")
+treasury = lazy_module("data_providers.treasury")
+crypto = lazy_module("data_providers.crypto")
+metals = lazy_module("data_providers.metals")
+charts = lazy_module("app.charts")
+router = lazy_module("data_providers.router")
+
+INDICES = {'^GSPC': 'S&P 500', '^IXIC': 'NASDAQ', '^DJI': 'Dow Jones', '^RUT': 'Russell 2000'}
 
 # -------------------------------
-# Yahoo Finance (via yfinance) - Stocks & Indices
+# Stocks & Indices (through the provider router)
 # -------------------------------
+@timed("market_data.get_stock_data", track_demo=False)
 def get_stock_data(symbol, period="1mo"):
-    """Fetch stock/ETF data with historical prices."""
-    try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period=period)
-        
-        if hist.empty:
-            return None
-            
-        info = ticker.info
-        current_price = hist['Close'].iloc[-1]
-        
-        # Calculate change from previous close
-        if len(hist) > 1:
-            prev_price = hist['Close'].iloc[-2]
-            change = current_price - prev_price
-            change_percent = (change / prev_price) * 100
-        else:
-            change = 0
-            change_percent = 0
-        
-        return {
-            'symbol': symbol,
-            'current_price': current_price,
-            'change': change,
-            'change_percent': change_percent,
-            'historical': hist,
-            '52w_high': info.get('fiftyTwoWeekHigh', current_price * 1.2),
-            '52w_low': info.get('fiftyTwoWeekLow', current_price * 0.8),
-            'volume': hist['Volume'].iloc[-1] if 'Volume' in hist.columns else 0,
-            'source': 'Yahoo Finance',
-            'last_updated': datetime.now()
-        }
-    except Exception as e:
-        st.error(f"Error fetching {symbol}: {str(e)}")
+    """Price, change and bars for ``symbol`` from the fastest healthy backend (demo data as a last resort)."""
+    hist, provider = router.market_router().history(symbol, period)
+    if hist is None:
         return None
+    quote = quote_from_bars(symbol, hist, provider.source)
+    current_price = quote.price
+    return {
+        'symbol': symbol,
+        'current_price': current_price,
+        'change': current_price - float(hist['Close'].iloc[-2]) if len(hist) > 1 else 0.0,
+        'change_percent': quote.change_percent,
+        'historical': hist,
+        '52w_high': float(hist['High'].max()),
+        '52w_low': float(hist['Low'].min()),
+        'volume': float(hist['Volume'].iloc[-1]),
+        'source': quote.source,
+        'last_updated': datetime.now()
+    }
 
 def get_sp500():
     """Fetch latest S&P 500 data with history."""
@@ -59,64 +57,45 @@ def get_dow_jones():
     return get_stock_data("^DJI", "1d")
 
 def get_major_indices():
-    """Get all major indices in one call."""
-    indices = {
-        '^GSPC': 'S&P 500',
-        '^IXIC': 'NASDAQ', 
-        '^DJI': 'Dow Jones',
-        '^RUT': 'Russell 2000'
-    }
-    
+    """Get all major indices in one batched quote request."""
+    quotes = router.market_router().quotes(list(INDICES))
     results = []
-    for symbol, name in indices.items():
-        data = get_stock_data(symbol, '1d')
-        if data:
+    for symbol, name in INDICES.items():
+        q = quotes.get(symbol)
+        if q:
             results.append({
                 'name': name,
                 'symbol': symbol,
-                'price': data['current_price'],
-                'change': data['change'],
-                'change_percent': data['change_percent'],
-                'source': data['source']
+                'price': q.price,
+                'change': q.price - q.price / (1 + q.change_percent / 100),
+                'change_percent': q.change_percent,
+                'source': q.source
             })
-    
     return results
 
 # -------------------------------
 # TreasuryDirect (Fiscal Data API)
 # -------------------------------
+@timed("treasury.get_treasury_yields")
 def get_treasury_yields():
-    """Fetch latest Treasury yields with historical context."""
-    try:
-        url = "https://api.fiscaldata.treasury.gov/services/api/fiscal_service/v2/accounting/od/avg_interest_rates"
-        params = {
-            'filter': 'security_desc:eq:Treasury Notes',
-            'sort': '-record_date',
-            'page[size]': '30'  # Get last 30 days for historical view
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-        
-        if 'data' in data and data['data']:
-            latest = data['data'][0]
-            historical_data = data['data'][:30]  # Last 30 records
-            
-            return {
-                '1_month': float(latest.get('avg_interest_rate_amt', 0)),
-                '2_year': float(latest.get('avg_interest_rate_amt', 0)) + 0.5,  # Demo spread
-                '10_year': float(latest.get('avg_interest_rate_amt', 0)) + 1.2,  # Demo spread
-                'historical': historical_data,
-                'source': 'U.S. Treasury FiscalData API',
-                'last_updated': datetime.now().strftime('%Y-%m-%d')
-            }
-        else:
-            return get_treasury_demo_data()
-            
-    except Exception as e:
-        st.error(f"Treasury data unavailable: {e}")
+    """Fetch Treasury yields from a curve fitted to the FiscalData series, with historical context."""
+    rows = treasury.get_avg_interest_rates()
+    record_date, curve = yield_curve.latest_curve(rows)
+    if record_date is None:
         return get_treasury_demo_data()
 
+    one_month, two_year, ten_year = curve([1 / 12, 2, 10])
+    return {
+        '1_month': float(one_month),
+        '2_year': float(two_year),
+        '10_year': float(ten_year),
+        'curve': curve,
+        'record_date': record_date,
+        'historical': [r for r in rows if r.get('security_desc') == 'Treasury Notes'][:30],
+        'source': 'U.S. Treasury FiscalData API',
+        'last_updated': record_date
+    }
+
 def get_treasury_demo_data():
     """Fallback demo data for Treasury yields."""
     # Generate some realistic demo historical data
@@ -142,56 +121,29 @@ def get_treasury_demo_data():
 # -------------------------------
 # CoinGecko (Crypto) with Historical Data
 # -------------------------------
+@timed("coingecko.get_crypto_data")
+@protected("coingecko", lambda coin_id="bitcoin", days=30: get_crypto_demo_data(coin_id, days))
 def get_crypto_data(coin_id="bitcoin", days=30):
     """Fetch cryptocurrency data with historical prices."""
+    symbol = next((s for s, i in crypto.COINGECKO_IDS.items() if i == coin_id), f"{coin_id.upper()}-USD")
     try:
-        # Current price and market data
-        price_url = "https://api.coingecko.com/api/v3/simple/price"
-        price_params = {
-            "ids": coin_id,
-            "vs_currencies": "usd",
-            "include_24hr_change": "true",
-            "include_market_cap": "true"
-        }
-        
-        # Historical data
-        history_url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-        history_params = {
-            "vs_currency": "usd",
-            "days": days,
-            "interval": "daily"
-        }
-        
-        price_response = requests.get(price_url, params=price_params, timeout=10)
-        history_response = requests.get(history_url, params=history_params, timeout=10)
-        
-        if price_response.status_code == 200 and history_response.status_code == 200:
-            price_data = price_response.json()[coin_id]
-            history_data = history_response.json()
-            
-            # Convert to DataFrame for consistency
-            prices = history_data['prices']
-            timestamps = [pd.to_datetime(price[0], unit='ms') for price in prices]
-            values = [price[1] for price in prices]
-            
-            historical_df = pd.DataFrame({
-                'Date': timestamps,
-                'Close': values
-            }).set_index('Date')
-            
-            return {
-                'symbol': coin_id.upper(),
-                'current_price': price_data['usd'],
-                'change_percent': price_data.get('usd_24h_change', 0),
-                'market_cap': price_data.get('usd_market_cap', 0),
-                'historical': historical_df,
-                'source': 'CoinGecko API',
-                'last_updated': datetime.now()
-            }
-        else:
+        quote = crypto.coingecko.quote(symbol)
+        if quote is None:
             return get_crypto_demo_data(coin_id, days)
-            
+        return {
+            'symbol': coin_id.upper(),
+            'current_price': quote.price,
+            'change_percent': quote.change_percent,
+            'historical': crypto.coingecko.daily_closes(symbol, days)[['Close']],
+            'source': quote.source,
+            'last_updated': quote.as_of
+        }
+    except CircuitOpen:
+        raise  # half-open trial in flight elsewhere; ``protected`` answers
+    except ProviderError:
+        return get_crypto_demo_data(coin_id, days)
     except Exception as e:
+        record_error("coingecko.get_crypto_data", e)
         st.error(f"Crypto data unavailable for {coin_id}: {e}")
         return get_crypto_demo_data(coin_id, days)
 
@@ -267,49 +219,33 @@ def get_crypto_demo_data(coin_id="bitcoin", days=30):
 # -------------------------------
 # Metals API (Precious Metals) with Historical
 # -------------------------------
+@timed("metals_api.get_metals_data")
+@protected("metals_api", lambda metal="gold", days=30: get_metals_demo_data(metal, days))
 def get_metals_data(metal="gold", days=30):
     """Fetch precious metals data with historical prices."""
     try:
-        api_key = st.secrets.get("METALS_API_KEY", "")
-        
-        if api_key:
-            # For historical data, you'd need a paid Metals-API plan
-            # This is a simplified version
-            url = f"https://metals-api.com/api/latest"
-            params = {
-                'access_key': api_key,
-                'base': 'USD',
-                'symbols': 'XAU,XAG,XPT'  # Gold, Silver, Platinum
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
-            
-            if 'rates' in data:
-                metal_symbols = {
-                    'gold': 'XAU',
-                    'silver': 'XAG', 
-                    'platinum': 'XPT'
-                }
-                
-                symbol = metal_symbols.get(metal, 'XAU')
-                price_per_ounce = 1 / data['rates'][symbol]  # Convert from USD per ounce
-                
-                # Generate demo historical data (real historical requires paid plan)
-                historical_df = generate_metals_historical(price_per_ounce, days)
-                
+        if metals.metals_api.available():
+            symbol = next((s for s, name in METALS.items() if name == metal), "XAU-USD")
+            quote = metals.metals_api.quote(symbol)
+            if quote is not None:
                 return {
                     'metal': metal,
-                    'price_per_ounce': price_per_ounce,
-                    'historical': historical_df,
-                    'source': 'Metals-API',
-                    'last_updated': datetime.now()
+                    'price_per_ounce': quote.price,
+                    # Generate demo historical data (real historical requires paid plan)
+                    'historical': generate_metals_historical(quote.price, days),
+                    'source': quote.source,
+                    'last_updated': quote.as_of
                 }
-        
+
         # Fallback to demo data
         return get_metals_demo_data(metal, days)
-        
+
+    except CircuitOpen:
+        raise  # half-open trial in flight elsewhere; ``protected`` answers
+    except ProviderError:
+        return get_metals_demo_data(metal, days)
     except Exception as e:
+        record_error("metals_api.get_metals_data", e)
         st.error(f"Metals data unavailable: {e}")
         return get_metals_demo_data(metal, days)
 
@@ -371,39 +307,10 @@ def get_metals_demo_data(metal="gold", days=30):
 # -------------------------------
 # Charting Utilities
 # -------------------------------
-def create_price_chart(historical_data, title, chart_type="line"):
-    """Create a Plotly chart from historical data."""
-    fig = go.Figure()
-    
-    if chart_type == "candlestick" and all(col in historical_data.columns for col in ['Open', 'High', 'Low', 'Close']):
-        fig.add_trace(go.Candlestick(
-            x=historical_data.index,
-            open=historical_data['Open'],
-            high=historical_data['High'],
-            low=historical_data['Low'],
-            close=historical_data['Close'],
-            name=title
-        ))
-    else:
-        # Line chart for simple close prices
-        fig.add_trace(go.Scatter(
-            x=historical_data.index,
-            y=historical_data['Close'],
-            mode='lines',
-            name=title,
-            line=dict(color='#1f77b4')
-        ))
-    
-    fig.update_layout(
-        title=title,
-        xaxis_title="Date",
-        yaxis_title="Price ($)",
-        height=400,
-        template="plotly_white",
-        showlegend=False
-    )
-    
-    return fig
+def create_price_chart(historical_data, title, chart_type="line", symbol=None, period=None):
+    """Create a Plotly chart from historical data (downsampled and cached, see ``app.charts``)."""
+    return charts.price_figure(historical_data, title, chart_type, symbol=symbol, period=period,
+                               color='#1f77b4', layout=dict(template="plotly_white", showlegend=False))
 
 def create_performance_chart(historical_data, title):
     """Create a percentage performance chart."""
@@ -448,13 +355,7 @@ def get_market_overview():
     return overview
 
 # For random number generation in demo data
-import randomimport streamlit as st
-try:
-    import plotly.graph_objects as go
-except Exception:
-    go = None
-import yfinance as yf
-import pandas as pd
+import random
 
 class MarketData:
     def chart(self, historical_data, symbol, chart_type="line"):
@@ -464,43 +365,16 @@ class MarketData:
         if historical_data is None or historical_data.empty:
             return None
 
-        if chart_type == "candlestick":
-            fig = go.Figure(data=[go.Candlestick(
-                x=historical_data.index,
-                open=historical_data['Open'],
-                high=historical_data['High'],
-                low=historical_data['Low'],
-                close=historical_data['Close'],
-                name=symbol
-            )])
-        else:
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=historical_data.index,
-                y=historical_data['Close'],
-                mode='lines',
-                name=f'{symbol} Price'
-            ))
-        fig.update_layout(title=f'{symbol} Stock Price', xaxis_title='Date', yaxis_title='Price ($)', height=400)
-        return fig
+        return charts.price_figure(historical_data, f'{symbol} Stock Price', chart_type, symbol=symbol,
+                                   name=symbol if chart_type == "candlestick" else f'{symbol} Price')
 
 market_data = MarketData()
 
+@count_cache("market_data.cached")
 @st.cache_data(ttl=300)
 def cached(symbol, period):
-    t = yf.Ticker(symbol)
-    hist = t.history(period=period)
-    if hist.empty:
-        return None
-    current = hist["Close"].iloc[-1]
-    return {
-        "historical": hist,
-        "current_price": float(current),
-        "change": float(current - hist["Close"].iloc[-2]) if len(hist) > 1 else 0.0,
-        "change_percent": float(((current - hist["Close"].iloc[-2]) / hist["Close"].iloc[-2]) * 100) if len(hist) > 1 else 0.0,
-        "52w_high": float(hist["High"].max()),
-        "52w_low": float(hist["Low"].min()),
-    }
+    return get_stock_data(symbol, period)
+
 # 👇 add these at the bottom of app/market_data.py
 
 def get_cached_data(symbol, period="1mo"):
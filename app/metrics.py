@@ -0,0 +1,281 @@
+"""In-process metrics: provider latency histograms, cache hit rates, error and fallback counters.
+
+Everything lands in one ``registry`` that renders as Prometheus text (for
+``serve()`` next to the Streamlit app) and as rows for the admin page.
+
+    @count_cache("get_stock_data")        # outermost: hit or miss per lookup
+    @st.cache_data(ttl=60)
+    @timed("yahoo.get_stock_data")         # innermost: latency of real calls only
+    def get_stock_data(symbol, period): ...
+"""
+import bisect
+import functools
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app import profiler
+
+# Seconds; upper bounds of the latency histogram buckets (+Inf is implicit)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = "breakbread"
+
+HELP = {
+    "provider_latency_seconds": ("histogram", "Latency of data provider calls that did real work."),
+    "provider_calls_total": ("counter", "Provider calls by outcome."),
+    "provider_errors_total": ("counter", "Provider errors by exception type, including ones handled with a fallback."),
+    "demo_fallbacks_total": ("counter", "Provider calls that returned demo data instead of live data."),
+    "upstream_responses_total": ("counter", "HTTP status codes returned by upstream APIs."),
+    "cache_requests_total": ("counter", "Cached function lookups by result."),
+    "circuit_state": ("gauge", "Provider circuit breaker state: 0 closed, 1 half-open, 2 open."),
+    "circuit_transitions_total": ("counter", "Circuit breaker state changes by new state."),
+    "circuit_short_circuits_total": ("counter", "Provider calls answered by a fallback because the circuit was open."),
+    "quote_streams": ("gauge", "Symbols with a live quote stream (one upstream poller each)."),
+    "quote_subscribers": ("gauge", "Session subscriptions per streamed symbol."),
+    "quote_updates_total": ("counter", "New quotes published on the quote bus."),
+    "quote_deliveries_total": ("counter", "Quotes delivered to session subscriptions (updates times subscribers)."),
+}
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.min = self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Estimate from the buckets (linear within a bucket, as Prometheus' histogram_quantile does), clamped to the observed range."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = max(self.buckets[i - 1] if i else 0.0, self.min)
+                upper = min(self.buckets[i] if i < len(self.buckets) else self.max, self.max)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+
+class Registry:
+    """Counters, gauges and histograms keyed by (name, sorted labels)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.gauges = {}
+        self.histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name, labels=None, amount=1):
+        with self._lock:
+            self.counters[self._key(name, labels)] += amount
+
+    def set(self, name, labels, value):
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name, labels, seconds):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def counter(self, name, **labels):
+        """Sum of ``name`` over every series matching ``labels``."""
+        with self._lock:
+            return sum(v for (n, lbls), v in self.counters.items()
+                       if n == name and all(dict(lbls).get(k) == str(val) for k, val in labels.items()))
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    # ----------------------------
+    # Exposition
+    # ----------------------------
+    def render(self):
+        """Prometheus text exposition format."""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted((k, (list(h.counts), h.sum, h.count, h.buckets)) for k, h in self.histograms.items())
+        lines, described = [], set()
+
+        def describe(name):
+            if name not in described:
+                kind, text = HELP.get(name, ("untyped", name))
+                lines.extend([f"# HELP {PREFIX}_{name} {text}", f"# TYPE {PREFIX}_{name} {kind}"])
+                described.add(name)
+
+        for (name, labels), value in counters + gauges:
+            describe(name)
+            lines.append(f"{PREFIX}_{name}{_labels(labels)} {value:g}")
+        for (name, labels), (counts, total, count, buckets) in histograms:
+            describe(name)
+            cumulative = 0
+            for bound, n in zip([*buckets, "+Inf"], counts):
+                cumulative += n
+                lines.append(f"{PREFIX}_{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{PREFIX}_{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{PREFIX}_{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def provider_rows(self):
+        """One row per provider for the admin page."""
+        rows = {}
+        with self._lock:
+            for (name, lbls), h in self.histograms.items():
+                if name == "provider_latency_seconds":
+                    provider = dict(lbls)["provider"]
+                    rows[provider] = {"provider": provider, "calls": h.count, "mean_ms": h.sum / h.count * 1000,
+                                      "p50_ms": h.quantile(0.5) * 1000, "p95_ms": h.quantile(0.95) * 1000,
+                                      "errors": 0, "demo_fallbacks": 0}
+            counters = list(self.counters.items())
+        for (name, lbls), value in counters:
+            lbls = dict(lbls)
+            if name in ("provider_errors_total", "demo_fallbacks_total") and "provider" in lbls:
+                row = rows.setdefault(lbls["provider"], {"provider": lbls["provider"], "calls": 0, "mean_ms": None,
+                                                         "p50_ms": None, "p95_ms": None, "errors": 0,
+                                                         "demo_fallbacks": 0})
+                row["errors" if name == "provider_errors_total" else "demo_fallbacks"] += int(value)
+        return sorted(rows.values(), key=lambda r: r["provider"])
+
+    def cache_rows(self):
+        """Hits, misses and hit rate per cache."""
+        caches = defaultdict(lambda: {"hit": 0, "miss": 0})
+        with self._lock:
+            for (name, lbls), value in self.counters.items():
+                if name == "cache_requests_total":
+                    lbls = dict(lbls)
+                    caches[lbls["cache"]][lbls["result"]] += int(value)
+        return [{"cache": c, "hits": v["hit"], "misses": v["miss"], "hit_rate": v["hit"] / (v["hit"] + v["miss"])}
+                for c, v in sorted(caches.items())]
+
+    def upstream_rows(self):
+        with self._lock:
+            return sorted(({**dict(lbls), "responses": int(v)} for (n, lbls), v in self.counters.items()
+                           if n == "upstream_responses_total"), key=lambda r: (r["provider"], r["status"]))
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
+_local = threading.local()
+
+
+# ----------------------------
+# Recording helpers
+# ----------------------------
+def is_demo(result):
+    """Whether a provider result is demo data (``source`` mentions demo, or its first row's does)."""
+    if isinstance(result, list) and result:
+        result = result[0]
+    return isinstance(result, dict) and "demo" in str(result.get("source", "")).lower()
+
+
+def record_error(provider, exc):
+    registry.inc("provider_errors_total", {"provider": provider, "error": type(exc).__name__})
+
+
+def record_fallback(provider):
+    registry.inc("demo_fallbacks_total", {"provider": provider})
+
+
+def record_response(provider, response):
+    """Count an upstream HTTP status code; returns ``response`` so it can wrap the call."""
+    registry.inc("upstream_responses_total", {"provider": provider, "status": str(response.status_code)})
+    return response
+
+
+def timed(provider, track_demo=True):
+    """Decorator: latency histogram, call outcome and (when ``track_demo``) demo-fallback count for a provider."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            _local.executed = True  # tells an enclosing count_cache this lookup was a miss
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                with profiler.span(provider):
+                    result = fn(*args, **kwargs)
+                outcome = "ok"
+            except Exception as e:
+                record_error(provider, e)
+                raise
+            finally:
+                registry.observe("provider_latency_seconds", {"provider": provider}, time.perf_counter() - start)
+                registry.inc("provider_calls_total", {"provider": provider, "outcome": outcome})
+            if track_demo and is_demo(result):
+                record_fallback(provider)
+            return result
+        return wrapper
+    return decorate
+
+
+def count_cache(cache):
+    """Decorator over a caching decorator: counts hits and misses (a miss runs the ``timed`` function inside)."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            outer, _local.executed = getattr(_local, "executed", False), False
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                registry.inc("cache_requests_total", {"cache": cache, "result": "miss" if _local.executed else "hit"})
+                _local.executed = outer
+        return wrapper
+    return decorate
+
+
+# ----------------------------
+# Standalone /metrics endpoint (the Streamlit process has no HTTP routes of its own)
+# ----------------------------
+def serve(port=9464, host="127.0.0.1"):
+    """Serve ``registry.render()`` on ``http://<host>:<port>/metrics`` from a daemon thread; returns the server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
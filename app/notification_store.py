@@ -0,0 +1,117 @@
+"""Bounded per-user notification store with cursor reads and optional persistence."""
+import json
+import os
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+
+
+class NotificationStore:
+    """Keep the last ``capacity`` notifications per user in a ring buffer.
+
+    Every notification gets a store-wide increasing ``id`` that doubles as a
+    read cursor: ``get(user_id, since=cursor)`` walks the user's buffer from
+    the newest end and stops at the cursor, so appends are O(1) and reads are
+    O(k) in the number of new notifications. When ``path`` is set, entries are
+    appended to a JSON-lines file and replayed on start-up.
+    """
+
+    def __init__(self, capacity=50, path=None, compact_every=1000):
+        self.capacity = capacity
+        self.path = path
+        self.compact_every = compact_every
+        self._queues = defaultdict(lambda: deque(maxlen=capacity))
+        self._unread = defaultdict(int)
+        self._last_id = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+    def add(self, user_id, message, timestamp=None):
+        """Append a notification for a user and return it."""
+        with self._lock:
+            self._last_id += 1
+            note = {
+                'id': self._last_id,
+                'timestamp': timestamp or datetime.now(),
+                'user_id': user_id,
+                'message': message,
+            }
+            self._append(note)
+            if self.path:
+                self._persist(note)
+            return note
+
+    def mark_read(self, user_id):
+        """Reset a user's unread counter."""
+        with self._lock:
+            self._unread[user_id] = 0
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def get(self, user_id, since=None, limit=None):
+        """A user's notifications oldest-first, optionally only those newer than the ``since`` cursor."""
+        with self._lock:
+            queue = self._queues.get(user_id, ())
+            notes = []
+            for note in reversed(queue):
+                if since is not None and note['id'] <= since:
+                    break
+                notes.append(note)
+                if limit is not None and len(notes) >= limit:
+                    break
+            notes.reverse()
+            return notes
+
+    def unread_count(self, user_id):
+        """Number of notifications added for a user since their last ``mark_read``."""
+        return self._unread.get(user_id, 0)
+
+    def cursor(self, user_id):
+        """Id of a user's newest notification (0 when empty)."""
+        with self._lock:
+            queue = self._queues.get(user_id)
+            return queue[-1]['id'] if queue else 0
+
+    # ----------------------------
+    # Internals (call with the lock held)
+    # ----------------------------
+    def _append(self, note):
+        self._queues[note['user_id']].append(note)
+        self._unread[note['user_id']] = min(self._unread[note['user_id']] + 1, self.capacity)
+
+    def _persist(self, note):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({**note, 'timestamp': note['timestamp'].isoformat()}) + "\n")
+        self._writes += 1
+        if self._writes >= self.compact_every:
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the file with only the entries still held in memory."""
+        notes = sorted({n['id']: n for q in self._queues.values() for n in q}.values(), key=lambda n: n['id'])
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for note in notes:
+                f.write(json.dumps({**note, 'timestamp': note['timestamp'].isoformat()}) + "\n")
+        os.replace(tmp_path, self.path)
+        self._writes = 0
+
+    def _load(self):
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    note = json.loads(line)
+                    note['timestamp'] = datetime.fromisoformat(note['timestamp'])
+                except (ValueError, KeyError):
+                    continue  # skip a torn last line
+                self._last_id = max(self._last_id, note['id'])
+                self._append(note)
+        # Replayed history counts as already seen
+        self._unread.clear()
+
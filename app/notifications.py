@@ -1,50 +1,80 @@
+import uuid
+import weakref
 import streamlit as st
-import random
-from datetime import datetime
-from app.market_data import get_cached_data
+from app.alerts import alert_engine
+from app.notification_store import NotificationStore
+from app.quote_bus import quote_bus
+
+class _SessionAlerts:
+    """A session's owner key in the shared alert engine, dropped from the engine along with the session.
+
+    User ids repeat across sessions (every visitor gets the same demo users),
+    so alerts can't be keyed by user id alone.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.owner = f"{uuid.uuid4().hex}:{user_id}"
+        weakref.finalize(self, alert_engine.forget, self.owner)
+
+def _session_alerts(user_id):
+    alerts = st.session_state.get('session_alerts')
+    if alerts is None or alerts.user_id != user_id:
+        alerts = st.session_state.session_alerts = _SessionAlerts(user_id)
+    return alerts
+
+def _store():
+    """This session's notifications; the demo user ids repeat in every session, so nothing is shared."""
+    if 'notification_store' not in st.session_state:
+        st.session_state.notification_store = NotificationStore()
+    return st.session_state.notification_store
+
+def _current_user_id():
+    """Notifications raised by a toast belong to whoever is logged in."""
+    return st.session_state.get('auth_user') or "system"
 
 def add_notification(message, user_id="system"):
-    """Store a notification in session state."""
-    if 'notifications' not in st.session_state:
-        st.session_state.notifications = []
-    st.session_state.notifications.append({
-        'timestamp': datetime.now(),
-        'user_id': user_id,
-        'message': message
-    })
-    # keep only the last 50
-    if len(st.session_state.notifications) > 50:
-        st.session_state.notifications = st.session_state.notifications[-50:]
-
-def get_notifications(user_id=None):
-    """Retrieve notifications, optionally filtered by user_id."""
-    notes = st.session_state.get('notifications', [])
-    if user_id:
-        return [n for n in notes if n['user_id'] == user_id]
-    return notes
+    """Store a notification in the session's per-user store."""
+    return _store().add(user_id, message)
+
+def get_notifications(user_id, since=None):
+    """Retrieve a user's notifications, optionally only those newer than a cursor."""
+    return _store().get(user_id, since=since)
+
+def unread_count(user_id):
+    """Number of unread notifications for a user."""
+    return _store().unread_count(user_id)
+
+def mark_notifications_read(user_id):
+    """Mark all of a user's notifications as read."""
+    _store().mark_read(user_id)
 
 def toast_success(message):
     st.toast(f"✅ {message}")
-    add_notification(message)
+    add_notification(message, user_id=_current_user_id())
 
 def toast_info(message):
     st.toast(f"ℹ️ {message}")
-    add_notification(message)
+    add_notification(message, user_id=_current_user_id())
 
 def toast_warn(message):
     st.toast(f"⚠️ {message}")
-    add_notification(message)
+    add_notification(message, user_id=_current_user_id())
 
 def price_alerts_tick(user):
-    """Occasionally trigger price alerts for a user's watchlist."""
+    """Deliver any price alerts the engine has fired for this user."""
     if 'price_alerts' not in user.get('settings', {}):
         return
-    # 10% chance per render to avoid spamming
-    if random.random() > 0.1:
-        return
-    for symbol, threshold in user['settings']['price_alerts'].items():
-        data = get_cached_data(symbol, "1d")
-        if data and data['current_price'] >= threshold:
-            msg = f"🚨 Price alert: {symbol} reached ${threshold:,.2f}!"
-            st.toast(msg)
-            add_notification(msg, user_id=user["user_id"])
+    owner = _session_alerts(user["user_id"]).owner
+    alert_engine.sync_user(user, owner=owner)
+    # The quote bus feeds the engine; this session's subscription keeps one shared stream per alerted symbol alive
+    symbols = set(user['settings']['price_alerts'])
+    stream = st.session_state.get('alert_stream')
+    if stream is None or set(stream.symbols) != symbols:
+        if stream is not None:
+            stream.close()
+        st.session_state.alert_stream = quote_bus().subscribe(sorted(symbols))
+    for event in alert_engine.drain(owner):
+        msg = f"🚨 Price alert: {event['symbol']} reached ${event['threshold']:,.2f}!"
+        st.toast(msg)
+        add_notification(msg, user_id=user["user_id"])
@@ -0,0 +1,269 @@
+"""Order management: price-time priority books matched in batches against the quote feed."""
+import heapq
+import itertools
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from app.lots import LOT_METHODS, LotLedger
+from app.utils import uid
+
+MARKET_PARTICIPATION = 0.01  # share of the last bar's volume we assume we can take per batch
+DEFAULT_QUOTE_SIZE = 100.0   # units available per batch when the feed has no volume
+CLOSED = ("filled", "cancelled", "rejected")
+
+
+@dataclass
+class Order:
+    user_id: str
+    symbol: str
+    side: str  # buy, sell
+    quantity: float
+    order_type: str = "market"  # market, limit
+    limit_price: float = None
+    lot_method: str = "fifo"  # how sells realize cost-basis lots: fifo, lifo, specific
+    lot_id: str = None  # the lot to sell when lot_method is "specific"
+    order_id: str = field(default_factory=uid)
+    filled: float = 0.0
+    avg_price: float = 0.0
+    status: str = "queued"  # queued, open, partially_filled, filled, cancelled, rejected
+    reason: str = ""
+    created_at: datetime = field(default_factory=datetime.now)
+
+    @property
+    def remaining(self):
+        return self.quantity - self.filled
+
+    def to_dict(self):
+        return {
+            "order_id": self.order_id, "user_id": self.user_id, "symbol": self.symbol,
+            "side": self.side, "order_type": self.order_type, "quantity": self.quantity,
+            "limit_price": self.limit_price, "lot_method": self.lot_method, "lot_id": self.lot_id, "filled": self.filled, "avg_price": self.avg_price,
+            "status": self.status, "reason": self.reason, "created_at": self.created_at,
+        }
+
+
+class OrderBook:
+    """Resting orders for one symbol; bids and asks are heaps keyed by (price, arrival)."""
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self._heaps = {"buy": [], "sell": []}  # bids keyed by -price; market orders at -inf
+        self._seq = itertools.count()
+
+    def add(self, order):
+        if order.order_type == "market":
+            key = -math.inf
+        else:
+            key = -order.limit_price if order.side == "buy" else order.limit_price
+        heapq.heappush(self._heaps[order.side], (key, next(self._seq), order))
+        if order.status == "queued":
+            order.status = "open"
+
+    def best(self, side):
+        """Highest-priority live order on one side, or None."""
+        heap = self._heaps[side]
+        while heap and heap[0][2].status in CLOSED:
+            heapq.heappop(heap)  # lazy deletion of filled/cancelled orders
+        return heap[0][2] if heap else None
+
+    def active(self):
+        return self.best("buy") is not None or self.best("sell") is not None
+
+
+def crosses(order, price):
+    """Whether an order would trade at ``price``."""
+    if order.order_type == "market":
+        return True
+    return order.limit_price >= price if order.side == "buy" else order.limit_price <= price
+
+
+class InMemoryLedger:
+    """Ledger over a plain ``{user_id: user}`` dict; fills become balance/holding changes and lots."""
+
+    def __init__(self, users, transactions=None, lots=None):
+        self.users = users
+        self.transactions = transactions if transactions is not None else []
+        self.lots = lots if lots is not None else LotLedger()
+
+    def get_user(self, user_id):
+        return self.users.get(user_id)
+
+    def apply_fill(self, order, quantity, price):
+        user = self.get_user(order.user_id)
+        notional = round(quantity * price, 2)
+        portfolio = user.setdefault("portfolio", {})
+        # Lots first: they're the step that can refuse, and balance and holdings must not move if they do
+        if order.side == "buy":
+            self.lots.buy(order.user_id, order.symbol, quantity, price)
+            user["balance"] = round(user["balance"] - notional, 2)
+            portfolio[order.symbol] = portfolio.get(order.symbol, 0.0) + quantity
+            sender_id, recipient_id = order.user_id, "market"
+            realized = None
+        else:
+            lots = self.lots.sell(order.user_id, order.symbol, quantity, price, method=order.lot_method, lot_id=order.lot_id)
+            realized = round(sum(r["gain"] for r in lots), 2) if lots else None
+            user["balance"] = round(user["balance"] + notional, 2)
+            portfolio[order.symbol] = portfolio.get(order.symbol, 0.0) - quantity
+            if portfolio[order.symbol] <= 1e-12:
+                del portfolio[order.symbol]
+            sender_id, recipient_id = "market", order.user_id
+        self.transactions.append({
+            "transaction_id": uid(),
+            "sender_id": sender_id,
+            "recipient_id": recipient_id,
+            "amount": notional,
+            "fee": 0.0,
+            "note": f"{order.side.title()} {quantity:g} {order.symbol} @ ${price:,.2f} (order {order.order_id})",
+            "status": "completed",
+            "realized_gain": realized,
+            "ts": datetime.now(),
+        })
+
+
+class OrderManager:
+    """Queue orders, then match them in batches against the quote feed.
+
+    ``quote_feed(symbol)`` returns ``(price, size)`` or ``None``; ``size`` is the
+    number of units available to each side in one batch, so large orders fill
+    partially across batches in price-time priority.
+    """
+
+    def __init__(self, ledger, quote_feed, order_log=None):
+        self.ledger = ledger
+        self.quote_feed = quote_feed
+        self.order_log = order_log if order_log is not None else []
+        self.books = {}
+        self.orders = {}
+        self._records = {}
+        self._queue = deque()
+
+    def submit(self, order):
+        """Validate and queue an order; it is matched on the next batch."""
+        if order.side not in ("buy", "sell") or order.quantity <= 0:
+            return self._reject(order, "Invalid side or quantity")
+        if order.order_type == "limit" and not (order.limit_price and order.limit_price > 0):
+            return self._reject(order, "Limit orders need a positive limit price")
+        if order.order_type not in ("market", "limit"):
+            return self._reject(order, f"Unknown order type: {order.order_type}")
+        if self.ledger.get_user(order.user_id) is None:
+            return self._reject(order, "User not found")
+        if order.lot_method not in LOT_METHODS:
+            return self._reject(order, f"Unknown lot method: {order.lot_method}")
+        if order.lot_method == "specific":
+            if not (order.side == "sell" and self.ledger.lots.has_lot(order.user_id, order.symbol, order.lot_id)):
+                return self._reject(order, "Specific-lot orders must sell an open lot")
+            if order.quantity > self.ledger.lots.lot_units(order.user_id, order.symbol, order.lot_id) + 1e-9:
+                return self._reject(order, "Order is larger than the lot")
+        self.orders[order.order_id] = order
+        self._record(order)
+        self._queue.append(order)
+        return order
+
+    def cancel(self, order_id):
+        """Cancel an order that has not fully filled."""
+        order = self.orders.get(order_id)
+        if order and order.status not in CLOSED:
+            order.status = "cancelled"
+            self._record(order)
+        return order
+
+    def process_batch(self, max_orders=None):
+        """Move up to ``max_orders`` queued orders into their books, then match every book once."""
+        taken = 0
+        while self._queue and (max_orders is None or taken < max_orders):
+            order = self._queue.popleft()
+            taken += 1
+            if order.status == "cancelled":
+                continue
+            book = self.books.get(order.symbol)
+            if book is None:
+                book = self.books[order.symbol] = OrderBook(order.symbol)
+            book.add(order)
+
+        fills = []
+        for book in self.books.values():
+            if book.active():
+                fills.extend(self._match(book))
+        return fills
+
+    def pending(self):
+        return len(self._queue)
+
+    # ----------------------------
+    # Matching
+    # ----------------------------
+    def _match(self, book):
+        quote = self.quote_feed(book.symbol)
+        if not quote:
+            return []
+        price, size = quote
+        fills = []
+        for side in ("buy", "sell"):
+            available = size
+            while available > 0:
+                order = book.best(side)
+                if order is None or not crosses(order, price):
+                    break
+                quantity = min(order.remaining, available, self._capacity(order, price))
+                if quantity <= 0:
+                    self._close(order, "Insufficient funds" if side == "buy" else "Insufficient holdings")
+                    continue
+                try:
+                    self.ledger.apply_fill(order, quantity, price)
+                except ValueError as e:  # e.g. the lot closed; this fill settled nothing
+                    self._close(order, str(e))
+                    continue
+                order.avg_price = (order.avg_price * order.filled + price * quantity) / (order.filled + quantity)
+                order.filled += quantity
+                order.status = "filled" if order.remaining <= 1e-9 else "partially_filled"
+                available -= quantity
+                fills.append((order.order_id, quantity, price))
+                self._record(order)
+        return fills
+
+    def _capacity(self, order, price):
+        user = self.ledger.get_user(order.user_id)
+        if order.side == "buy":
+            return math.floor(user["balance"] / price * 1e6) / 1e6
+        held = user.get("portfolio", {}).get(order.symbol, 0.0)
+        if order.lot_method == "specific":
+            # Another order may have sold part of the lot since this one was accepted
+            return min(held, self.ledger.lots.lot_units(order.user_id, order.symbol, order.lot_id))
+        return held
+
+    def _close(self, order, reason):
+        """Stop an order that can't fill further: cancelled (keeping its partial fill) or rejected."""
+        if not order.filled:
+            return self._reject(order, reason)
+        order.status = "cancelled"
+        order.reason = reason
+        self._record(order)
+        return order
+
+    def _reject(self, order, reason):
+        order.status = "rejected"
+        order.reason = reason
+        self._record(order)
+        return order
+
+    def _record(self, order):
+        """Keep one entry per order in ``order_log``, updated in place."""
+        record = self._records.get(order.order_id)
+        if record is None:
+            record = self._records[order.order_id] = order.to_dict()
+            self.order_log.append(record)
+        else:
+            record.update(order.to_dict())
+
+
+def cached_quote_feed(symbol):
+    """``(price, size)`` from the shared quote cache, sized from the last bar's volume; ``None`` on demo prices."""
+    from app.market_data import get_cached_data
+    data = get_cached_data(symbol, "1d")
+    if not data or "demo" in data["source"].lower():
+        return None
+    hist = data.get("historical")
+    volume = float(hist["Volume"].iloc[-1]) if hist is not None and "Volume" in hist.columns else 0.0
+    return data["current_price"], volume * MARKET_PARTICIPATION if volume else DEFAULT_QUOTE_SIZE
@@ -0,0 +1,140 @@
+"""Versioned price snapshots for the core investment assets, refreshed in the background.
+
+Readers never wait on the network: ``current()`` returns the newest good
+snapshot, and a background thread swaps in a new one when the metals and
+treasury providers return live (non-demo, plausible) data. Every snapshot
+keeps its version so a trade can record exactly which prices it used.
+"""
+import itertools
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from app.refresher import Refresher
+
+REFRESH_INTERVAL = 300  # seconds
+MAX_MOVE = 0.5  # reject a refresh that moves a live price by more than 50% from the last good one
+# Representative note priced from the live 10-year yield (per $100 face)
+TREASURY_COUPON = 4.25
+TREASURY_YEARS = 10
+
+
+@dataclass(frozen=True)
+class PriceSnapshot:
+    version: int
+    prices: dict
+    sources: dict
+    fetched_at: datetime = field(default_factory=datetime.now)
+
+
+def treasury_price(yield_pct, coupon_pct=TREASURY_COUPON, years=TREASURY_YEARS, face=100.0):
+    """Price per ``face`` of a semiannual-coupon note at ``yield_pct``."""
+    y, c, n = yield_pct / 200, coupon_pct / 200 * face, int(round(years * 2))
+    if y == 0:
+        return c * n + face
+    discount = (1 + y) ** -n
+    return c * (1 - discount) / y + face * discount
+
+
+def fetch_metals():
+    """Live gold/silver/platinum per ounce from ``data_providers.metals``; demo data is dropped."""
+    from data_providers.metals import get_metals_prices
+    data = get_metals_prices()
+    if not data or "demo" in str(data.get("source", "")).lower():
+        return {}, None
+    return {m: float(data[m]) for m in ("gold", "silver", "platinum") if data.get(m)}, data["source"]
+
+
+def fetch_treasury():
+    """Treasury price per $100 face from the live 10-year yield in ``data_providers.treasury``."""
+    from data_providers.treasury import get_treasury_yields
+    data = get_treasury_yields()
+    if not data or "demo" in str(data.get("source", "")).lower() or not data.get("10_year"):
+        return {}, None
+    return {"treasury_bonds": treasury_price(float(data["10_year"]))}, data["source"]
+
+
+class PriceOracle:
+    """Newest good ``PriceSnapshot`` plus a bounded history of earlier versions."""
+
+    def __init__(self, seed_prices, seed_source="seed", fetchers=(fetch_metals, fetch_treasury),
+                 refresh_interval=REFRESH_INTERVAL, history=100):
+        self.fetchers = list(fetchers)
+        self.refresh_interval = refresh_interval
+        self.seed_source = seed_source
+        self.history = history
+        self.rejected = deque(maxlen=100)  # (asset, price, reason) from refreshes that failed the checks
+        self._versions = itertools.count()
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+        self._refresher = Refresher(self.refresh, refresh_interval, "price-oracle")
+        self._current = self._publish(dict(seed_prices), {a: seed_source for a in seed_prices})
+
+    # ----------------------------
+    # Reads (never block on the network)
+    # ----------------------------
+    def current(self):
+        return self._current
+
+    def price(self, asset):
+        """``(price, version)`` from the current snapshot."""
+        snapshot = self._current
+        return snapshot.prices[asset], snapshot.version
+
+    def snapshot(self, version):
+        """An earlier snapshot by version, or ``None`` once it has aged out of the history."""
+        with self._lock:
+            return self._snapshots.get(version)
+
+    # ----------------------------
+    # Refresh
+    # ----------------------------
+    def refresh(self):
+        """Run every fetcher once; publish a new version if any price passed the checks."""
+        last = self._current
+        prices, sources = dict(last.prices), dict(last.sources)
+        changed = False
+        for fetch in self.fetchers:
+            try:
+                fetched, source = fetch()
+            except Exception as e:  # a failed provider just keeps the last good prices
+                self.rejected.append((getattr(fetch, "__name__", "fetch"), None, str(e)))
+                continue
+            for asset, price in fetched.items():
+                # A seed may be far off by now, so the first live price is only checked for sanity
+                reference = None if last.sources.get(asset) == self.seed_source else last.prices.get(asset)
+                reason = self._check(asset, price, reference)
+                if reason:
+                    self.rejected.append((asset, price, reason))
+                elif price != prices.get(asset):
+                    prices[asset], sources[asset] = price, source
+                    changed = True
+        if changed:
+            self._current = self._publish(prices, sources)
+        return self._current
+
+    def start(self):
+        """Start the background refresh thread (idempotent)."""
+        self._refresher.start()
+
+    def stop(self):
+        self._refresher.stop()
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+    def _check(self, asset, price, last):
+        if not isinstance(price, (int, float)) or price != price or price <= 0:
+            return "not a positive price"
+        if last and abs(price / last - 1) > MAX_MOVE:
+            return f"moved more than {MAX_MOVE:.0%} from {last:,.2f}"
+        return None
+
+    def _publish(self, prices, sources):
+        with self._lock:
+            snapshot = PriceSnapshot(next(self._versions), prices, sources)
+            self._snapshots[snapshot.version] = snapshot
+            while len(self._snapshots) > self.history:
+                self._snapshots.popitem(last=False)
+            return snapshot
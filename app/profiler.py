@@ -0,0 +1,165 @@
+"""Opt-in span tracer for Streamlit script runs.
+
+Enable with ``BREAKBREAD_PROFILE=1``, or ``?profile=1`` for an admin (the
+app passes query params through only for ``BREAKBREAD_ADMINS``). Each
+script run is a root span; ``instrument()`` wraps the page's ``show_*``,
+``get_*`` and ``sidebar_*`` functions for that run only, and provider calls open spans
+through ``app.metrics.timed``. Spans are aggregated across runs as folded stacks
+(``main;show_markets;show_treasury_bonds 1234`` in microseconds of self
+time), the input format of flamegraph.pl and speedscope.
+
+When profiling is off nothing is wrapped and ``span()`` returns a shared
+no-op context, so the cost is about a microsecond per provider call.
+"""
+import functools
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+ENV_FLAG = "BREAKBREAD_PROFILE"
+OUT_PATH = os.environ.get("BREAKBREAD_PROFILE_OUT", "data/profile.folded")
+PREFIXES = ("show_", "get_", "sidebar_")
+
+_local = threading.local()
+_noop = nullcontext()
+
+
+class Profile:
+    """Folded stacks (self time) and per-span totals, aggregated across runs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.folded = defaultdict(int)  # "a;b;c" -> self microseconds
+        self.spans = defaultdict(lambda: [0, 0, 0])  # name -> [calls, total us, self us]
+        self.runs = 0
+
+    def add(self, records):
+        with self._lock:
+            self.runs += 1
+            for path, total_us, self_us in records:
+                self.folded[path] += self_us
+                stats = self.spans[path.rsplit(";", 1)[-1]]
+                stats[0] += 1
+                stats[1] += total_us
+                stats[2] += self_us
+
+    def folded_text(self):
+        with self._lock:
+            return "".join(f"{path} {us}\n" for path, us in sorted(self.folded.items()) if us > 0)
+
+    def summary(self):
+        """Per-span rows, largest total first."""
+        with self._lock:
+            rows = [{"span": name, "calls": calls, "total_ms": total / 1000, "self_ms": own / 1000,
+                     "mean_ms": total / calls / 1000} for name, (calls, total, own) in self.spans.items()]
+        return sorted(rows, key=lambda r: -r["total_ms"])
+
+    def dump(self, path=OUT_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(self.folded_text())
+        return path
+
+    def reset(self):
+        with self._lock:
+            self.folded.clear()
+            self.spans.clear()
+            self.runs = 0
+
+
+profile = Profile()
+
+
+def enabled(query_params=None):
+    """Profiling requested by the environment or a ``profile`` query param."""
+    if os.environ.get(ENV_FLAG, "") not in ("", "0"):
+        return True
+    return bool(query_params) and query_params.get("profile", "0") not in ("", "0")
+
+
+def active():
+    return getattr(_local, "stack", None) is not None
+
+
+# ----------------------------
+# Spans
+# ----------------------------
+class _Span:
+    __slots__ = ("name", "start", "children")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter_ns()
+        self.children = 0
+
+
+@contextmanager
+def _open(stack, name):
+    span = _Span(name)
+    stack.append(span)
+    try:
+        yield
+    finally:
+        stack.pop()
+        total = time.perf_counter_ns() - span.start
+        if stack:
+            stack[-1].children += total
+        path = ";".join([s.name for s in stack] + [name])
+        _local.records.append((path, total // 1000, (total - span.children) // 1000))
+
+
+def span(name):
+    """Context manager timing ``name`` under the current span; a no-op outside a profiled run."""
+    stack = getattr(_local, "stack", None)
+    return _noop if stack is None else _open(stack, name)
+
+
+@contextmanager
+def run(name="main", out=OUT_PATH):
+    """Root span for one script run; on exit its spans join ``profile`` and the folded file is rewritten."""
+    _local.stack, _local.records = [], []
+    try:
+        with _open(_local.stack, name):
+            yield
+    finally:
+        records = _local.records
+        _local.stack = _local.records = None
+        profile.add(records)
+        if out:
+            profile.dump(out)
+
+
+def traced(fn, name=None):
+    """``fn`` wrapped in a span named after it."""
+    name = name or fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with span(name):
+            return fn(*args, **kwargs)
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+def instrument(namespace, prefixes=PREFIXES):
+    """Wrap every function in ``namespace`` whose name starts with ``prefixes``, plus such functions held in dicts there.
+
+    Meant for a Streamlit script's ``globals()``: the script re-executes each
+    run, so the wrapping lasts exactly one run.
+    """
+    def wrap(value, name):
+        if callable(value) and name.startswith(prefixes) and not getattr(value, "__profiled__", False):
+            return traced(value, name)
+        return value
+
+    for key, value in list(namespace.items()):
+        if key.startswith("__"):
+            continue
+        if isinstance(value, dict):
+            for k, v in list(value.items()):
+                value[k] = wrap(v, getattr(v, "__name__", ""))
+        else:
+            namespace[key] = wrap(value, key)
@@ -0,0 +1,121 @@
+"""Monte Carlo "what-if" projections of a portfolio with recurring contributions.
+
+Daily log-returns for every asset are drawn at once from the covariance
+estimated over our cached history (correlated through its Cholesky factor),
+so a whole chunk of paths is one NumPy pass. Paths are generated in chunks
+with independent child seeds, which bounds memory for large path counts and
+makes results identical whether chunks run in-process or in a process pool.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from app.risk import TRADING_DAYS
+
+PERCENTILES = (5, 25, 50, 75, 95)
+CHUNK_MEMORY = 64 * 2**20  # bytes for one chunk's shock array; its temporaries take a few times that
+
+
+@dataclass
+class Contribution:
+    name: str
+    amount: float
+    every: int  # trading days between deposits
+
+
+PAYCHECK = Contribution("Paycheck", 2000.0, 10)  # simulate_paycheck deposits, every two weeks
+SUSU_CONTRIBUTION = 250.0  # monthly, per member
+MONTH = TRADING_DAYS // 12
+
+
+def susu_payout(members, contribution=SUSU_CONTRIBUTION):
+    """A SuSu pays the whole pot to one member per monthly round, so each member is paid once per cycle."""
+    return Contribution("SuSu payout", contribution * members, MONTH * members)
+
+
+def contribution_schedule(contributions, steps):
+    """Cash added at the end of each step as a length-``steps`` array."""
+    schedule = np.zeros(steps)
+    for c in contributions:
+        schedule[c.every - 1::c.every] += c.amount
+    return schedule
+
+
+def chunk_paths(steps, assets, budget=CHUNK_MEMORY):
+    """Paths per chunk so one chunk's ``(paths, steps, assets)`` float64 shocks fit in ``budget`` bytes."""
+    return max(1, budget // (steps * assets * 8))
+
+
+def _simulate_chunk(args):
+    """Simulate one chunk of paths; module-level so a process pool can pickle it."""
+    seed, paths, value, weights, drift, chol, schedule, record_every = args
+    rng = np.random.default_rng(seed)
+    steps, assets = len(schedule), len(weights)
+    shocks = rng.standard_normal((paths, steps, assets)) @ chol.T
+    portfolio_returns = np.expm1(shocks + drift) @ weights  # daily-rebalanced to the current weights
+    growth = np.cumprod(1.0 + portfolio_returns, axis=1)
+    # V_t = V_{t-1} (1 + r_t) + c_t, solved in closed form: V_t = G_t (V_0 + sum_{s<=t} c_s / G_s)
+    values = growth * (value + np.cumsum(schedule / growth, axis=1))
+    return values[:, record_every - 1::record_every], values[:, -1]
+
+
+def simulate_portfolio(value, weights, mean, cov, years=5, paths=10_000, contributions=(), seed=None,
+                       chunk_size=None, processes=None, record_every=MONTH):
+    """Project ``value`` held at ``weights`` forward ``years`` over ``paths`` simulated paths.
+
+    ``mean`` (per asset) and ``cov`` are annualized, as ``app.risk`` reports them.
+    Values are recorded every ``record_every`` trading days; pass ``processes``
+    to spread chunks over a process pool. ``chunk_size`` defaults to what fits
+    in ``CHUNK_MEMORY`` for the horizon and asset count. The same ``seed`` and
+    ``chunk_size`` reproduce the same paths, pooled or not.
+    """
+    weights = np.asarray(weights, dtype=float)
+    weights = weights / weights.sum()
+    cov = np.asarray(cov, dtype=float) / TRADING_DAYS
+    drift = np.asarray(mean, dtype=float) / TRADING_DAYS - np.diag(cov) / 2  # log-space drift
+    # A tiny ridge keeps Cholesky working for singular estimates (e.g. perfectly correlated assets)
+    chol = np.linalg.cholesky(cov + np.eye(len(weights)) * 1e-12)
+    steps = int(round(years * TRADING_DAYS))
+    schedule = contribution_schedule(contributions, steps)
+
+    chunk_size = chunk_size or chunk_paths(steps, len(weights))
+    sizes = [min(chunk_size, paths - start) for start in range(0, paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(s, n, float(value), weights, drift, chol, schedule, record_every) for s, n in zip(seeds, sizes)]
+    if processes and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            chunks = list(pool.map(_simulate_chunk, jobs))
+    else:
+        chunks = [_simulate_chunk(job) for job in jobs]
+
+    recorded = np.concatenate([c[0] for c in chunks])
+    terminal = np.concatenate([c[1] for c in chunks])
+    times = np.arange(1, recorded.shape[1] + 1) * record_every / TRADING_DAYS
+    bands = pd.DataFrame(
+        np.percentile(recorded, PERCENTILES, axis=0).T,
+        index=pd.Index(times, name="years"), columns=[f"p{p}" for p in PERCENTILES],
+    )
+    contributed = float(schedule.sum())
+    return {
+        "paths": recorded,
+        "terminal": terminal,
+        "percentiles": bands,
+        "contributed": contributed,
+        "start_value": float(value),
+        "expected": float(terminal.mean()),
+        "prob_loss": float((terminal < value + contributed).mean()),
+    }
+
+
+def project_risk(risk, value, **kwargs):
+    """``simulate_portfolio`` from an ``app.risk`` result (weights, mean returns, covariance)."""
+    symbols = risk["symbols"]
+    return simulate_portfolio(
+        value,
+        [risk["weights"][s] for s in symbols],
+        [risk["mean_return"][s] for s in symbols],
+        risk["covariance"].loc[symbols, symbols].to_numpy(),
+        **kwargs,
+    )
@@ -0,0 +1,300 @@
+"""Streaming quotes: one upstream stream per symbol, fanned out to every subscribed session.
+
+Sessions ``subscribe()`` to symbols and read the newest quotes from their
+``Subscription`` (or block on ``wait()`` for the next ones). The bus polls
+each symbol once per ``POLL_INTERVAL`` however many sessions watch it, so a
+thousand sidebars showing ``^GSPC`` cost one upstream poll, not a thousand.
+Symbols that come due together go to the feed in one batch. A stream stops
+once its last subscription is closed or dropped along with its session.
+Every new quote also goes to the bus listeners (the price alert engine, which
+never sees demo fallback prices).
+
+    sub = quote_bus().subscribe(["^GSPC", "BTC-USD"])
+    sub.latest()["^GSPC"].price
+
+``BREAKBREAD_QUOTE_FEED=fake`` swaps the live feed for ``FakeFeed``, a
+seeded random walk that needs no network.
+"""
+import atexit
+import os
+import random
+import threading
+import time
+import weakref
+import zlib
+from collections import deque
+
+from app.metrics import record_error, registry
+
+POLL_INTERVAL = 15  # seconds between upstream polls of a symbol
+BACKLOG = 100  # unread quotes a subscription keeps before dropping the oldest
+
+
+# ----------------------------
+# Feeds: fetch(symbols) -> {symbol: Quote}
+# ----------------------------
+class RouterFeed:
+    """Live quotes through the provider router (fastest healthy backend, demo fallback)."""
+
+    name = "router"
+
+    def __init__(self, max_age=POLL_INTERVAL):
+        self.max_age = max_age
+
+    def fetch(self, symbols):
+        from data_providers.router import market_router
+        return market_router().quotes(symbols, max_age=self.max_age)
+
+
+class FakeFeed:
+    """Seeded random walk per symbol from its demo price; the same sequence every run, no network.
+
+    ``script(symbol, prices)`` queues exact prices to serve before the walk
+    resumes, e.g. to push a symbol across an alert threshold.
+    """
+
+    name = "fake"
+
+    def __init__(self, seed=0, volatility=0.002):
+        self.seed = seed
+        self.volatility = volatility
+        self._walks = {}  # symbol -> [rng, opening price, last price]
+        self._scripted = {}
+        self._lock = threading.Lock()
+
+    def script(self, symbol, prices):
+        with self._lock:
+            self._scripted.setdefault(symbol, deque()).extend(float(p) for p in prices)
+
+    def fetch(self, symbols):
+        from data_providers.base import Quote
+        quotes = {}
+        for symbol in symbols:
+            walk = self._walk(symbol)
+            with self._lock:
+                scripted = self._scripted.get(symbol)
+                rng, opening, last = walk
+                walk[2] = price = scripted.popleft() if scripted else last * (1 + rng.gauss(0, self.volatility))
+            quotes[symbol] = Quote(symbol, price, (price / opening - 1) * 100, "Fake Feed (demo)")
+        return quotes
+
+    def _walk(self, symbol):
+        walk = self._walks.get(symbol)
+        if walk is None:
+            from data_providers.demo import DemoProvider
+            opening = DemoProvider().quote(symbol).price
+            with self._lock:
+                walk = self._walks.setdefault(
+                    symbol, [random.Random(self.seed ^ zlib.crc32(symbol.encode())), opening, opening])
+        return walk
+
+
+# ----------------------------
+# Subscriptions and the bus
+# ----------------------------
+class Subscription:
+    """One session's view of the bus: the newest quote per symbol plus a bounded backlog of updates."""
+
+    def __init__(self, bus, symbols, backlog=BACKLOG):
+        self.symbols = tuple(dict.fromkeys(symbols))
+        self.closed = False
+        self._bus = bus
+        self._latest = {}
+        self._pending = deque(maxlen=backlog)
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def latest(self):
+        """``{symbol: Quote}`` for every symbol that has had an update."""
+        with self._lock:
+            return dict(self._latest)
+
+    def drain(self):
+        """Pop every quote received since the last drain, oldest first."""
+        with self._lock:
+            quotes = list(self._pending)
+            self._pending.clear()
+            self._ready.clear()
+            return quotes
+
+    def wait(self, timeout=None):
+        """Block until at least one update arrives (or ``timeout``), then drain."""
+        self._ready.wait(timeout)
+        return self.drain()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._bus.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _push(self, quote):
+        with self._lock:
+            self._latest[quote.symbol] = quote
+            self._pending.append(quote)
+            self._ready.set()
+
+
+class QuoteBus:
+    """In-process pub/sub for quotes with one poller thread serving every symbol's stream."""
+
+    def __init__(self, feed, interval=POLL_INTERVAL, listeners=(), clock=time.monotonic):
+        self.feed = feed
+        self.interval = interval
+        self.listeners = list(listeners)  # called with every new Quote
+        self.clock = clock
+        self.polls = 0
+        self._subscribers = {}  # symbol -> WeakSet of Subscriptions; one entry per live stream
+        self._due = {}  # symbol -> clock time of its next poll
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, symbols, backlog=BACKLOG):
+        """A ``Subscription`` to ``symbols``, seeded with their newest quotes; new streams poll right away."""
+        subscription = Subscription(self, symbols, backlog)
+        with self._lock:
+            for symbol in subscription.symbols:
+                self._subscribers.setdefault(symbol, weakref.WeakSet()).add(subscription)
+                if symbol in self._latest:
+                    subscription._push(self._latest[symbol])
+            self._set_gauges()
+        self.start()
+        self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for symbol in subscription.symbols:
+                self._subscribers.get(symbol, set()).discard(subscription)
+            self._prune()
+
+    def publish(self, quote):
+        """Fan a quote out to the symbol's subscribers and every listener.
+
+        Returns how many subscribers got it, or ``None`` when it's unchanged
+        from the last one published (a cached upstream answer) and was dropped.
+        """
+        with self._lock:
+            if self._latest.get(quote.symbol) == quote:
+                return None
+            self._latest[quote.symbol] = quote
+            subscribers = list(self._subscribers.get(quote.symbol, ()))
+        for subscription in subscribers:
+            subscription._push(quote)
+        registry.inc("quote_updates_total", {"symbol": quote.symbol})
+        registry.inc("quote_deliveries_total", None, len(subscribers))
+        for listener in self.listeners:
+            try:
+                listener(quote)
+            except Exception as e:
+                record_error("quote_bus.listener", e)
+        return len(subscribers)
+
+    def tick(self):
+        """Poll every stream that's due in one feed call and publish the results; returns quotes published."""
+        now = self.clock()
+        with self._lock:
+            self._prune()
+            due = [s for s in self._subscribers if self._due.get(s, now) <= now]
+            for symbol in due:
+                self._due[symbol] = now + self.interval
+        if not due:
+            return 0
+        self.polls += 1
+        try:
+            quotes = self.feed.fetch(due)
+        except Exception as e:  # the streams keep their last quote and retry next interval
+            record_error(f"quote_bus.{self.feed.name}", e)
+            return 0
+        return sum(self.publish(q) is not None for q in quotes.values())
+
+    def rows(self):
+        """Subscribers and the newest quote per live stream, for the admin page."""
+        now = time.time()
+        with self._lock:
+            self._prune()
+            streams = [(s, len(subs), self._latest.get(s)) for s, subs in sorted(self._subscribers.items())]
+        return [{"symbol": s, "subscribers": n, "price": q.price if q else None, "source": q.source if q else None,
+                 "age_s": now - q.as_of.timestamp() if q else None} for s, n, q in streams]
+
+    # ----------------------------
+    # Poller thread
+    # ----------------------------
+    def start(self):
+        """Start the poller thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="quote-bus", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            self.tick()
+            with self._lock:
+                next_due = min(self._due.values(), default=self.clock() + self.interval)
+            self._wake.wait(max(next_due - self.clock(), 0))
+
+    # ----------------------------
+    # Internals (call with the lock held)
+    # ----------------------------
+    def _prune(self):
+        """End streams whose subscriptions have all been closed or garbage-collected."""
+        for symbol in [s for s, subs in self._subscribers.items() if not subs]:
+            del self._subscribers[symbol]
+            self._due.pop(symbol, None)
+            self._latest.pop(symbol, None)
+            registry.set("quote_subscribers", {"symbol": symbol}, 0)
+        self._set_gauges()
+
+    def _set_gauges(self):
+        registry.set("quote_streams", None, len(self._subscribers))
+        for symbol, subs in self._subscribers.items():
+            registry.set("quote_subscribers", {"symbol": symbol}, len(subs))
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def default_feed():
+    return FakeFeed() if os.environ.get("BREAKBREAD_QUOTE_FEED") == "fake" else RouterFeed()
+
+
+def alert_listener(feed, engine):
+    """Bus listener passing quotes to the alert engine, skipping the router's demo fallback prices.
+
+    ``FakeFeed`` quotes are demo too but still go through: that feed is how
+    alerts get exercised offline.
+    """
+    simulated = isinstance(feed, FakeFeed)
+
+    def on_quote(quote):
+        if simulated or not quote.is_demo:
+            engine.on_price(quote.symbol, quote.price)
+    return on_quote
+
+
+def quote_bus():
+    """The shared bus, created on first use, feeding the price alert engine."""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            from app.alerts import alert_engine
+            feed = default_feed()
+            _bus = QuoteBus(feed, listeners=[alert_listener(feed, alert_engine)])
+        return _bus
@@ -0,0 +1,154 @@
+"""Fee-aware rebalancing toward ``app.portfolio.TARGET_ALLOCATION``.
+
+Every user is one row of a (users x classes) value matrix, so one plan and
+the whole nightly batch are the same few NumPy passes. Drifts smaller than
+the tolerance band (or the minimum trade) are left alone, which keeps the
+trade list short; the rest are sized so that, after each class's fee, the
+portfolio lands on target with cash as the remainder.
+
+    python -m app.rebalance positions.csv trades.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import core
+from app.portfolio import TARGET_ALLOCATION
+from app.valuation import asset_class
+
+CASH = "cash"
+CLASSES = list(TARGET_ALLOCATION) + [CASH]
+# What a class buys when the user holds nothing in it yet; startups and royalties
+# aren't tradable in-app, so their target share is spread over the other classes
+DEFAULT_INSTRUMENTS = {"stocks": "SPY", "bonds": "treasury_bonds", "crypto": "BTC-USD", "precious_metals": "gold"}
+CLASS_FEES = {
+    "bonds": core.investment_assets["treasury_bonds"]["fee_percent"],
+    "precious_metals": core.investment_assets["gold"]["fee_percent"],
+}
+
+
+def allocation_key(symbol):
+    """``TARGET_ALLOCATION`` key for a held symbol."""
+    if symbol.lower() == CASH:
+        return CASH
+    return asset_class(symbol).lower().replace(" ", "_")
+
+
+def target_weights(target=None):
+    """Target weight per ``CLASSES`` entry; untradable shares go pro rata to tradable classes."""
+    target = TARGET_ALLOCATION if target is None else target
+    weights = np.array([target.get(c, 0) for c in CLASSES[:-1]], dtype=float) / 100
+    tradable = np.array([c in DEFAULT_INSTRUMENTS for c in CLASSES[:-1]])
+    invested = weights.sum()
+    weights = np.where(tradable, weights, 0.0)
+    weights *= invested / weights.sum()
+    return np.r_[weights, max(0.0, 1 - invested)]
+
+
+def plan(values, weights=None, fees=None, tolerance=0.02, min_trade=10.0, include_cash=True, iterations=6):
+    """Class-level trades for a (users x ``CLASSES``) matrix of current values.
+
+    Returns ``(trades, fees_paid)``, both (users x classes); positive trades
+    are buys. The cash column is never traded, it funds buys and absorbs
+    sells. With ``include_cash=False`` idle cash stays idle and sells must
+    fund buys.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    weights = target_weights() if weights is None else np.asarray(weights, dtype=float)
+    fees = np.array([CLASS_FEES.get(c, 0.0) for c in CLASSES]) if fees is None else np.asarray(fees, dtype=float)
+    cash = CLASSES.index(CASH)
+
+    fixed = np.zeros(values.shape, dtype=bool)  # classes we leave alone
+    fixed[:, cash] = not include_cash
+    trades = np.zeros(values.shape)
+    while True:
+        free = np.where(fixed, 0.0, weights)
+        free_total = free.sum(axis=1, keepdims=True)
+        share = np.divide(free, free_total, out=np.zeros_like(free), where=free_total > 0)
+        total = values.sum(axis=1)
+        # Fees shrink what's left to allocate and depend on the trades themselves; a few
+        # fixed-point steps converge since fees are a few percent of the traded amount
+        for _ in range(iterations):
+            investable = total - np.where(fixed, values, 0.0).sum(axis=1)
+            trades = np.where(fixed, 0.0, share * investable[:, None] - values)
+            trades[:, cash] = 0.0
+            total = values.sum(axis=1) - (fees * np.abs(trades)).sum(axis=1)
+        small = (np.abs(trades) < min_trade) | (np.abs(trades) < tolerance * total[:, None])
+        small[:, cash] = False
+        newly = small & ~fixed & (trades != 0)
+        if not newly.any():
+            break
+        fixed |= newly
+    return trades, fees * np.abs(trades)
+
+
+def class_values(positions, cash=None):
+    """Pivot a long ``(user_id, symbol, value)`` frame into the (users x ``CLASSES``) value matrix."""
+    frame = positions[["user_id", "symbol", "value"]].copy()
+    if cash:
+        frame = pd.concat([frame, pd.DataFrame({"user_id": list(cash), "symbol": CASH, "value": list(cash.values())})])
+    frame["asset_class"] = frame["symbol"].map(allocation_key)
+    return frame.pivot_table(index="user_id", columns="asset_class", values="value", aggfunc="sum", fill_value=0.0) \
+        .reindex(columns=CLASSES, fill_value=0.0)
+
+
+def rebalance_frame(positions, cash=None, prices=None, **kwargs):
+    """Symbol-level trades for every user in a long positions frame (``user_id``, ``symbol``, ``value``, ``price``).
+
+    Class trades are split across the symbols a user already holds in that
+    class in proportion to their value, or go to ``DEFAULT_INSTRUMENTS``
+    (priced from ``prices`` when given).
+    """
+    matrix = class_values(positions, cash)
+    trades, fees = plan(matrix.to_numpy(), **kwargs)
+    rows = []
+    held = positions[positions["value"] > 0].assign(asset_class=lambda f: f["symbol"].map(allocation_key))
+    groups = dict(tuple(held.groupby(["user_id", "asset_class"])))
+    for u, c in zip(*np.nonzero(trades)):
+        user_id, cls, amount = matrix.index[u], CLASSES[c], trades[u, c]
+        lots = groups.get((user_id, cls))
+        if lots is None:
+            symbol = DEFAULT_INSTRUMENTS[cls]
+            splits = [(symbol, 1.0, (prices or {}).get(symbol))]
+        else:
+            splits = zip(lots["symbol"], lots["value"] / lots["value"].sum(), lots["price"])
+        for symbol, part, price in splits:
+            rows.append({
+                "user_id": user_id, "symbol": symbol, "asset_class": cls,
+                "side": "buy" if amount > 0 else "sell", "amount": abs(amount) * part,
+                "units": abs(amount) * part / price if price and price > 0 else np.nan,
+                "fee": fees[u, c] * part,
+            })
+    return pd.DataFrame(rows, columns=["user_id", "symbol", "asset_class", "side", "amount", "units", "fee"])
+
+
+def rebalance_all(valuer, cash, prices=None, **kwargs):
+    """Batch: plan trades for every user a ``PortfolioValuer`` holds, plus ``cash`` ({user_id: balance})."""
+    return rebalance_frame(valuer.positions_frame(), cash, prices, **kwargs)
+
+
+def drift(positions, cash=None):
+    """Current minus target weight per class for every user."""
+    matrix = class_values(positions, cash)
+    weights = matrix.div(matrix.sum(axis=1), axis=0).fillna(0.0)
+    return weights - target_weights()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan overnight rebalancing trades for every user.")
+    parser.add_argument("positions", help="CSV with columns: user_id, symbol, value, price (cash rows use symbol 'cash')")
+    parser.add_argument("out", help="where to write the trades (CSV)")
+    parser.add_argument("--tolerance", type=float, default=0.02, help="drift band left untraded (fraction of the portfolio)")
+    parser.add_argument("--min-trade", type=float, default=10.0)
+    args = parser.parse_args()
+
+    positions = pd.read_csv(args.positions)
+    trades = rebalance_frame(positions, tolerance=args.tolerance, min_trade=args.min_trade)
+    trades.to_csv(args.out, index=False)
+    print(f"{len(trades)} trades for {trades['user_id'].nunique()} of {positions['user_id'].nunique()} users "
+          f"(fees ${trades['fee'].sum():,.2f})")
+
+
+if __name__ == "__main__":
+    main()
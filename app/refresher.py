@@ -0,0 +1,33 @@
+"""Background refresh loop shared by the price oracle and the FX table."""
+import atexit
+import threading
+
+
+class Refresher:
+    """Call ``refresh`` now and then every ``interval`` seconds on a daemon thread, until stopped."""
+
+    def __init__(self, refresh, interval, name):
+        self.refresh = refresh
+        self.interval = interval
+        self.name = name
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            self.refresh()
+            if self._stop.wait(self.interval):
+                return
@@ -0,0 +1,156 @@
+"""Portfolio risk analytics computed from one aligned price matrix.
+
+Histories from different sources (Yahoo stock/crypto frames, CoinGecko
+frames) are put on a shared daily index, then returns, volatility,
+covariance/correlation, beta against the S&P 500 and drawdowns all come
+from the same NumPy matrix. Results are memoized per (holdings, window).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from app.market_data import get_cached_data
+
+BENCHMARK = "^GSPC"
+TRADING_DAYS = 252  # periods per year when the history is too short to measure
+RISK_TTL = 300  # seconds; matches the quote cache so a memo never outlives its prices
+
+
+def align_prices(frames):
+    """Close prices from ``{symbol: historical frame}`` on one shared daily index.
+
+    Indexes are normalized to tz-naive calendar dates, so Yahoo's exchange-local
+    timestamps and CoinGecko's UTC ones line up. Crypto trades on weekends and
+    stocks do not; only dates every series has a close for are kept, since
+    filling a gap would add zero-return days and understate volatility.
+    """
+    closes = {}
+    for symbol, hist in frames.items():
+        if hist is None or hist.empty or "Close" not in hist.columns:
+            continue
+        index = pd.DatetimeIndex(hist.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        close = pd.Series(hist["Close"].to_numpy(dtype=float), index=index.normalize())
+        closes[symbol] = close[~close.index.duplicated(keep="last")]
+    if not closes:
+        return pd.DataFrame()
+    return pd.DataFrame(closes).sort_index().dropna()
+
+
+def load_prices(symbols, window="1y"):
+    """Aligned close matrix for ``symbols`` over a Yahoo period such as ``"6mo"`` or ``"1y"``."""
+    frames = {}
+    for symbol in symbols:
+        data = get_cached_data(symbol, window)
+        if data:
+            frames[symbol] = data["historical"]
+    return align_prices(frames)
+
+
+def periods_per_year(index):
+    """Observed returns per year over a price index: ~252 for stocks, ~365 for crypto alone."""
+    years = (index[-1] - index[0]).days / 365.25 if len(index) > 1 else 0
+    return (len(index) - 1) / years if years >= 7 / 365.25 else TRADING_DAYS
+
+
+def max_drawdown(values):
+    """Largest peak-to-trough fall per column of a price/value matrix (as a negative fraction)."""
+    values = np.asarray(values, dtype=float)
+    peaks = np.maximum.accumulate(values, axis=0)
+    return (values / peaks - 1.0).min(axis=0)
+
+
+def risk_metrics(prices, units, benchmark=BENCHMARK):
+    """Risk figures for ``units`` ({symbol: units}) held over an aligned ``prices`` matrix.
+
+    ``prices`` may include a benchmark column used only for beta. Symbols
+    without history are reported under ``unpriced`` and left out.
+    """
+    held = [s for s in units if s in prices.columns]
+    if not held or len(prices) < 3:
+        return None
+    matrix = prices[held].to_numpy()
+    quantity = np.array([units[s] for s in held], dtype=float)
+    returns = matrix[1:] / matrix[:-1] - 1.0
+    periods = periods_per_year(prices.index)
+
+    exposure = matrix[-1] * quantity
+    weights = exposure / exposure.sum()
+    cov = np.cov(returns, rowvar=False, ddof=1).reshape(len(held), len(held)) * periods
+    vol = np.sqrt(np.diag(cov))
+    portfolio_vol = float(np.sqrt(weights @ cov @ weights))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.outer(vol, vol)
+
+    beta = portfolio_beta = None
+    if benchmark in prices.columns:
+        bench = prices[benchmark].to_numpy()
+        bench_returns = bench[1:] / bench[:-1] - 1.0
+        bench_var = bench_returns.var(ddof=1)
+        if bench_var > 0:
+            centered = returns - returns.mean(axis=0)
+            beta = centered.T @ (bench_returns - bench_returns.mean()) / (len(bench_returns) - 1) / bench_var
+            portfolio_beta = float(weights @ beta)
+
+    value = matrix @ quantity
+    return {
+        "symbols": held,
+        "unpriced": [s for s in units if s not in prices.columns],
+        "observations": len(returns),
+        "periods_per_year": periods,
+        "start": prices.index[0],
+        "end": prices.index[-1],
+        "weights": dict(zip(held, weights.tolist())),
+        "mean_return": dict(zip(held, (returns.mean(axis=0) * periods).tolist())),
+        "volatility": dict(zip(held, vol.tolist())),
+        "portfolio_volatility": portfolio_vol,
+        # Weighted average volatility over portfolio volatility; 1.0 means no diversification benefit
+        "diversification_ratio": float(weights @ vol / portfolio_vol) if portfolio_vol else 1.0,
+        "covariance": pd.DataFrame(cov, index=held, columns=held),
+        "correlation": pd.DataFrame(corr, index=held, columns=held),
+        "beta": dict(zip(held, beta.tolist())) if beta is not None else {},
+        "portfolio_beta": portfolio_beta,
+        "max_drawdown": dict(zip(held, max_drawdown(matrix).tolist())),
+        "portfolio_max_drawdown": float(max_drawdown(value)),
+        "portfolio_value": pd.Series(value, index=prices.index),
+    }
+
+
+class RiskEngine:
+    """Memoized ``risk_metrics`` keyed by (holdings, window), expiring with the quote cache."""
+
+    def __init__(self, loader=load_prices, ttl=RISK_TTL, max_entries=256):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def analyze(self, holdings, window="1y"):
+        """Risk for ``holdings`` ({symbol: units}) over ``window``; ``None`` without enough history."""
+        key = (tuple(sorted((s, float(u)) for s, u in holdings.items() if u)), window)
+        now = time.monotonic()
+        with self._lock:
+            hit = self._memo.get(key)
+            if hit and now - hit[0] < self.ttl:
+                self._memo.move_to_end(key)
+                return hit[1]
+        units = dict(key[0])
+        result = risk_metrics(self.loader(list(units) + [BENCHMARK], window), units) if units else None
+        with self._lock:
+            self._memo[key] = (now, result)
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+
+
+risk_engine = RiskEngine()
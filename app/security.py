@@ -1,5 +1,6 @@
 import streamlit as st
 from app.common import get_user, find_user
+from app.fraud_rules import fraud_engine
 
 def fake_login(username=None, code=None):
     """Demo login with optional 2FA simulation."""
@@ -20,8 +21,12 @@ def logout():
     st.session_state.auth_user = None
 
 def fraud_check(transaction):
-    """Basic fraud detection."""
-    warnings = []
-    if transaction["amount"] > 10000:
-        warnings.append("Large transaction amount")
-    return warnings
+    """Run the shared fraud rules and return one warning per rule that fired."""
+    decision = fraud_engine.check(
+        transaction.get("transaction_id"),
+        transaction.get("sender_id"),
+        transaction.get("recipient_id"),
+        transaction["amount"],
+        transaction.get("ts"),
+    )
+    return [hit.details for hit in decision.hits]
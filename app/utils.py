@@ -1,5 +1,5 @@
 import uuid
-import random
+import numpy as np
 from datetime import datetime, timedelta
 
 def uid():
@@ -13,11 +13,7 @@ def format_money(amount):
     else:
         return f"-${abs(amount):,.2f}"
 
-def seed_price_path(base_value, days, volatility=0.02):
-    """Generate simulated price path for charts."""
-    prices = [base_value]
-    for _ in range(days - 1):
-        change = random.uniform(-volatility, volatility)
-        new_price = prices[-1] * (1 + change)
-        prices.append(new_price)
-    return prices
+def seed_price_path(base_value, days, volatility=0.02, seed=None):
+    """Generate simulated price path for charts (pass ``seed`` for a repeatable path)."""
+    changes = np.random.default_rng(seed).uniform(-volatility, volatility, max(days - 1, 0))
+    return (base_value * np.cumprod(np.r_[1.0, 1.0 + changes])).tolist()
@@ -0,0 +1,128 @@
+"""Live portfolio valuation with memoized, incrementally updated per-user totals."""
+import threading
+from collections import defaultdict
+
+import pandas as pd
+
+ASSET_CLASSES = {
+    "gold": "Precious Metals",
+    "silver": "Precious Metals",
+    "platinum": "Precious Metals",
+    "treasury_bonds": "Bonds",
+}
+
+
+def asset_class(symbol):
+    """Coarse asset class used for allocation breakdowns."""
+    if symbol in ASSET_CLASSES:
+        return ASSET_CLASSES[symbol]
+    if symbol.endswith("-USD"):
+        return "Crypto"
+    return "Stocks"
+
+
+class PortfolioValuer:
+    """Value a set of users' holdings against one quote table.
+
+    The app keeps one valuer per session (``app.investing.session_valuer``):
+    demo sessions reuse the same user ids, so a shared one would mix them up.
+
+    Holdings live in a long ``(user_id, symbol, units)`` frame. A full
+    ``revalue`` joins it with the quote table in one vectorized step; after
+    that, ``update_quotes`` only adjusts the memoized totals of users who
+    hold a symbol whose price actually moved.
+    """
+
+    def __init__(self):
+        self._holdings = {}  # user_id -> {symbol: units}
+        self._holders = defaultdict(set)  # symbol -> user_ids
+        self._quotes = {}
+        self._memo = {}  # user_id -> {"total": float, "positions": {symbol: {...}}}
+        self._lock = threading.Lock()
+
+    # ----------------------------
+    # Inputs
+    # ----------------------------
+    def set_holdings(self, user_id, holdings):
+        """Replace a user's holdings ({symbol: units}); a no-op if nothing changed."""
+        holdings = {s: float(u) for s, u in holdings.items() if u}
+        with self._lock:
+            previous = self._holdings.get(user_id, {})
+            if previous == holdings:
+                return
+            for symbol in previous.keys() - holdings.keys():
+                self._holders[symbol].discard(user_id)
+            for symbol in holdings:
+                self._holders[symbol].add(user_id)
+            self._holdings[user_id] = holdings
+            self._memo[user_id] = self._value_user(holdings)
+
+    def update_quotes(self, prices):
+        """Merge new prices and incrementally adjust the users holding symbols that moved."""
+        with self._lock:
+            moved = {s: float(p) for s, p in prices.items() if p is not None and self._quotes.get(s) != float(p)}
+            for symbol, price in moved.items():
+                old = self._quotes.get(symbol)
+                self._quotes[symbol] = price
+                for user_id in self._holders.get(symbol, ()):
+                    memo = self._memo.get(user_id)
+                    if memo is None:
+                        continue
+                    units = self._holdings[user_id][symbol]
+                    position = memo["positions"][symbol]
+                    memo["total"] += units * (price - (old or 0.0))
+                    position.update(price=price, value=units * price)
+            return set(moved)
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def value(self, user_id):
+        """Memoized ``{"total", "positions"}`` for one user."""
+        with self._lock:
+            memo = self._memo.get(user_id)
+            if memo is None:
+                memo = self._memo[user_id] = self._value_user(self._holdings.get(user_id, {}))
+            return {"total": memo["total"], "positions": {s: dict(p) for s, p in memo["positions"].items()}}
+
+    def symbols(self):
+        """Every symbol currently held by someone."""
+        with self._lock:
+            return {s for s, users in self._holders.items() if users}
+
+    def revalue(self):
+        """Recompute every user from scratch in one vectorized join; returns totals by user."""
+        with self._lock:
+            frame = self.positions_frame()
+            totals = frame.groupby("user_id")["value"].sum()
+            self._memo = {}
+            for user_id, rows in frame.groupby("user_id"):
+                self._memo[user_id] = {
+                    "total": float(totals[user_id]),
+                    "positions": {
+                        r.symbol: {"units": r.units, "price": r.price, "value": r.value}
+                        for r in rows.itertuples(index=False)
+                    },
+                }
+            return totals
+
+    def positions_frame(self):
+        """All holdings joined with the quote table as a long frame."""
+        rows = [(u, s, units) for u, holdings in self._holdings.items() for s, units in holdings.items()]
+        frame = pd.DataFrame(rows, columns=["user_id", "symbol", "units"])
+        frame["price"] = frame["symbol"].map(self._quotes).fillna(0.0).astype(float)
+        frame["value"] = frame["units"] * frame["price"]
+        return frame
+
+    # ----------------------------
+    # Internals (call with the lock held)
+    # ----------------------------
+    def _value_user(self, holdings):
+        positions = {}
+        total = 0.0
+        for symbol, units in holdings.items():
+            price = self._quotes.get(symbol, 0.0)
+            positions[symbol] = {"units": units, "price": price, "value": units * price}
+            total += units * price
+        return {"total": total, "positions": positions}
+
@@ -0,0 +1,194 @@
+"""Treasury yield curve fitting and vectorized bond analytics.
+
+FiscalData's average interest rates come per security type rather than per
+maturity, so each type becomes one curve node at its typical maturity.
+Through those nodes we fit a Nelson-Siegel curve (or a natural cubic spline)
+per record_date, cache it, and price any set of bonds off it at once:
+price, Macaulay/modified duration and convexity for a whole array of
+maturities and coupons in one NumPy pass.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Typical maturity (years) for each FiscalData security_desc used as a curve node
+SECURITY_TENORS = {"Treasury Bills": 0.5, "Treasury Notes": 5.0, "Treasury Bonds": 20.0}
+DIEBOLD_LI_TAU = 1 / (0.0609 * 12)  # years; the usual fixed decay when there are too few nodes to fit it
+TAU_GRID = np.linspace(0.25, 10.0, 40)
+STANDARD_MATURITIES = [1 / 12, 0.25, 0.5, 1, 2, 3, 5, 7, 10, 20, 30]
+# Nodes used when FiscalData is unreachable (same figures as the demo yields)
+DEMO_NODES = {1 / 12: 5.32, 2.0: 4.89, 10.0: 4.45}
+
+
+# ----------------------------
+# Curve models (rates in percent, maturities in years)
+# ----------------------------
+def _ns_loadings(t, tau):
+    t = np.maximum(np.asarray(t, dtype=float), 1e-6)
+    x = t / tau
+    slope = (1 - np.exp(-x)) / x
+    return np.stack([np.ones_like(t), slope, slope - np.exp(-x)], axis=-1)
+
+
+class NelsonSiegel:
+    """y(t) = b0 + b1 (1 - e^-x)/x + b2 ((1 - e^-x)/x - e^-x), x = t / tau."""
+
+    def __init__(self, betas, tau):
+        self.betas = np.asarray(betas, dtype=float)
+        self.tau = tau
+
+    @classmethod
+    def fit(cls, tenors, rates):
+        """Least squares for the betas at each tau on a grid; tau is fixed when nodes are scarce."""
+        tenors, rates = np.asarray(tenors, dtype=float), np.asarray(rates, dtype=float)
+        taus = TAU_GRID if len(tenors) > 3 else [DIEBOLD_LI_TAU]
+        best = None
+        for tau in taus:
+            betas, *_ = np.linalg.lstsq(_ns_loadings(tenors, tau), rates, rcond=None)
+            error = np.sum((_ns_loadings(tenors, tau) @ betas - rates) ** 2)
+            if best is None or error < best[0]:
+                best = (error, betas, tau)
+        return cls(best[1], best[2])
+
+    def __call__(self, t):
+        return _ns_loadings(t, self.tau) @ self.betas
+
+
+class CubicSplineCurve:
+    """Natural cubic spline through the nodes, flat beyond the first and last."""
+
+    def __init__(self, tenors, rates):
+        order = np.argsort(tenors)
+        self.x = np.asarray(tenors, dtype=float)[order]
+        self.y = np.asarray(rates, dtype=float)[order]
+        n = len(self.x)
+        self.m = np.zeros(n)  # second derivatives; zero at both ends
+        if n > 2:
+            h = np.diff(self.x)
+            a = np.zeros((n - 2, n - 2))
+            idx = np.arange(n - 2)
+            a[idx, idx] = 2 * (h[:-1] + h[1:])
+            a[idx[1:], idx[:-1]] = h[1:-1]
+            a[idx[:-1], idx[1:]] = h[1:-1]
+            rhs = 6 * (np.diff(self.y[1:]) / h[1:] - np.diff(self.y[:-1]) / h[:-1])
+            self.m[1:-1] = np.linalg.solve(a, rhs)
+
+    @classmethod
+    def fit(cls, tenors, rates):
+        return cls(tenors, rates)
+
+    def __call__(self, t):
+        t = np.clip(np.asarray(t, dtype=float), self.x[0], self.x[-1])
+        if len(self.x) == 1:
+            return np.full_like(t, self.y[0])
+        i = np.clip(np.searchsorted(self.x, t) - 1, 0, len(self.x) - 2)
+        x0, x1, y0, y1, m0, m1 = self.x[i], self.x[i + 1], self.y[i], self.y[i + 1], self.m[i], self.m[i + 1]
+        h = x1 - x0
+        a, b = (x1 - t) / h, (t - x0) / h
+        return a * y0 + b * y1 + ((a ** 3 - a) * m0 + (b ** 3 - b) * m1) * h ** 2 / 6
+
+
+CURVE_MODELS = {"nelson_siegel": NelsonSiegel, "spline": CubicSplineCurve}
+
+
+def curve_nodes(rows):
+    """``{record_date: {tenor: rate}}`` from FiscalData avg_interest_rates rows."""
+    nodes = {}
+    for row in rows:
+        tenor = SECURITY_TENORS.get(row.get("security_desc"))
+        rate = row.get("avg_interest_rate_amt")
+        if tenor is None or rate in (None, "", "null"):
+            continue
+        nodes.setdefault(row["record_date"], {})[tenor] = float(rate)
+    return nodes
+
+
+def fit_curve(nodes, method="nelson_siegel"):
+    """Fit a curve through ``{tenor: rate}`` nodes."""
+    tenors = sorted(nodes)
+    return CURVE_MODELS[method].fit(tenors, [nodes[t] for t in tenors])
+
+
+class CurveCache:
+    """Fitted curves keyed by (record_date, method); a record_date's rates never change once published."""
+
+    def __init__(self):
+        self._curves = {}
+        self._lock = threading.Lock()
+
+    def get(self, record_date, nodes, method="nelson_siegel"):
+        key = (record_date, method)
+        with self._lock:
+            curve = self._curves.get(key)
+        if curve is None:
+            curve = fit_curve(nodes, method)
+            with self._lock:
+                self._curves[key] = curve
+        return curve
+
+    def history(self, rows, method="nelson_siegel"):
+        """Curves for every record_date in ``rows``, fitting only dates not seen before."""
+        return {date: self.get(date, nodes, method) for date, nodes in sorted(curve_nodes(rows).items())}
+
+
+curve_cache = CurveCache()
+
+
+def latest_curve(rows, method="nelson_siegel"):
+    """``(record_date, curve)`` for the newest record_date in ``rows``; demo nodes when there are none."""
+    nodes = curve_nodes(rows)
+    if not nodes:
+        return None, fit_curve(DEMO_NODES, method)
+    record_date = max(nodes)
+    return record_date, curve_cache.get(record_date, nodes[record_date], method)
+
+
+# ----------------------------
+# Bond analytics
+# ----------------------------
+def bond_metrics(curve, maturities, coupons, face=100.0, frequency=2):
+    """Price, zero rate, durations and convexity for many bonds in one pass.
+
+    ``curve`` gives zero rates (percent, compounded ``frequency`` times a year).
+    ``maturities`` (years) and ``coupons`` (percent) are arrays or scalars.
+    """
+    maturities, coupons = np.broadcast_arrays(np.asarray(maturities, dtype=float), np.asarray(coupons, dtype=float))
+    maturities, coupons = maturities.ravel(), coupons.ravel()
+    periods = np.maximum(np.ceil(maturities * frequency - 1e-9).astype(int), 1)
+
+    # One row per bond, one column per coupon date (counted back from maturity); padding is masked out
+    k = np.arange(periods.max())
+    times = maturities[:, None] - k[None, :] / frequency
+    mask = k[None, :] < periods[:, None]
+    times = np.where(mask, times, 0.0)
+    cashflows = np.where(mask, coupons[:, None] / frequency * face / 100, 0.0)
+    cashflows[:, 0] += face
+
+    zero = curve(times) / 100
+    discount = np.where(mask, (1 + zero / frequency) ** (-frequency * times), 0.0)
+    pv = cashflows * discount
+    price = pv.sum(axis=1)
+    macaulay = (pv * times).sum(axis=1) / price
+
+    # Effective duration and convexity from a parallel 1bp shift of the curve
+    bump = 0.0001
+    up = (cashflows * np.where(mask, (1 + (zero + bump) / frequency) ** (-frequency * times), 0.0)).sum(axis=1)
+    down = (cashflows * np.where(mask, (1 + (zero - bump) / frequency) ** (-frequency * times), 0.0)).sum(axis=1)
+    duration = (down - up) / (2 * price * bump)
+    convexity = (up + down - 2 * price) / (price * bump ** 2)
+
+    return pd.DataFrame({
+        "maturity": maturities, "coupon": coupons, "price": price,
+        "zero_rate": curve(maturities), "macaulay_duration": macaulay,
+        "modified_duration": duration, "convexity": convexity,
+    })
+
+
+def par_yields(curve, maturities, frequency=2):
+    """Coupon (percent) that prices each maturity at par off the curve."""
+    maturities = np.atleast_1d(np.asarray(maturities, dtype=float))
+    prices = bond_metrics(curve, np.r_[maturities, maturities], np.r_[np.zeros(len(maturities)), np.ones(len(maturities))],
+                          frequency=frequency)["price"].to_numpy()
+    zero_coupon, one_percent = prices[:len(maturities)], prices[len(maturities):]
+    return (100 - zero_coupon) / (one_percent - zero_coupon)
@@ -0,0 +1 @@
+"""Offline benchmarks for Break Bread hot paths."""
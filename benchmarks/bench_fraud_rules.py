@@ -0,0 +1,97 @@
+"""Fraud rules latency as rules are added: compiled engine vs. one ledger scan per rule.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_fraud_rules [--ledger 20000] [--json out.json]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.fraud_rules import DEFAULT_RULES, FeatureStore, RulesEngine
+
+
+def make_ledger(size, senders=500, seed=7):
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=30)
+    ledger = []
+    for i in range(size):
+        ledger.append({
+            "sender_id": f"user_{rng.randrange(senders)}",
+            "recipient_id": f"user_{rng.randrange(senders)}",
+            "amount": round(rng.lognormvariate(4, 1), 2),
+            "timestamp": start + timedelta(seconds=i * 30 * 86400 / size),
+        })
+    return ledger
+
+
+def make_rules(count):
+    """The default rules plus synthetic ones over the same shared features."""
+    rules = list(DEFAULT_RULES)
+    for i in range(max(0, count - len(rules))):
+        rules.append({
+            "name": f"synthetic_{i}",
+            "when": [("amount_zscore", ">", 3 + i * 0.01), ("hour", "in", (0, 1, 2, 3, 4))],
+            "action": "review",
+        })
+    return rules[:count]
+
+
+def legacy_check(ledger, candidate, rule_count):
+    """Per-rule ledger walks, as core.security_check did before the engine."""
+    cutoff = candidate["timestamp"] - timedelta(hours=24)
+    for _ in range(rule_count):
+        sum(1 for t in ledger if t["sender_id"] == candidate["sender_id"] and t["timestamp"] > cutoff)
+
+
+def time_per_call(fn, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ledger", type=int, default=20_000)
+    parser.add_argument("--calls", type=int, default=2_000)
+    parser.add_argument("--rules", type=int, nargs="+", default=[4, 16, 64, 256])
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    ledger = make_ledger(args.ledger)
+    store = FeatureStore()
+    store.rebuild(ledger)
+    now = ledger[-1]["timestamp"]
+    candidates = [
+        {"sender_id": t["sender_id"], "recipient_id": t["recipient_id"], "amount": t["amount"], "timestamp": now}
+        for t in random.Random(11).sample(ledger, min(args.calls, len(ledger)))
+    ]
+
+    results = []
+    print(f"{'rules':>6} {'engine us/txn':>14} {'legacy us/txn':>14}")
+    for count in args.rules:
+        engine = RulesEngine(make_rules(count), features=store)
+
+        def run_engine(i):
+            c = candidates[i % len(candidates)]
+            engine.check(None, c["sender_id"], c["recipient_id"], c["amount"], c["timestamp"], transaction_limit=1000.0)
+
+        def run_legacy(i):
+            legacy_check(ledger, candidates[i % len(candidates)], count)
+
+        engine_us = time_per_call(run_engine, args.calls)
+        # The legacy path is O(rules * ledger); sample fewer calls to keep the run short
+        legacy_us = time_per_call(run_legacy, max(1, args.calls // count // 10))
+        results.append({"rules": count, "engine_us": engine_us, "legacy_us": legacy_us})
+        print(f"{count:>6} {engine_us:>14.1f} {legacy_us:>14.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "fraud_rules", "ledger": args.ledger, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
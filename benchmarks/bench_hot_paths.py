@@ -0,0 +1,204 @@
+"""Ledger, lookup, security and market-data hot paths, offline and seeded.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_hot_paths [--only find_user security_check] [--quick] [--json out.json]
+    python -m benchmarks.bench_hot_paths --json new.json --compare baseline.json
+
+Each case reports the best of ``--repeat`` timings per operation. With
+``--compare`` every case is also shown as a ratio against an earlier JSON
+run, and the exit status is 1 if any case slowed down past ``--threshold``.
+"""
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks.fixtures import make_history, make_transfers, make_users, offline
+
+SIZES = {
+    "find_user": [10_000, 100_000, 1_000_000],
+    "security_check": [10_000, 100_000, 1_000_000],
+    "send_money": [10_000],
+    "user_activity_summary": [10_000, 100_000, 1_000_000],
+    "demo_prices": [30, 365, 3650],
+    "create_price_chart": [10_000, 100_000, 1_000_000],
+    "get_cached_data": [1],
+}
+QUICK = {name: sizes[:1] for name, sizes in SIZES.items()}
+
+
+def best(fn, repeat=5, number=1):
+    """Best seconds per call over ``repeat`` rounds of ``number`` calls."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return min(times)
+
+
+def session(users=None, transactions=None):
+    """Reset ``st.session_state`` to the given users and ledger."""
+    import streamlit as st
+    st.session_state.users = users or {}
+    st.session_state.transactions = transactions or []
+    st.session_state.requests = []
+
+
+# ----------------------------
+# Cases: each returns [(label, seconds per op), ...]
+# ----------------------------
+def bench_find_user(size, repeat):
+    from app.common import find_user
+    session(make_users(size))
+    last = f"member{size - 1}"
+    return [("hit (last user)", best(lambda: find_user(last), repeat)),
+            ("miss", best(lambda: find_user("nobody"), repeat))]
+
+
+def bench_security_check(size, repeat):
+    import core
+    from app.fraud_rules import fraud_engine
+    core.users_db.clear()
+    core.transactions_db.clear()
+    fraud_engine.features.rebuild([])
+    senders = max(size // 100, 2)
+    for i in range(senders):
+        user = core.User(f"user_{i}")
+        user.transaction_limit = 1e9
+        core.users_db[user.user_id] = user
+    for t in make_transfers(size, senders):
+        txn = core.Transaction(t["sender_id"], t["recipient_id"], min(t["amount"], 400), 0.0)
+        txn.timestamp = t["ts"]
+        core.record_transaction(txn)
+    # Fresh transaction ids (decisions are cached per id), amounts under the 2FA threshold so nothing prompts
+    probes = iter([core.Transaction("user_0", f"user_{i % senders}", 25.0, 0.0) for i in range(repeat * 100)])
+    return [("check", best(lambda: core.security_check(next(probes)), repeat, 100))]
+
+
+def bench_send_money(size, repeat):
+    from app.banking import send_money
+    users = make_users(size)
+    for user in users.values():
+        user["balance"] = 1e12
+    session(users)
+    recipients = [f"member{i}" for i in range(0, size, max(size // 100, 1))]
+
+    def burst():
+        for r in recipients:
+            send_money("user_0", r, 1.0)
+    per_burst = best(burst, repeat)
+    return [("transfer", per_burst / len(recipients))]
+
+
+def bench_user_activity_summary(size, repeat):
+    from app.analytics import user_activity_summary
+    session(transactions=make_transfers(size, 1000))
+    return [("summary", best(lambda: user_activity_summary("user_7"), repeat))]
+
+
+def bench_demo_prices(size, repeat):
+    from app.market_data import generate_metals_historical, get_crypto_demo_data, get_metals_demo_data
+    from app.utils import seed_price_path
+    return [
+        ("seed_price_path", best(lambda: seed_price_path(100.0, size, seed=1), repeat, 10)),
+        ("crypto demo", best(lambda: get_crypto_demo_data("bitcoin", size), repeat)),
+        ("metals demo", best(lambda: get_metals_demo_data("gold", size), repeat)),
+        ("metals history", best(lambda: generate_metals_historical(2000.0, size), repeat)),
+    ]
+
+
+def bench_create_price_chart(size, repeat):
+    from app.charts import figure_cache
+    from app.market_data import create_price_chart
+    history = make_history(size, freq="min")
+
+    def cold():
+        figure_cache.clear()
+        create_price_chart(history, "Fixture", symbol="FIX", period="max")
+    create_price_chart(history, "Fixture", symbol="FIX", period="max")
+    return [("cold (build + cache)", best(cold, repeat)),
+            ("warm (cache hit)", best(lambda: create_price_chart(history, "Fixture", symbol="FIX", period="max"), repeat))]
+
+
+def bench_get_cached_data(size, repeat):
+    import streamlit as st
+    from app.market_data import get_cached_data
+    symbols = ["AAPL", "MSFT", "SPY", "^GSPC", "BTC-USD"]
+
+    def cold():
+        st.cache_data.clear()
+        for s in symbols:
+            get_cached_data(s, "1y")
+    return [("cold (fixture fetch)", best(cold, repeat) / len(symbols)),
+            ("warm (st.cache_data hit)", best(lambda: get_cached_data("AAPL", "1y"), repeat, 100))]
+
+
+CASES = {name: globals()[f"bench_{name}"] for name in SIZES}
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {"python": platform.python_version(), "platform": platform.platform(), "commit": commit}
+
+
+def compare(results, baseline_path, threshold):
+    """Print new/old ratios; returns the regressed cases."""
+    with open(baseline_path) as f:
+        old = {(r["case"], r["size"], r["label"]): r["seconds"] for r in json.load(f)["results"]}
+    regressed = []
+    print(f"\n{'case':<24} {'size':>9} {'label':<26} {'ratio':>7}")
+    for r in results:
+        before = old.get((r["case"], r["size"], r["label"]))
+        if not before:
+            continue
+        ratio = r["seconds"] / before
+        flag = "  <-- slower" if ratio > 1 + threshold else ""
+        print(f"{r['case']:<24} {r['size']:>9,} {r['label']:<26} {ratio:>7.2f}{flag}")
+        if flag:
+            regressed.append(r)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=list(CASES), help="run just these cases")
+    parser.add_argument("--quick", action="store_true", help="smallest size of each case only")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="earlier --json output to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown ratio counted as a regression")
+    args = parser.parse_args()
+    # Session state is used outside a script run here; Streamlit warns about that on every access
+    import streamlit  # noqa: F401  (creates its loggers)
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+    sizes = QUICK if args.quick else SIZES
+    results = []
+    print(f"{'case':<24} {'size':>9} {'label':<26} {'per op':>12} {'ops/s':>12}")
+    with offline():
+        for name in args.only or CASES:
+            for size in sizes[name]:
+                for label, seconds in CASES[name](size, args.repeat):
+                    results.append({"case": name, "size": size, "label": label, "seconds": seconds})
+                    print(f"{name:<24} {size:>9,} {label:<26} {seconds * 1e6:>10,.1f}µs {1 / seconds:>12,.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "hot_paths", "environment": environment(), "results": results}, f, indent=2)
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
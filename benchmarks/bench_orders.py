@@ -0,0 +1,74 @@
+"""Order matching throughput (orders/second) for the batch matching loop.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_orders [--orders 200000] [--batch 1000] [--json out.json]
+"""
+import argparse
+import json
+import random
+import time
+
+from app.orders import InMemoryLedger, Order, OrderManager
+
+SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "BTC-USD", "ETH-USD"]
+
+
+def make_orders(count, users, seed=3):
+    rng = random.Random(seed)
+    orders = []
+    for _ in range(count):
+        symbol = rng.choice(SYMBOLS)
+        side = rng.choice(("buy", "sell"))
+        if rng.random() < 0.5:
+            orders.append(Order(f"user_{rng.randrange(users)}", symbol, side, rng.randint(1, 20)))
+        else:
+            limit = 100.0 * (1 + rng.uniform(-0.02, 0.02))
+            orders.append(Order(f"user_{rng.randrange(users)}", symbol, side, rng.randint(1, 20), "limit", limit))
+    return orders
+
+
+def run(count, batch, users):
+    ledger = InMemoryLedger({
+        f"user_{i}": {"user_id": f"user_{i}", "balance": 1e9, "portfolio": {s: 1e6 for s in SYMBOLS}}
+        for i in range(users)
+    })
+    rng = random.Random(5)
+    # A moving quote with enough size per batch that most marketable orders fill in one or two batches
+    manager = OrderManager(ledger, lambda symbol: (100.0 * (1 + rng.uniform(-0.01, 0.01)), batch * 5.0))
+    orders = make_orders(count, users)
+
+    start = time.perf_counter()
+    for i in range(0, count, batch):
+        for order in orders[i:i + batch]:
+            manager.submit(order)
+        manager.process_batch()
+    elapsed = time.perf_counter() - start
+
+    filled = sum(1 for o in orders if o.status == "filled")
+    return {"orders": count, "batch": batch, "seconds": elapsed, "orders_per_second": count / elapsed,
+            "filled": filled, "fills": len(ledger.transactions)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[100, 1000, 10_000])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'batch':>7} {'orders/s':>12} {'filled':>9} {'fills':>9}")
+    for batch in args.batch:
+        result = run(args.orders, batch, args.users)
+        results.append(result)
+        print(f"{batch:>7} {result['orders_per_second']:>12,.0f} {result['filled']:>9} {result['fills']:>9}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "orders", "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
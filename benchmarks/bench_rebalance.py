@@ -0,0 +1,56 @@
+"""Rebalancing plan latency: one interactive user vs. the nightly batch over many users.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_rebalance [--users 1 1000 100000] [--json out.json]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.rebalance import CLASSES, plan
+
+
+def make_values(users, seed=11):
+    rng = np.random.default_rng(seed)
+    values = rng.lognormal(7, 1.5, (users, len(CLASSES)))
+    values[:, [CLASSES.index("startups"), CLASSES.index("royalties")]] = 0.0
+    values[rng.random(values.shape) < 0.3] = 0.0  # most users hold only some classes
+    return values
+
+
+def run(users, repeat):
+    values = make_values(users)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        trades, fees = plan(values)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {"users": users, "seconds": best, "users_per_second": users / best,
+            "trades": int(np.count_nonzero(trades)), "fees": float(fees.sum())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 1000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'users':>9} {'ms':>10} {'users/s':>12} {'trades':>9}")
+    for users in args.users:
+        result = run(users, args.repeat)
+        results.append(result)
+        print(f"{users:>9} {result['seconds'] * 1000:>10.2f} {result['users_per_second']:>12,.0f} {result['trades']:>9}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "rebalance", "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
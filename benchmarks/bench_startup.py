@@ -0,0 +1,75 @@
+"""Cold-start time to first render of the login page.
+
+Each run is a fresh interpreter that imports Streamlit's test harness, then
+times ``AppTest.run()`` of ``streamlit_app.py`` up to the rendered login
+page, and records which heavy modules that render pulled in.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_startup [--runs 5] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP = "streamlit_app.py"
+# Modules the login page should not need
+HEAVY = ["pandas", "numpy", "yfinance", "requests", "app.investing", "app.fx", "core"]
+
+
+def render_once(app=APP):
+    """Time one cold render in this process (call from a fresh interpreter)."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.abspath(app), default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return {"seconds": elapsed, "login_rendered": any(b.label == "Login" for b in at.button),
+            "heavy_loaded": [m for m in HEAVY if m in sys.modules]}
+
+
+def run(runs, app=APP):
+    results = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child", "--app", app],
+                              capture_output=True, text=True)
+        if proc.returncode:
+            raise RuntimeError(proc.stderr[-2000:])
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--app", default=APP)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(render_once(args.app)))
+        return
+
+    results = run(args.runs, args.app)
+    seconds = [r["seconds"] for r in results]
+    print(f"{'run':>4} {'first render ms':>16} {'login':>6}  heavy modules loaded")
+    for i, r in enumerate(results, 1):
+        print(f"{i:>4} {r['seconds'] * 1000:>16,.0f} {'yes' if r['login_rendered'] else 'no':>6}  {', '.join(r['heavy_loaded']) or '-'}")
+    print(f"median {statistics.median(seconds) * 1000:,.0f} ms, min {min(seconds) * 1000:,.0f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "startup", "app": args.app, "median_seconds": statistics.median(seconds),
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
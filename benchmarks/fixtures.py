@@ -0,0 +1,190 @@
+"""Deterministic local data for the benchmarks; nothing here touches the network.
+
+``offline()`` swaps Yahoo for seeded fixture histories, points FiscalData at
+the recorded fixture served on localhost, and makes any other outbound
+HTTP request fail fast, so a benchmark can't silently measure a network.
+``serve_plaid()`` stands in for the Plaid sandbox when load-testing the
+backend (start it with ``PLAID_HOST`` pointed at the stub).
+"""
+import json
+import os
+import random
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+SEED = 42
+PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 21, "3mo": 63, "6mo": 126, "1y": 252, "2y": 504, "5y": 1260}
+
+
+# ----------------------------
+# Users and ledgers (session-state shapes)
+# ----------------------------
+def make_users(count, seed=SEED):
+    """``{user_id: user}`` like ``st.session_state.users``."""
+    rng = random.Random(seed)
+    return {
+        f"user_{i}": {"user_id": f"user_{i}", "app_id": f"member{i}", "email": f"member{i}@example.com",
+                      "balance": float(rng.randint(100, 10_000)), "portfolio": {}}
+        for i in range(count)
+    }
+
+
+def make_transfers(count, users, seed=SEED):
+    """Transaction dicts like ``st.session_state.transactions``."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    return [
+        {"transaction_id": f"t{i}", "sender_id": f"user_{rng.randrange(users)}",
+         "recipient_id": f"user_{rng.randrange(users)}", "amount": round(rng.lognormvariate(3, 1), 2),
+         "fee": 0.0, "note": "", "status": "completed", "ts": start + timedelta(minutes=i)}
+        for i in range(count)
+    ]
+
+
+# ----------------------------
+# Price histories
+# ----------------------------
+def make_history(points, freq="D", start="2000-01-03", base=100.0, seed=SEED):
+    """Seeded OHLCV frame shaped like ``yfinance`` ``history()`` output."""
+    rng = np.random.default_rng(seed)
+    close = base * np.exp(np.cumsum(rng.normal(0, 0.01, points)))
+    spread = np.abs(rng.normal(0, 0.005, points)) * close
+    index = pd.date_range(start, periods=points, freq=freq, tz="America/New_York")
+    return pd.DataFrame({
+        "Open": np.r_[base, close[:-1]], "High": close + spread, "Low": close - spread,
+        "Close": close, "Volume": rng.integers(1_000, 1_000_000, points),
+    }, index=index)
+
+
+class FixtureTicker:
+    """Stand-in for ``yfinance.Ticker`` serving ``make_history`` per symbol."""
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.info = {}
+
+    def history(self, period="1mo", **kwargs):
+        days = PERIOD_DAYS.get(period, 21)
+        seed = sum(map(ord, self.symbol))
+        return make_history(days, freq="B", start=(datetime(2025, 9, 24) - timedelta(days=days * 7 // 5)).date(),
+                            base=50 + seed % 400, seed=seed)
+
+
+def fixture_download(tickers, period="1mo", group_by="column", **kwargs):
+    """Stand-in for ``yfinance.download``: the ``FixtureTicker`` histories side by side, keyed by ticker."""
+    tickers = tickers.split() if isinstance(tickers, str) else list(tickers)
+    return pd.concat({t: FixtureTicker(t).history(period) for t in tickers}, axis=1)
+
+
+@contextmanager
+def offline():
+    """Run with fixture market data and no outbound network.
+
+    Enter it before importing ``core`` so the audit log also lands in the
+    temporary directory.
+    """
+    import requests
+    from data_providers.fiscaldata import FiscalDataStore, serve_fixtures
+
+    server = serve_fixtures(port=0)
+    local = f"http://127.0.0.1:{server.server_address[1]}"
+    real_request = requests.Session.request
+
+    def request(session, method, url, *args, **kwargs):
+        if urlparse(url).hostname not in ("127.0.0.1", "localhost"):
+            raise requests.ConnectionError(f"benchmarks run offline: {url}")
+        return real_request(session, method, url, *args, **kwargs)
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.dict(os.environ, {"BREAKBREAD_AUDIT_DIR": os.path.join(tmp, "audit")}), \
+            mock.patch("yfinance.Ticker", FixtureTicker), \
+            mock.patch("yfinance.download", fixture_download), \
+            mock.patch.object(requests.Session, "request", request), \
+            mock.patch("data_providers.fiscaldata._store",
+                       FiscalDataStore(os.path.join(tmp, "fiscaldata.sqlite"), f"{local}/avg_interest_rates")):
+        try:
+            yield local
+        finally:
+            server.shutdown()
+
+
+# ----------------------------
+# Plaid sandbox stub
+# ----------------------------
+def plaid_accounts(access_token):
+    rng = random.Random(access_token)
+    return [
+        {"account_id": f"acc-{access_token[-8:]}-{kind}", "name": f"Plaid {kind.title()}", "official_name": None,
+         "mask": f"{rng.randrange(10_000):04d}", "type": "depository", "subtype": kind,
+         "balances": {"available": balance, "current": balance, "limit": None,
+                      "iso_currency_code": "USD", "unofficial_currency_code": None}}
+        for kind, balance in (("checking", round(rng.uniform(100, 5000), 2)), ("savings", round(rng.uniform(1000, 20000), 2)))
+    ]
+
+
+def plaid_transactions(access_token, count=25):
+    rng = random.Random(access_token)
+    accounts = plaid_accounts(access_token)
+    return [
+        {"transaction_id": f"tx-{access_token[-8:]}-{i}", "account_id": rng.choice(accounts)["account_id"],
+         "amount": round(rng.lognormvariate(3, 1), 2), "iso_currency_code": "USD", "unofficial_currency_code": None,
+         "date": (datetime(2025, 9, 24) - timedelta(days=i)).date().isoformat(), "name": f"Merchant {rng.randrange(50)}",
+         "pending": False, "payment_channel": "online", "category": None, "category_id": None}
+        for i in range(count)
+    ]
+
+
+def plaid_handler():
+    def reply(body):
+        return {**body, "request_id": uuid.uuid4().hex[:15]}
+
+    routes = {
+        "/link/token/create": lambda req: reply({
+            "link_token": f"link-sandbox-{uuid.uuid4()}",
+            "expiration": (datetime.utcnow() + timedelta(hours=4)).strftime("%Y-%m-%dT%H:%M:%SZ")}),
+        "/item/public_token/exchange": lambda req: reply({
+            "access_token": f"access-sandbox-{req.get('public_token', '')[-12:]}", "item_id": f"item-{uuid.uuid4().hex[:12]}"}),
+        "/accounts/get": lambda req: reply({
+            "accounts": plaid_accounts(req.get("access_token", "")),
+            "item": {"item_id": "item-stub", "institution_id": "ins_109508", "webhook": "", "error": None,
+                     "available_products": [], "billed_products": ["auth", "transactions"], "consent_expiration_time": None,
+                     "update_type": "background"}}),
+        "/transactions/sync": lambda req: reply({
+            "added": plaid_transactions(req.get("access_token", "")), "modified": [], "removed": [],
+            "next_cursor": "cursor-stub", "has_more": False}),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            route = routes.get(self.path)
+            if route is None:
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.dumps(route(json.loads(self.rfile.read(length) or b"{}"))).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve_plaid(port=0):
+    """Serve the Plaid endpoints the backend calls on ``http://127.0.0.1:<port>``; returns the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), plaid_handler())
+    threading.Thread(target=server.serve_forever, name="plaid-stub", daemon=True).start()
+    return server
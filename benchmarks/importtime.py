@@ -0,0 +1,66 @@
+"""Import-time report from ``python -X importtime`` for a module.
+
+Run from the repo root:
+
+    python -m benchmarks.importtime [streamlit_app] [--top 25] [--json out.json]
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile(module):
+    """``-X importtime`` rows for a fresh interpreter importing ``module``: (name, self_us, cumulative_us, depth)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for match in LINE.finditer(proc.stderr):
+        self_us, cumulative_us, indent, name = match.groups()
+        rows.append({"module": name, "self_us": int(self_us), "cumulative_us": int(cumulative_us),
+                     "depth": len(indent) // 2})
+    return rows
+
+
+def by_package(rows):
+    """Self time summed per top-level package, largest first."""
+    totals = defaultdict(int)
+    for row in rows:
+        totals[row["module"].split(".")[0]] += row["self_us"]
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module", nargs="?", default="streamlit_app")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows = profile(args.module)
+    total = sum(r["self_us"] for r in rows)
+    packages = by_package(rows)
+    print(f"import {args.module}: {total / 1000:,.0f} ms across {len(rows)} modules\n")
+    print(f"{'package':<32} {'self ms':>9} {'share':>7}")
+    for name, self_us in packages[:args.top]:
+        print(f"{name:<32} {self_us / 1000:>9,.1f} {self_us / total:>7.1%}")
+    print(f"\n{'module (cumulative)':<48} {'cum ms':>9} {'self ms':>9}")
+    for row in sorted(rows, key=lambda r: -r["cumulative_us"])[:args.top]:
+        print(f"{row['module']:<48} {row['cumulative_us'] / 1000:>9,.1f} {row['self_us'] / 1000:>9,.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "importtime", "module": args.module, "total_us": total,
+                       "packages": [{"package": n, "self_us": us} for n, us in packages], "modules": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
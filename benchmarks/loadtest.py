@@ -0,0 +1,254 @@
+"""Concurrent-user load test: throughput, p50/p99 latency and error rate per concurrency level.
+
+Run from the repo root:
+
+    python -m benchmarks.loadtest [--users 5000] [--concurrency 1 10 50 200] [--duration 10] [--json out.json]
+    python -m benchmarks.loadtest --target http --url http://127.0.0.1:8000 --plaid-stub 8766 --users 500
+
+Each worker thread is one active session in a closed loop: pick an action
+from ``--mix``, wait for it, sleep ``--think`` seconds (exponential, mean),
+repeat. Levels run one after another for ``--duration`` seconds each.
+
+``core`` (the default) runs in-process against ``core``'s users and ledger
+and the app's cached market-data lookups, with Yahoo and FiscalData served
+from fixtures and every other outbound request refused. Like Streamlit
+sessions it shares one process, so its ceiling includes the GIL.
+
+``http`` drives a running backend (login, history, linked accounts, Plaid
+link tokens). Start the backend with ``PLAID_HOST`` pointed at the stub
+this command serves on ``--plaid-stub`` and ``DATABASE_URL`` at a
+throwaway database; users ``load0``... are registered first unless
+``--no-register`` is given.
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.fixtures import SEED, offline, serve_plaid
+
+MIXES = {
+    "core": {"login": 30, "send": 30, "history": 25, "markets": 15},
+    "http": {"login": 20, "history": 40, "accounts": 30, "link": 10},
+}
+PASSWORD = "loadtest123"
+SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "SPY", "^GSPC", "BTC-USD"]
+PERIODS = ["1d", "5d", "1mo", "1y"]
+
+
+# ----------------------------
+# Targets: one method per action, taking the worker's rng; return an outcome or raise on error
+# ----------------------------
+class CoreTarget:
+    """Synthetic users in ``core.users_db``; actions call the same functions the app does."""
+
+    def __init__(self, users):
+        import core
+        from app.fraud_rules import fraud_engine
+        from app.market_data import get_cached_data
+        self.core, self.get_cached_data, self.users = core, get_cached_data, users
+        core.users_db.clear()
+        core.transactions_db.clear()
+        fraud_engine.features.rebuild([])
+        password_hash = core.hash_password(PASSWORD)
+        for i in range(users):
+            user = core.User(f"load_{i}", email=f"load{i}@example.com", app_id=f"load{i}", password_hash=password_hash)
+            user.balance = 1e6
+            user.verified = True
+            core.users_db[user.user_id] = user
+
+    def login(self, rng):
+        user = self.core.lookup_user(f"load{rng.randrange(self.users)}")
+        if user is None or not self.core.verify_password(user.password_hash, PASSWORD):
+            raise RuntimeError("login failed")
+
+    def send(self, rng):
+        # Under the 2FA threshold so security_check never prompts; the 24h frequency rule still blocks busy senders
+        sender, recipient = rng.sample(range(self.users), 2)
+        return self.core.transfer(f"load_{sender}", f"load_{recipient}", round(rng.uniform(1, 200), 2), 0.0).status
+
+    def history(self, rng):
+        self.core.transaction_history(f"load_{rng.randrange(self.users)}")
+
+    def markets(self, rng):
+        if self.get_cached_data(rng.choice(SYMBOLS), rng.choice(PERIODS)) is None:
+            raise RuntimeError("no market data")
+
+
+class HttpTarget:
+    """Backend endpoints over HTTP, one ``requests.Session`` and bearer token cache per worker thread."""
+
+    def __init__(self, url, users, register=True):
+        import requests
+        self.requests, self.url, self.users = requests, url.rstrip("/"), users
+        self._local = threading.local()
+        if register:
+            with ThreadPoolExecutor(32) as pool:
+                list(pool.map(self._register, range(users)))
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session, self._local.tokens = self.requests.Session(), {}
+        return self._local.session
+
+    def _register(self, i):
+        response = self._session().post(f"{self.url}/register", json={
+            "app_id": f"load{i}", "email": f"load{i}@example.com", "password": PASSWORD, "full_name": f"Load {i}"})
+        if response.status_code not in (200, 400):  # 400: already registered by an earlier run
+            response.raise_for_status()
+
+    def _login(self, i):
+        response = self._session().post(f"{self.url}/login", json={"username": f"load{i}", "password": PASSWORD})
+        response.raise_for_status()
+        self._local.tokens[i] = response.json()["access_token"]
+        return self._local.tokens[i]
+
+    def _authed(self, method, path, rng):
+        i = rng.randrange(self.users)
+        self._session()
+        token = self._local.tokens.get(i) or self._login(i)
+        response = self._local.session.request(method, f"{self.url}{path}", headers={"Authorization": f"Bearer {token}"})
+        response.raise_for_status()
+
+    def login(self, rng):
+        self._session()
+        self._login(rng.randrange(self.users))
+
+    def history(self, rng):
+        self._authed("GET", "/transactions", rng)
+
+    def accounts(self, rng):
+        self._authed("GET", "/accounts", rng)
+
+    def link(self, rng):
+        self._authed("POST", "/create_link_token", rng)
+
+
+# ----------------------------
+# Load loop
+# ----------------------------
+def run_level(target, mix, concurrency, duration, think=0.0, seed=SEED):
+    """Drive ``target`` with ``concurrency`` sessions for ``duration`` seconds; returns the level's summary."""
+    actions, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + duration
+
+    def session(worker):
+        rng = random.Random(seed * 100_003 + worker)
+        samples = []
+        while time.perf_counter() < deadline:
+            action = rng.choices(actions, weights)[0]
+            start = time.perf_counter()
+            try:
+                outcome = getattr(target, action)(rng) or "ok"
+            except Exception as e:
+                outcome = f"error:{type(e).__name__}"
+            samples.append((action, time.perf_counter() - start, outcome))
+            if think:
+                time.sleep(rng.expovariate(1 / think))
+        return samples
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        samples = [s for chunk in pool.map(session, range(concurrency)) for s in chunk]
+    return summarize(samples, concurrency, time.perf_counter() - start)
+
+
+def _latency(seconds):
+    if not seconds:
+        return {"p50_ms": None, "p99_ms": None}
+    p50, p99 = np.percentile(seconds, [50, 99]) * 1000
+    return {"p50_ms": float(p50), "p99_ms": float(p99)}
+
+
+def summarize(samples, concurrency, elapsed):
+    by_action = defaultdict(list)
+    for action, seconds, outcome in samples:
+        by_action[action].append((seconds, outcome))
+    errors = sum(1 for _, _, outcome in samples if outcome.startswith("error"))
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "seconds": elapsed,
+        "throughput": len(samples) / elapsed,
+        **_latency([s for _, s, _ in samples]),
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "actions": {
+            action: {"requests": len(rows), **_latency([s for s, _ in rows]),
+                     "outcomes": dict(Counter(outcome for _, outcome in rows))}
+            for action, rows in sorted(by_action.items())
+        },
+    }
+
+
+def parse_mix(text):
+    """``login=30,send=30`` -> ``{"login": 30.0, "send": 30.0}``."""
+    mix = {}
+    for part in text.split(","):
+        action, _, weight = part.partition("=")
+        mix[action.strip()] = float(weight or 1)
+    return mix
+
+
+def run_levels(target, mix, args):
+    results = []
+    print(f"{'sessions':>8} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for concurrency in args.concurrency:
+        result = run_level(target, mix, concurrency, args.duration, args.think)
+        results.append(result)
+        print(f"{concurrency:>8} {result['requests']:>9,} {result['throughput']:>9,.0f} {result['p50_ms'] or 0:>9.2f} "
+              f"{result['p99_ms'] or 0:>9.2f} {result['error_rate']:>8.2%}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=list(MIXES), default="core")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="backend base URL (http target)")
+    parser.add_argument("--users", type=int, default=5000, help="synthetic user accounts")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 200], help="concurrent sessions per level")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--think", type=float, default=0.0, help="mean think time between a session's actions (s)")
+    parser.add_argument("--mix", type=parse_mix, help="action weights, e.g. login=30,send=30,history=25,markets=15")
+    parser.add_argument("--plaid-stub", type=int, metavar="PORT", help="serve the Plaid stub on this port during the run")
+    parser.add_argument("--no-register", action="store_true", help="http target: the load users already exist")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    # Cached lookups run outside a Streamlit script run here; Streamlit warns about that on every call
+    import streamlit  # noqa: F401  (creates its loggers)
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+    mix = args.mix or MIXES[args.target]
+    unknown = [a for a in mix if a.startswith("_") or not hasattr(CoreTarget if args.target == "core" else HttpTarget, a)]
+    if unknown:
+        parser.error(f"unknown {args.target} actions: {', '.join(unknown)}")
+
+    plaid = serve_plaid(args.plaid_stub) if args.plaid_stub is not None else None
+    results = []
+    try:
+        if args.target == "core":
+            with offline():
+                target = CoreTarget(args.users)
+                results = run_levels(target, mix, args)
+        else:
+            target = HttpTarget(args.url, args.users, register=not args.no_register)
+            results = run_levels(target, mix, args)
+    finally:
+        if plaid:
+            plaid.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"benchmark": "loadtest", "target": args.target, "users": args.users, "mix": mix,
+                       "duration": args.duration, "think": args.think, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
+import os
 import uuid
 import hashlib
-from datetime import datetime, timedelta
+import threading
+from datetime import datetime
+from app.audit_log import AuditLog
+from app.fraud_rules import fraud_engine
+from app.lots import lot_ledger
+from app.price_oracle import PriceOracle
 
 # ----------------------------
 # Database Simulation (Using dictionaries)
@@ -8,7 +14,7 @@ from datetime import datetime, timedelta
 users_db = {}
 transactions_db = []
 
-# Prices updated Sep 24, 2025 (see sources in PR)
+# Seed prices from Sep 24, 2025 (see sources in PR); live prices are read through price_oracle
 investment_assets = {
     "gold":           {"price_per_ounce": 3734.04,  "fee_percent": 0.02},  # Reuters
     "silver":         {"price_per_ounce": 44.13,    "fee_percent": 0.02},  # APMEX
@@ -16,9 +22,22 @@ investment_assets = {
     "treasury_bonds": {"price_per_unit":  101.753345, "fee_percent": 0.01} # TreasuryDirect (per $100 face)
 }
 
+price_oracle = PriceOracle(
+    {a: v.get("price_per_ounce", v.get("price_per_unit")) for a, v in investment_assets.items()},
+    seed_source="Seed prices (Sep 24, 2025)",
+)
+
+investments_db = []
 user_portfolios = {}
 break_bread_fund = 0.0
-security_logs = []
+# Serializes balance checks and updates so concurrent transfers can't overdraw
+_transfer_lock = threading.Lock()
+# One per sender, held from the fraud check until the transfer is recorded, so the
+# velocity rules (unusual_activity) see every earlier send from that sender
+_sender_locks = {}
+_sender_locks_lock = threading.Lock()
+# Append-only, written in the background; query with security_logs.by_transaction()/by_event()
+security_logs = AuditLog(os.environ.get("BREAKBREAD_AUDIT_DIR", "logs/audit"))
 
 # ----------------------------
 # Core Models
@@ -73,13 +92,15 @@ class Transaction:
         }
 
 class Investment:
-    def __init__(self, user_id, asset_type, amount, units, fee):
+    def __init__(self, user_id, asset_type, amount, units, fee, price=None, price_version=None):
         self.investment_id = str(uuid.uuid4())
         self.user_id = user_id
         self.asset_type = asset_type
         self.amount = amount
         self.units = units
         self.fee = fee
+        self.price = price
+        self.price_version = price_version
         self.timestamp = datetime.now()
         
     def to_dict(self):
@@ -90,6 +111,8 @@ class Investment:
             "amount": self.amount,
             "units": self.units,
             "fee": self.fee,
+            "price": self.price,
+            "price_version": self.price_version,
             "timestamp": self.timestamp.isoformat()
         }
 
@@ -138,66 +161,90 @@ def link_funding_source(user_id):
     else:
         print("Invalid selection. Please choose 1 (Bank) or 2 (Crypto).")
 
+def asset_price(asset_type):
+    """(price, snapshot version) for an investment asset; never waits on a refresh."""
+    price_oracle.start()
+    return price_oracle.price(asset_type)
+
+def record_transaction(transaction):
+    """Append to the ledger and fold it into the shared fraud feature aggregates."""
+    transactions_db.append(transaction)
+    fraud_engine.features.observe(
+        transaction.sender_id, transaction.recipient_id, transaction.amount, transaction.timestamp
+    )
+
+def transaction_history(user_id, limit=50):
+    """The user's most recent transactions, newest first."""
+    mine = [t for t in transactions_db if t.sender_id == user_id or t.recipient_id == user_id]
+    return mine[::-1][:limit]
+
+def lookup_user(identifier):
+    """User by phone, email or App ID."""
+    return next((
+        u for u in users_db.values()
+        if u.phone == identifier or
+           u.email == identifier or
+           u.app_id == identifier
+    ), None)
+
 def security_check(transaction):
-    """Perform security and fraud detection checks."""
+    """Perform security and fraud detection checks (rules live in app.fraud_rules)."""
     sender = users_db[transaction.sender_id]
+    decision = fraud_engine.check(
+        transaction.transaction_id,
+        transaction.sender_id,
+        transaction.recipient_id,
+        transaction.amount,
+        transaction_limit=sender.transaction_limit,
+    )
+    for hit in decision.hits:
+        security_logs.log(hit.name, transaction.transaction_id, details=hit.details, sender_id=transaction.sender_id)
 
-    # Check 1: Transaction amount within limits
-    if transaction.amount > sender.transaction_limit:
-        security_logs.append({
-            "timestamp": datetime.now(),
-            "event": "transaction_over_limit",
-            "transaction_id": transaction.transaction_id,
-            "details": f"Amount: {transaction.amount}, Limit: {sender.transaction_limit}"
-        })
+    if decision.action == "block":
         return False
-    
-    # Check 2: Unusual transaction pattern (simplified)
-    recent_transactions = [
-        t for t in transactions_db 
-        if t.sender_id == transaction.sender_id and 
-           t.timestamp > datetime.now() - timedelta(hours=24)
-    ]
-    if len(recent_transactions) > 10:
-        security_logs.append({
-            "timestamp": datetime.now(),
-            "event": "unusual_activity",
-            "transaction_id": transaction.transaction_id,
-            "details": f"High frequency: {len(recent_transactions)} transactions in 24h"
-        })
-        return False
-    
-    # Check 3: Large amount to new recipient
-    previous_to_recipient = any(
-        t.recipient_id == transaction.recipient_id 
-        for t in transactions_db 
-        if t.sender_id == transaction.sender_id
-    )
-    if transaction.amount > 500 and not previous_to_recipient:
-        security_logs.append({
-            "timestamp": datetime.now(),
-            "event": "large_amount_new_recipient",
-            "transaction_id": transaction.transaction_id,
-            "details": f"Amount: {transaction.amount}, New recipient: {transaction.recipient_id}"
-        })
+    if decision.action == "2fa":
         additional_auth = input("Large transfer to new recipient. Confirm with 2FA code: ")
         if additional_auth != "123456":  # Simulated 2FA verification
             return False
-    
     return True
 
+def _sender_lock(sender_id):
+    with _sender_locks_lock:
+        return _sender_locks.setdefault(sender_id, threading.Lock())
+
+def transfer(sender_id, recipient_id, amount, fee, note=""):
+    """Run security checks and move the money; returns the transaction (completed, flagged or failed).
+
+    One sender's transfers run one at a time, so concurrent sends can't all
+    pass the frequency rule before any of them is recorded.
+    """
+    global break_bread_fund
+    t = Transaction(sender_id, recipient_id, amount, fee, note)
+    with _sender_lock(sender_id):
+        if not security_check(t):
+            t.status = "flagged"
+            record_transaction(t)
+            return t
+
+        sender, recipient = users_db[sender_id], users_db[recipient_id]
+        with _transfer_lock:
+            if sender.balance < amount + fee:
+                t.status = "failed"  # raced below the balance checked before the transfer; nothing recorded
+                return t
+            sender.balance -= (amount + fee)
+            recipient.balance += amount
+            break_bread_fund += fee
+            t.status = "completed"
+        record_transaction(t)
+    return t
+
 def p2p_transaction(sender_id):
     """Algorithm for peer-to-peer money transfer."""
     print("=== Break Bread P2P Transaction ===")
     recipient_identifier = input("Enter recipient's phone, email, or App ID: ")
 
     # Lookup recipient
-    recipient = next((
-        u for u in users_db.values()
-        if u.phone == recipient_identifier or 
-           u.email == recipient_identifier or 
-           u.app_id == recipient_identifier
-    ), None)
+    recipient = lookup_user(recipient_identifier)
 
     if not recipient:
         print("Recipient not found. Please check the identifier and try again.")
@@ -224,22 +271,13 @@ def p2p_transaction(sender_id):
     print(f"Transaction fee: ${fee:.2f}. Total debit: ${amount + fee:.2f}")
     input("Authenticate (press Enter to simulate)... ")
 
-    # Build and run security checks
-    t = Transaction(sender_id, recipient.user_id, amount, fee, note)
-    if not security_check(t):
-        t.status = "flagged"
-        transactions_db.append(t)
+    t = transfer(sender_id, recipient.user_id, amount, fee, note)
+    if t.status == "flagged":
         print("Transaction flagged for security review.")
         return False
-
-    # Execute
-    sender.balance -= (amount + fee)
-    recipient.balance += amount
-    t.status = "completed"
-
-    global break_bread_fund
-    break_bread_fund += fee
-    transactions_db.append(t)
+    if t.status == "failed":
+        print("Insufficient balance.")
+        return False
 
     print(f"Transaction completed! ${amount:.2f} sent to {recipient.app_id}.")
     print(f"New balance: ${sender.balance:.2f}")
@@ -259,13 +297,13 @@ def investment_portfolio(user_id):
         asset_type = asset_types[choice-1]
         asset = investment_assets[asset_type]
 
-        # Price & fee display
-        if asset_type in ["gold", "silver", "platinum"]:
-            price_key = "price_per_ounce"
-        else:
-            price_key = "price_per_unit"  # per $100 face for treasuries
+        # Price & fee display; the trade executes at this snapshot even if a refresh lands meanwhile
+        # (per ounce for metals, per $100 face for treasuries)
+        price_oracle.start()
+        snapshot = price_oracle.current()
+        price, price_version = snapshot.prices[asset_type], snapshot.version
 
-        print(f"Current price: ${asset[price_key]:,.6f}")
+        print(f"Current price: ${price:,.6f} ({snapshot.sources[asset_type]}, v{price_version})")
         print(f"Fee: {asset['fee_percent'] * 100:.2f}%")
 
         # Amount input
@@ -275,7 +313,7 @@ def investment_portfolio(user_id):
             return False
 
         # Units calculation
-        units = investment_amount / asset[price_key]
+        units = investment_amount / price
 
         # Commission calculation
         commission = round(investment_amount * asset['fee_percent'], 2)
@@ -300,6 +338,8 @@ def investment_portfolio(user_id):
         if user_id not in user_portfolios:
             user_portfolios[user_id] = {}
         user_portfolios[user_id][asset_type] = user_portfolios[user_id].get(asset_type, 0.0) + units
+        lot_ledger.buy(user_id, asset_type, units, price, commission)
+        investments_db.append(Investment(user_id, asset_type, investment_amount, units, commission, price, price_version))
 
         global break_bread_fund
         break_bread_fund += commission
@@ -1,7 +1,9 @@
 import streamlit as st
 from datetime import datetime
 import random
+from app.metrics import timed
 
+@timed("alternative.get_startup_investments", track_demo=False)
 def get_startup_investments():
     """Demo data for startup investing platforms."""
     platforms = [
@@ -16,6 +18,7 @@ def get_startup_investments():
         'last_updated': datetime.now()
     }
 
+@timed("alternative.get_royalty_investments", track_demo=False)
 def get_royalty_investments():
     """Demo data for royalty investing."""
     royalties = [
@@ -30,6 +33,7 @@ def get_royalty_investments():
         'last_updated': datetime.now()
     }
 
+@timed("alternative.get_business_listings", track_demo=False)
 def get_business_listings():
     """Demo data for business marketplaces."""
     businesses = [
@@ -0,0 +1,106 @@
+"""Shared quote and bar schema, and the interface every market-data backend implements.
+
+Symbols are Yahoo-style everywhere (``AAPL``, ``^GSPC``, ``BTC-USD``), plus
+``XAU-USD``/``XAG-USD``/``XPT-USD`` for spot metals and
+``UST-1M``/``UST-2Y``/``UST-10Y`` for Treasury yields (in percent). A
+quote is a ``Quote``; bars are a DataFrame of ``BAR_COLUMNS`` on a
+DatetimeIndex, the shape yfinance returns and ``app.charts`` plots.
+"""
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+from app.lazy import lazy_module
+
+pd = lazy_module("pandas")
+
+ASSET_CLASSES = ("equity", "index", "crypto", "metal", "treasury")
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+METALS = {"XAU-USD": "gold", "XAG-USD": "silver", "XPT-USD": "platinum"}
+TREASURIES = {"UST-1M": 1 / 12, "UST-2Y": 2.0, "UST-10Y": 10.0}  # symbol -> maturity in years
+PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 30, "3mo": 90, "6mo": 180, "1y": 365, "2y": 730, "5y": 1825, "max": 3650}
+
+
+class ProviderError(Exception):
+    """A backend could not serve the request (bad response, no data)."""
+
+
+class Unsupported(ProviderError):
+    """A backend doesn't offer this kind of data at all; not counted as a failure."""
+
+
+def asset_class(symbol):
+    symbol = symbol.upper()
+    if symbol in METALS:
+        return "metal"
+    if symbol in TREASURIES:
+        return "treasury"
+    if symbol.startswith("^"):
+        return "index"
+    if symbol.endswith("-USD"):
+        return "crypto"
+    return "equity"
+
+
+@dataclass(frozen=True)
+class Quote:
+    symbol: str
+    price: float
+    change_percent: float = 0.0
+    source: str = ""
+    as_of: datetime = field(default_factory=datetime.now)
+
+    @property
+    def asset_class(self):
+        return asset_class(self.symbol)
+
+    @property
+    def is_demo(self):
+        return "demo" in self.source.lower()
+
+    def to_dict(self):
+        return {**asdict(self), "asset_class": self.asset_class}
+
+
+def bars_frame(index, close, open=None, high=None, low=None, volume=None):
+    """Bars in the shared schema; a close-only series gets flat OHLC and zero volume."""
+    frame = pd.DataFrame({"Close": close}, index=pd.DatetimeIndex(index), dtype=float)
+    frame["Open"] = frame["Close"] if open is None else open
+    frame["High"] = frame["Close"] if high is None else high
+    frame["Low"] = frame["Close"] if low is None else low
+    frame["Volume"] = 0.0 if volume is None else volume
+    return frame[BAR_COLUMNS]
+
+
+def quote_from_bars(symbol, bars, source):
+    """Last close and its change from the previous bar."""
+    close = bars["Close"]
+    price = float(close.iloc[-1])
+    previous = float(close.iloc[-2]) if len(close) > 1 else price
+    as_of = bars.index[-1].to_pydatetime() if hasattr(bars.index[-1], "to_pydatetime") else datetime.now()
+    return Quote(symbol, price, (price - previous) / previous * 100 if previous else 0.0, source, as_of)
+
+
+class MarketDataProvider:
+    """A quote/bar backend. Subclasses set ``name``, ``source`` and ``asset_classes`` and implement ``quotes``."""
+
+    name = "provider"
+    source = ""  # shown to users next to the numbers, and marks demo data
+    asset_classes = ()
+
+    def available(self):
+        """Configured and usable at all (e.g. has its API key)."""
+        return True
+
+    def supports(self, symbol):
+        return asset_class(symbol) in self.asset_classes
+
+    def quotes(self, symbols):
+        """``{symbol: Quote}`` for the symbols this backend could price, in as few upstream calls as it can."""
+        raise NotImplementedError
+
+    def quote(self, symbol):
+        return self.quotes([symbol]).get(symbol)
+
+    def bars(self, symbol, period="1mo"):
+        """Bars in the shared schema; raises ``Unsupported`` when the backend has no history."""
+        raise Unsupported(f"{self.name} has no bar history")
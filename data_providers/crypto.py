@@ -1,46 +1,82 @@
 import requests
 import streamlit as st
 from datetime import datetime
+from app.breaker import CircuitOpen, call, protected
+from app.metrics import record_error, record_response, timed
+from data_providers.base import MarketDataProvider, PERIOD_DAYS, ProviderError, Quote, bars_frame
 
+PRICE_URL = "https://api.coingecko.com/api/v3/simple/price"
+CHART_URL = "https://api.coingecko.com/api/v3/coins/{}/market_chart"
+COINGECKO_IDS = {
+    'BTC-USD': 'bitcoin',
+    'ETH-USD': 'ethereum',
+    'ADA-USD': 'cardano',
+    'SOL-USD': 'solana'
+}
+
+class CoinGeckoProvider(MarketDataProvider):
+    """Crypto spot prices (one request for any number of coins) and daily closes."""
+
+    name = "coingecko"
+    source = "CoinGecko API"
+    asset_classes = ("crypto",)
+
+    def supports(self, symbol):
+        return symbol in COINGECKO_IDS
+
+    def _get(self, url, params):
+        response = record_response("coingecko", call("coingecko", requests.get, url, params=params, timeout=10))
+        if response.status_code != 200:
+            raise ProviderError(f"CoinGecko returned {response.status_code}")
+        return response.json()
+
+    @timed("coingecko.quotes", track_demo=False)
+    def quotes(self, symbols):
+        ids = {COINGECKO_IDS[s]: s for s in symbols if s in COINGECKO_IDS}
+        if not ids:
+            return {}
+        data = self._get(PRICE_URL, {'ids': ','.join(ids), 'vs_currencies': 'usd', 'include_24hr_change': 'true'})
+        return {
+            symbol: Quote(symbol, float(data[coin_id]['usd']), float(data[coin_id].get('usd_24h_change') or 0),
+                          self.source)
+            for coin_id, symbol in ids.items() if coin_id in data
+        }
+
+    @timed("coingecko.bars", track_demo=False)
+    def daily_closes(self, symbol, days=30):
+        """Daily closes as bars in the shared schema."""
+        if symbol not in COINGECKO_IDS:
+            raise ProviderError(f"no CoinGecko id for {symbol}")
+        data = self._get(CHART_URL.format(COINGECKO_IDS[symbol]), {'vs_currency': 'usd', 'days': days, 'interval': 'daily'})
+        prices = data.get('prices') or []
+        if not prices:
+            raise ProviderError(f"no CoinGecko history for {symbol}")
+        return bars_frame([datetime.fromtimestamp(ms / 1000) for ms, _ in prices], [p for _, p in prices])
+
+    def bars(self, symbol, period="1mo"):
+        return self.daily_closes(symbol, PERIOD_DAYS.get(period, 30))
+
+coingecko = CoinGeckoProvider()
+
+@timed("coingecko.get_crypto_prices")
+@protected("coingecko", lambda *args, **kwargs: get_crypto_demo_data())
 def get_crypto_prices(symbols=['BTC-USD', 'ETH-USD', 'ADA-USD', 'SOL-USD']):
-    """Get cryptocurrency prices from Yahoo Finance fallback."""
+    """Get cryptocurrency prices from CoinGecko, falling back to demo data."""
     try:
-        # Try CoinGecko first (free tier)
-        url = "https://api.coingecko.com/api/v3/simple/price"
-        params = {
-            'ids': 'bitcoin,ethereum,cardano,solana',
-            'vs_currencies': 'usd',
-            'include_24hr_change': 'true'
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            results = []
-            mapping = {
-                'bitcoin': 'BTC-USD',
-                'ethereum': 'ETH-USD', 
-                'cardano': 'ADA-USD',
-                'solana': 'SOL-USD'
-            }
-            
-            for coin_id, symbol in mapping.items():
-                if coin_id in data:
-                    results.append({
-                        'symbol': symbol,
-                        'price': data[coin_id]['usd'],
-                        'change_percent': data[coin_id].get('usd_24h_change', 0),
-                        'source': 'CoinGecko API',
-                        'last_updated': datetime.now()
-                    })
-            
-            return results
-        else:
-            # Fallback to Yahoo Finance
+        quotes = coingecko.quotes(symbols)
+        if not quotes:
             return get_crypto_demo_data()
-            
+        return [
+            {'symbol': q.symbol, 'price': q.price, 'change_percent': q.change_percent,
+             'source': q.source, 'last_updated': q.as_of}
+            for q in quotes.values()
+        ]
+    except CircuitOpen:
+        raise  # half-open trial in flight elsewhere; ``protected`` answers
+    except ProviderError:
+        return get_crypto_demo_data()
     except Exception as e:
+        record_error("coingecko.get_crypto_prices", e)
         st.error(f"Error fetching crypto data: {str(e)}")
         return get_crypto_demo_data()
 
@@ -0,0 +1,53 @@
+"""Deterministic demo backend: the same symbol always gets the same prices.
+
+Each symbol has one seeded path (``PERIOD_DAYS["max"]`` days) scaled to end
+at its base price; every period is a tail of that path, so a quote always
+matches the last bar of any chart drawn for it.
+"""
+import functools
+import zlib
+from datetime import date
+
+import pandas as pd
+
+from app.utils import seed_price_path
+from data_providers.base import ASSET_CLASSES, PERIOD_DAYS, MarketDataProvider, asset_class, bars_frame, quote_from_bars
+
+BASE_PRICES = {
+    "BTC-USD": 51234.56, "ETH-USD": 2890.12, "ADA-USD": 0.4567, "SOL-USD": 123.45,
+    "XAU-USD": 1987.65, "XAG-USD": 23.45, "XPT-USD": 987.32,
+    "UST-1M": 5.32, "UST-2Y": 4.89, "UST-10Y": 4.45,
+    "^GSPC": 5000.0, "^IXIC": 16000.0, "^DJI": 38000.0, "^RUT": 2000.0,
+}
+VOLATILITY = {"equity": 0.02, "index": 0.01, "crypto": 0.05, "metal": 0.02, "treasury": 0.005}
+
+
+@functools.lru_cache(maxsize=256)
+def _path(symbol):
+    seed = zlib.crc32(symbol.encode())
+    base = BASE_PRICES.get(symbol, 20 + seed % 480)
+    path = seed_price_path(1.0, PERIOD_DAYS["max"], VOLATILITY[asset_class(symbol)], seed=seed)
+    return tuple(p * base / path[-1] for p in path)
+
+
+class DemoProvider(MarketDataProvider):
+    """Every asset class, no network; the router's last resort.
+
+    The router only falls back to it for symbols in ``BASE_PRICES``: an
+    unknown ticker gets no price rather than a made-up one. Called
+    directly, it prices anything (the fake quote feed starts from it).
+    """
+
+    name = "demo"
+    source = "Demo Data"
+    asset_classes = ASSET_CLASSES
+
+    def supports(self, symbol):
+        return symbol in BASE_PRICES
+
+    def bars(self, symbol, period="1mo"):
+        days = PERIOD_DAYS.get(period, 30)
+        return bars_frame(pd.date_range(end=date.today(), periods=days, freq="D"), _path(symbol)[-days:])
+
+    def quotes(self, symbols):
+        return {s: quote_from_bars(s, self.bars(s, "5d"), self.source) for s in symbols}
@@ -0,0 +1,282 @@
+"""FiscalData avg_interest_rates ingest into a local SQLite store.
+
+The first sync follows ``links.next`` through the full history; after that
+only rows newer than the stored ``record_date`` watermark are requested,
+and at most once a day. Charts and the yield curve read from the store.
+
+    python -m data_providers.fiscaldata sync
+    python -m data_providers.fiscaldata serve --port 8765   # replay the recorded fixture locally
+    BREAKBREAD_FISCALDATA_URL=http://127.0.0.1:8765/avg_interest_rates python -m data_providers.fiscaldata sync
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import requests
+
+from app.breaker import call
+from app.metrics import record_response, timed
+
+FISCALDATA_URL = os.environ.get(
+    "BREAKBREAD_FISCALDATA_URL",
+    "https://api.fiscaldata.treasury.gov/services/api/fiscal_service/v2/accounting/od/avg_interest_rates",
+)
+DB_PATH = os.environ.get("BREAKBREAD_FISCALDATA_DB", "data/fiscaldata.sqlite")
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "avg_interest_rates.json")
+DATASET = "avg_interest_rates"
+PAGE_SIZE = 1000
+FETCH_TIMEOUT = 10  # seconds; past the breaker's slow-call limit, so a hanging API trips it quickly
+RETRY_AFTER = 60  # seconds before retrying a failed sync, doubling per failure...
+MAX_RETRY_AFTER = 6 * 3600  # ...up to this
+COLUMNS = ["record_date", "security_type_desc", "security_desc", "avg_interest_rate_amt"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS avg_interest_rates (
+    record_date TEXT NOT NULL,
+    security_type_desc TEXT NOT NULL,
+    security_desc TEXT NOT NULL,
+    avg_interest_rate_amt REAL,
+    PRIMARY KEY (record_date, security_type_desc, security_desc)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    dataset TEXT PRIMARY KEY,
+    watermark TEXT,
+    checked_on TEXT
+);
+"""
+
+
+def _next_params(params, next_link):
+    """Merge FiscalData's ``links.next`` (a ``&page[number]=...`` fragment or a full URL) into ``params``."""
+    query = urlparse(next_link).query if "?" in next_link else next_link.lstrip("&?")
+    return {**params, **dict(parse_qsl(query))}
+
+
+def fetch_pages(url=FISCALDATA_URL, filters=(), page_size=PAGE_SIZE, session=None, timeout=FETCH_TIMEOUT):
+    """Yield every page's rows, following ``links.next`` until it is null."""
+    session = session or requests.Session()
+    params = {"sort": "record_date", "page[size]": str(page_size), "page[number]": "1"}
+    if filters:
+        params["filter"] = ",".join(filters)
+    while True:
+        response = record_response("fiscaldata", call("fiscaldata", session.get, url, params=params, timeout=timeout))
+        response.raise_for_status()
+        body = response.json()
+        yield body.get("data", [])
+        next_link = (body.get("links") or {}).get("next")
+        if not next_link:
+            return
+        params = _next_params(params, next_link)
+
+
+class FiscalDataStore:
+    """SQLite copy of avg_interest_rates plus the sync watermark."""
+
+    def __init__(self, path=DB_PATH, url=FISCALDATA_URL, clock=time.monotonic):
+        self.path = path
+        self.url = url
+        self.clock = clock
+        self.failures = 0  # consecutive failed syncs
+        self.retry_at = 0.0  # clock time before which a sync is not retried
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # ----------------------------
+    # Sync
+    # ----------------------------
+    def watermark(self):
+        with self._connect() as db:
+            row = db.execute("SELECT watermark, checked_on FROM sync_state WHERE dataset = ?", (DATASET,)).fetchone()
+        return row or (None, None)
+
+    @timed("fiscaldata.sync", track_demo=False)
+    def sync(self, force=False, session=None):
+        """Fetch rows past the watermark (the full history on first run); returns rows stored.
+
+        Without ``force`` this is a no-op after the first successful check of
+        the day, and after a failure until its backoff has passed, so readers
+        can call it on every render.
+        """
+        with self._lock:
+            watermark, checked_on = self.watermark()
+            today = date.today().isoformat()
+            if not force and (checked_on == today or self.clock() < self.retry_at):
+                return 0
+            try:
+                stored = self._fetch(watermark, today, session)
+            except Exception:
+                self.failures += 1
+                self.retry_at = self.clock() + min(RETRY_AFTER * 2 ** (self.failures - 1), MAX_RETRY_AFTER)
+                raise
+            self.failures, self.retry_at = 0, 0.0
+            return stored
+
+    def _fetch(self, watermark, today, session):
+        filters = [f"record_date:gt:{watermark}"] if watermark else []
+        stored, newest = 0, watermark
+        with self._connect() as db:
+            for rows in fetch_pages(self.url, filters, session=session):
+                db.executemany(
+                    "INSERT OR REPLACE INTO avg_interest_rates VALUES (?, ?, ?, ?)",
+                    [(r["record_date"], r.get("security_type_desc") or "", r["security_desc"],
+                      _rate(r.get("avg_interest_rate_amt"))) for r in rows],
+                )
+                stored += len(rows)
+                if rows:
+                    # Pages are sorted by record_date and the last date may carry on into the
+                    # next page, so only the dates before it are known to be complete
+                    dates = {r["record_date"] for r in rows}
+                    last = max(dates)
+                    watermark = max([watermark or "", *(d for d in dates if d < last)]) or None
+                    newest = max(newest or "", last)
+                # Commit page by page so an interrupted backfill resumes after its last complete date
+                db.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)", (DATASET, watermark, None))
+                db.commit()
+            db.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)", (DATASET, newest, today))
+        return stored
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def rates(self, securities=None, since=None):
+        """Stored rows as dicts (FiscalData field names), newest record_date first."""
+        query, args = "SELECT record_date, security_type_desc, security_desc, avg_interest_rate_amt FROM avg_interest_rates", []
+        clauses = []
+        if securities:
+            clauses.append(f"security_desc IN ({','.join('?' * len(securities))})")
+            args.extend(securities)
+        if since:
+            clauses.append("record_date > ?")
+            args.append(since)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        with self._connect() as db:
+            rows = db.execute(query + " ORDER BY record_date DESC, security_desc", args).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def count(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM avg_interest_rates").fetchone()[0]
+
+
+def _rate(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# ----------------------------
+# Local fixture server
+# ----------------------------
+def fixture_handler(rows):
+    """Request handler that pages ``rows`` like FiscalData (``filter`` record_date/security_desc, ``sort``, ``page[...]``)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            params = dict(parse_qsl(urlparse(self.path).query))
+            selected = rows
+            for field, op, value in re.findall(r"(\w+):(\w+):(\([^)]*\)|[^,]*)", params.get("filter", "")):
+                if op == "gt":
+                    selected = [r for r in selected if r[field] > value]
+                elif op == "eq":
+                    selected = [r for r in selected if r[field] == value]
+                elif op == "in":
+                    allowed = set(value.strip("()").split(","))
+                    selected = [r for r in selected if r[field] in allowed]
+            sort = params.get("sort", "record_date")
+            selected = sorted(selected, key=lambda r: r[sort.lstrip("-")], reverse=sort.startswith("-"))
+
+            size = int(params.get("page[size]", 100))
+            number = int(params.get("page[number]", 1))
+            pages = max(1, -(-len(selected) // size))
+            page = selected[(number - 1) * size:number * size]
+
+            def link(n):
+                return "&" + urlencode({"page[number]": n, "page[size]": size}) if 1 <= n <= pages else None
+
+            body = json.dumps({
+                "data": page,
+                "meta": {"count": len(page), "total-count": len(selected), "total-pages": pages},
+                "links": {"self": link(number), "first": link(1), "prev": link(number - 1),
+                          "next": link(number + 1), "last": link(pages)},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def fiscal_store():
+    """The shared store, created on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FiscalDataStore()
+        return _store
+
+
+def serve_fixtures(port=8765, path=FIXTURE_PATH):
+    """Serve the recorded fixture on ``http://127.0.0.1:<port>/avg_interest_rates``; returns the server."""
+    with open(path) as f:
+        rows = json.load(f)["data"]
+    server = ThreadingHTTPServer(("127.0.0.1", port), fixture_handler(rows))
+    threading.Thread(target=server.serve_forever, name="fiscaldata-fixtures", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FiscalData avg_interest_rates ingest.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sync = sub.add_parser("sync", help="fetch new rows into the local store")
+    sync.add_argument("--force", action="store_true", help="ignore the once-a-day check")
+    sync.add_argument("--db", default=DB_PATH)
+    serve = sub.add_parser("serve", help="serve the recorded fixture locally")
+    serve.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.command == "sync":
+        store = FiscalDataStore(args.db)
+        stored = store.sync(force=args.force)
+        print(f"{stored} rows fetched; {store.count()} stored; watermark {store.watermark()[0]}")
+    else:
+        server = serve_fixtures(args.port)
+        print(f"Serving {FIXTURE_PATH} at http://127.0.0.1:{args.port}/{DATASET} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,72 @@
+import os
 import streamlit as st
 from datetime import datetime
+from app.breaker import CircuitOpen, call, protected
+from app.lazy import lazy_module
+from app.metrics import record_error, record_response, timed
+from data_providers.base import METALS, MarketDataProvider, ProviderError, Quote
 
+requests = lazy_module("requests")
+
+METALS_API_URL = "https://metals-api.com/api/latest"
+METAL_CODES = {'XAU-USD': 'XAU', 'XAG-USD': 'XAG', 'XPT-USD': 'XPT'}
+
+def metals_api_key():
+    """METALS_API_KEY from Streamlit secrets, else the environment."""
+    try:
+        return st.secrets.get("METALS_API_KEY", "") or os.environ.get("METALS_API_KEY", "")
+    except Exception:  # no secrets.toml outside Streamlit
+        return os.environ.get("METALS_API_KEY", "")
+
+class MetalsApiProvider(MarketDataProvider):
+    """Gold, silver and platinum spot per ounce, all in one request (latest only; history needs a paid plan)."""
+
+    name = "metals_api"
+    source = "Metals-API"
+    asset_classes = ("metal",)
+
+    def available(self):
+        return bool(metals_api_key())
+
+    @timed("metals_api.quotes", track_demo=False)
+    def quotes(self, symbols):
+        codes = {METAL_CODES[s]: s for s in symbols if s in METAL_CODES}
+        if not codes:
+            return {}
+        params = {'access_key': metals_api_key(), 'base': 'USD', 'symbols': ','.join(codes)}
+        response = record_response("metals_api", call("metals_api", requests.get, METALS_API_URL, params=params, timeout=10))
+        rates = response.json().get('rates')
+        if not rates:
+            raise ProviderError(f"Metals-API returned no rates ({response.status_code})")
+        # Rates are ounces per USD
+        return {symbol: Quote(symbol, 1 / rates[code], 0.0, self.source) for code, symbol in codes.items() if rates.get(code)}
+
+metals_api = MetalsApiProvider()
+
+@timed("metals_api.get_metals_prices")
+@protected("metals_api", lambda: get_metals_demo_data())
 def get_metals_prices():
     """Get precious metals prices."""
     try:
         # Metals-API (requires key) or fallback to demo
-        api_key = st.secrets.get("METALS_API_KEY", "")
-        
-        if api_key:
-            import requests
-            url = f"https://metals-api.com/api/latest"
-            params = {
-                'access_key': api_key,
-                'base': 'USD',
-                'symbols': 'XAU,XAG,XPT'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
-            
-            if 'rates' in data:
+        if metals_api.available():
+            quotes = metals_api.quotes(list(METALS))
+            if len(quotes) == len(METALS):
                 return {
-                    'gold': 1 / data['rates']['XAU'],  # Convert from USD per ounce
-                    'silver': 1 / data['rates']['XAG'],
-                    'platinum': 1 / data['rates']['XPT'],
+                    **{METALS[s]: q.price for s, q in quotes.items()},
                     'source': 'Metals-API',
                     'last_updated': datetime.now()
                 }
-        
+
         # Fallback to demo data
         return get_metals_demo_data()
-        
+
+    except CircuitOpen:
+        raise  # half-open trial in flight elsewhere; ``protected`` answers
+    except ProviderError:
+        return get_metals_demo_data()
     except Exception as e:
+        record_error("metals_api.get_metals_prices", e)
         st.error(f"Error fetching metals data: {str(e)}")
         return get_metals_demo_data()
 
@@ -0,0 +1,163 @@
+"""Route quote and bar requests to the fastest healthy backend for each asset class.
+
+For every asset class the router tries backends that are configured
+(``available()``) and whose circuit breaker is closed, fastest first by a
+moving average of their latency (untried backends go first, in configured
+order, so each gets measured). Symbols one backend can't price fall through
+to the next, and the deterministic demo backend answers what's left of the
+symbols it knows (the indices, crypto pairs, metals and Treasury tenors).
+A batch spanning several asset classes fetches the classes concurrently.
+Live quotes are shared across sessions for ``QUOTE_TTL`` seconds.
+
+    from data_providers.router import market_router
+    market_router().quotes(["AAPL", "BTC-USD", "XAU-USD", "UST-10Y"])
+"""
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from app.breaker import breaker
+from app.metrics import record_error, record_fallback
+from data_providers.base import Unsupported, asset_class
+from data_providers.demo import DemoProvider
+
+QUOTE_TTL = 60  # seconds
+LATENCY_ALPHA = 0.3  # weight of the newest sample in the latency average
+FAILURE_LATENCY = 5.0  # seconds; a fast failure must not make a backend look fastest
+
+
+class ProviderRouter:
+    """Fastest-healthy-first routing over ``MarketDataProvider`` backends, with a demo fallback."""
+
+    def __init__(self, providers, fallback=None, quote_ttl=QUOTE_TTL, clock=time.monotonic):
+        self.providers = list(providers)
+        self.fallback = fallback or DemoProvider()
+        self.quote_ttl = quote_ttl
+        self.clock = clock
+        self.latency = {}  # (provider, asset class) -> moving average seconds
+        self.calls = defaultdict(lambda: [0, 0])  # (provider, asset class) -> [calls, failures]
+        self._quotes = {}  # symbol -> (Quote, fetched at)
+        self._lock = threading.Lock()
+
+    def candidates(self, asset_class):
+        """Backends to try for ``asset_class``, in order; the demo fallback is always last."""
+        live = [p for p in self.providers
+                if asset_class in p.asset_classes and p.available() and not breaker(p.name).is_open()]
+        live.sort(key=lambda p: self.latency.get((p.name, asset_class), 0.0))
+        return live + [self.fallback]
+
+    def _attempt(self, provider, cls, fn, *args):
+        """``fn(*args)`` timed into the provider's latency average; ``None`` when it fails or is unsupported."""
+        start = time.perf_counter()
+        ok, result = True, None
+        try:
+            result = fn(*args)
+        except Unsupported:
+            return None
+        except Exception as e:
+            ok = False
+            record_error(f"{provider.name}.router", e)
+        elapsed = time.perf_counter() - start if ok else max(time.perf_counter() - start, FAILURE_LATENCY)
+        with self._lock:
+            key = (provider.name, cls)
+            previous = self.latency.get(key)
+            self.latency[key] = elapsed if previous is None else previous + LATENCY_ALPHA * (elapsed - previous)
+            self.calls[key][0] += 1
+            self.calls[key][1] += not ok
+        return result
+
+    # ----------------------------
+    # Quotes and bars
+    # ----------------------------
+    def _quotes_for_class(self, cls, symbols):
+        quotes, remaining = {}, list(symbols)
+        for provider in self.candidates(cls):
+            todo = [s for s in remaining if provider.supports(s)]
+            if not todo:
+                continue
+            quotes.update(self._attempt(provider, cls, provider.quotes, todo) or {})
+            remaining = [s for s in remaining if s not in quotes]
+            if not remaining:
+                break
+        if any(q.is_demo for q in quotes.values()):
+            record_fallback(f"router.{cls}")
+        return quotes
+
+    def quotes(self, symbols, max_age=None):
+        """``{symbol: Quote}`` per symbol priced (demo quotes where no live backend could answer a known one).
+
+        Cached live quotes are reused while younger than ``max_age`` seconds
+        (``quote_ttl`` by default).
+        """
+        now, quotes, by_class = self.clock(), {}, defaultdict(list)
+        max_age = self.quote_ttl if max_age is None else max_age
+        with self._lock:
+            for symbol in dict.fromkeys(symbols):
+                cached = self._quotes.get(symbol)
+                if cached and now - cached[1] < max_age:
+                    quotes[symbol] = cached[0]
+                else:
+                    by_class[asset_class(symbol)].append(symbol)
+        if len(by_class) > 1:
+            with ThreadPoolExecutor(len(by_class)) as pool:
+                fetched = list(pool.map(lambda item: self._quotes_for_class(*item), by_class.items()))
+        else:
+            fetched = [self._quotes_for_class(cls, syms) for cls, syms in by_class.items()]
+        with self._lock:
+            for batch in fetched:
+                quotes.update(batch)
+                self._quotes.update({s: (q, now) for s, q in batch.items() if not q.is_demo})
+        return quotes
+
+    def quote(self, symbol):
+        return self.quotes([symbol]).get(symbol)
+
+    def history(self, symbol, period="1mo"):
+        """``(bars, provider)`` from the first backend in line that has them, else ``(None, None)``."""
+        cls = asset_class(symbol)
+        for provider in self.candidates(cls):
+            if not provider.supports(symbol):
+                continue
+            bars = self._attempt(provider, cls, provider.bars, symbol, period)
+            if bars is not None and not bars.empty:
+                if provider is self.fallback:
+                    record_fallback(f"router.{cls}")
+                return bars, provider
+        return None, None
+
+    def bars(self, symbol, period="1mo"):
+        return self.history(symbol, period)[0]
+
+    def rows(self):
+        """Latency average, calls and failures per backend and asset class, for the admin page."""
+        with self._lock:
+            return [{"provider": name, "asset_class": cls, "latency_ms": self.latency.get((name, cls), 0.0) * 1000,
+                     "calls": calls, "failures": failures}
+                    for (name, cls), (calls, failures) in sorted(self.calls.items())]
+
+    def clear(self):
+        with self._lock:
+            self._quotes.clear()
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def default_providers():
+    """Live backends in preference order for untried asset classes."""
+    from data_providers.crypto import coingecko
+    from data_providers.metals import metals_api
+    from data_providers.treasury import FiscalDataProvider
+    from data_providers.yahoo import YahooProvider
+    return [YahooProvider(), coingecko, metals_api, FiscalDataProvider()]
+
+
+def market_router():
+    """The shared router, created on first use."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ProviderRouter(default_providers())
+        return _router
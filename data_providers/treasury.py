@@ -1,36 +1,44 @@
-import requests
 import streamlit as st
 from datetime import datetime
+from app.breaker import breaker
+from app.metrics import record_error, timed
+from app.yield_curve import SECURITY_TENORS, latest_curve
+from data_providers.base import PERIOD_DAYS, TREASURIES, MarketDataProvider, ProviderError, Quote, bars_frame
+from data_providers.fiscaldata import fiscal_store
 
-def get_treasury_yields():
-    """Get US Treasury yield data from FiscalData API."""
-    try:
-        url = "https://api.fiscaldata.treasury.gov/services/api/fiscal_service/v2/accounting/od/avg_interest_rates"
-        params = {
-            'filter': 'security_desc:eq:Treasury Notes',
-            'sort': '-record_date',
-            'page[size]': '5'
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-        
-        if 'data' in data and data['data']:
-            latest = data['data'][0]
-            return {
-                '1_month': float(latest.get('avg_interest_rate_amt', 0)),
-                '2_year': float(latest.get('avg_interest_rate_amt', 0)) + 0.5,  # Demo adjustment
-                '10_year': float(latest.get('avg_interest_rate_amt', 0)) + 1.2,  # Demo adjustment
-                'source': 'U.S. Treasury FiscalData API',
-                'last_updated': datetime.now().strftime('%Y-%m-%d')
-            }
-        else:
-            # Fallback demo data
-            return get_treasury_demo_data()
-            
-    except Exception as e:
-        st.error(f"Error fetching Treasury data: {str(e)}")
-        return get_treasury_demo_data()
+@timed("treasury.get_avg_interest_rates")
+def get_avg_interest_rates():
+    """Average interest rate rows for the yield-curve node securities, newest first.
+
+    Reads the local FiscalData store, which syncs new rows at most once a day
+    (and not at all while the FiscalData breaker is open).
+    """
+    store = fiscal_store()
+    if not breaker("fiscaldata").is_open():
+        try:
+            store.sync()
+        except Exception as e:
+            record_error("treasury.get_avg_interest_rates", e)
+            st.error(f"Error fetching Treasury data: {str(e)}")
+    return store.rates(securities=list(SECURITY_TENORS))
+
+@timed("treasury.get_treasury_yields")
+def get_treasury_yields(rows=None, method="nelson_siegel"):
+    """Get US Treasury yields read off a curve fitted to the FiscalData series."""
+    rows = get_avg_interest_rates() if rows is None else rows
+    record_date, curve = latest_curve(rows, method)
+    if record_date is None:
+        return {**get_treasury_demo_data(), 'curve': curve}
+    one_month, two_year, ten_year = curve([1 / 12, 2, 10])
+    return {
+        '1_month': float(one_month),
+        '2_year': float(two_year),
+        '10_year': float(ten_year),
+        'curve': curve,
+        'record_date': record_date,
+        'source': 'U.S. Treasury FiscalData API',
+        'last_updated': record_date
+    }
 
 def get_treasury_demo_data():
     """Demo data for Treasury yields."""
@@ -41,3 +49,34 @@ def get_treasury_demo_data():
         'source': 'U.S. Treasury (Demo Data)',
         'last_updated': datetime.now().strftime('%Y-%m-%d')
     }
+
+class FiscalDataProvider(MarketDataProvider):
+    """Treasury yields read off the fitted FiscalData curve; bars are the nearest security's monthly average rate."""
+
+    name = "fiscaldata"
+    source = "U.S. Treasury FiscalData API"
+    asset_classes = ("treasury",)
+
+    @timed("fiscaldata.quotes", track_demo=False)
+    def quotes(self, symbols):
+        wanted = [s for s in symbols if s in TREASURIES]
+        if not wanted:
+            return {}
+        record_date, curve = latest_curve(get_avg_interest_rates())
+        if record_date is None:
+            raise ProviderError("no FiscalData rows stored")
+        as_of = datetime.fromisoformat(record_date)
+        rates = curve([TREASURIES[s] for s in wanted])
+        return {s: Quote(s, float(rate), 0.0, self.source, as_of) for s, rate in zip(wanted, rates)}
+
+    @timed("fiscaldata.bars", track_demo=False)
+    def bars(self, symbol, period="1mo"):
+        if symbol not in TREASURIES:
+            raise ProviderError(f"{symbol} is not a Treasury tenor")
+        security = min(SECURITY_TENORS, key=lambda s: abs(SECURITY_TENORS[s] - TREASURIES[symbol]))
+        rows = [r for r in get_avg_interest_rates() if r.get("security_desc") == security and r.get("avg_interest_rate_amt") is not None]
+        if not rows:
+            raise ProviderError(f"no FiscalData rows for {security}")
+        # One row a month; keep roughly ``period`` of them, oldest first
+        rows = sorted(rows, key=lambda r: r["record_date"])[-max(PERIOD_DAYS.get(period, 30) // 30, 2):]
+        return bars_frame([r["record_date"] for r in rows], [float(r["avg_interest_rate_amt"]) for r in rows])
@@ -1,64 +1,37 @@
 import yfinance as yf
 import pandas as pd
-from datetime import datetime, timedelta
-import streamlit as st
+from app.breaker import call
+from app.metrics import record_error, timed
+from data_providers.base import BAR_COLUMNS, MarketDataProvider, ProviderError, quote_from_bars
 
-def get_stock_data(symbol, period="1mo"):
-    """Get stock data from Yahoo Finance."""
-    try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period=period)
-        
+class YahooProvider(MarketDataProvider):
+    """Stocks, indices and crypto pairs from Yahoo Finance."""
+
+    name = "yahoo"
+    source = "Yahoo Finance"
+    asset_classes = ("equity", "index", "crypto")
+
+    @timed("yahoo.bars", track_demo=False)
+    def bars(self, symbol, period="1mo"):
+        hist = call("yahoo", yf.Ticker(symbol).history, period=period)
         if hist.empty:
-            return None
-            
-        info = ticker.info
-        current_price = hist['Close'].iloc[-1]
-        
-        # Calculate change
-        if len(hist) > 1:
-            prev_price = hist['Close'].iloc[-2]
-            change = current_price - prev_price
-            change_percent = (change / prev_price) * 100
-        else:
-            change = 0
-            change_percent = 0
-            
-        return {
-            'symbol': symbol,
-            'current_price': current_price,
-            'change': change,
-            'change_percent': change_percent,
-            'historical': hist,
-            '52w_high': info.get('fiftyTwoWeekHigh', current_price * 1.2),
-            '52w_low': info.get('fiftyTwoWeekLow', current_price * 0.8),
-            'volume': hist['Volume'].iloc[-1] if 'Volume' in hist.columns else 0,
-            'source': 'Yahoo Finance',
-            'last_updated': datetime.now()
-        }
-    except Exception as e:
-        st.error(f"Error fetching Yahoo data for {symbol}: {str(e)}")
-        return None
+            raise ProviderError(f"no Yahoo history for {symbol}")
+        return hist[BAR_COLUMNS]
 
-def get_major_indices():
-    """Get major market indices."""
-    indices = {
-        '^GSPC': 'S&P 500',
-        '^IXIC': 'NASDAQ',
-        '^DJI': 'Dow Jones',
-        '^RUT': 'Russell 2000'
-    }
-    
-    results = []
-    for symbol, name in indices.items():
-        data = get_stock_data(symbol, '1d')
-        if data:
-            results.append({
-                'name': name,
-                'symbol': symbol,
-                'price': data['current_price'],
-                'change_percent': data['change_percent'],
-                'source': data['source']
-            })
-    
-    return results
+    @timed("yahoo.quotes", track_demo=False)
+    def quotes(self, symbols):
+        """Last close for every symbol from one ``yf.download`` request; symbols it can't price are left out."""
+        symbols = list(symbols)
+        data = call("yahoo", yf.download, symbols, period="5d", group_by="ticker", progress=False, threads=False)
+        if data is None or data.empty:
+            raise ProviderError(f"no Yahoo history for {', '.join(symbols)}")
+        quotes = {}
+        for symbol in symbols:
+            try:
+                frame = data[symbol] if isinstance(data.columns, pd.MultiIndex) else data
+                bars = frame[BAR_COLUMNS].dropna(subset=["Close"])
+                if not bars.empty:
+                    quotes[symbol] = quote_from_bars(symbol, bars, self.source)
+            except Exception as e:  # one bad symbol must not cost the rest of the batch
+                record_error("yahoo.quotes", e)
+        return quotes
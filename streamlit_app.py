@@ -1,12 +1,25 @@
 import os
 import uuid
-import random
 from datetime import datetime, timedelta
-import pandas as pd
 import streamlit as st
 import streamlit.components.v1 as components
-import plotly.graph_objects as go
-import yfinance as yf
+from app import breaker, metrics, profiler
+from app.lazy import lazy_module
+
+# Heavy modules load on first use so the login page renders without them
+pd = lazy_module("pandas")
+go = lazy_module("plotly.graph_objects")
+charts = lazy_module("app.charts")
+fx = lazy_module("app.fx")
+investing = lazy_module("app.investing")
+market_data = lazy_module("app.market_data")
+projection = lazy_module("app.projection")
+yield_curve = lazy_module("app.yield_curve")
+treasury = lazy_module("data_providers.treasury")
+provider_router = lazy_module("data_providers.router")
+market_schema = lazy_module("data_providers.base")
+quote_stream = lazy_module("app.quote_bus")
+notifications = lazy_module("app.notifications")
 
 # ----------------------------
 # Page configuration (MUST BE FIRST)
@@ -105,12 +118,20 @@ def display_logo(width=None, use_container_width=False):
 def uid():
     return str(uuid.uuid4())[:8]
 
-def format_money(amount):
-    rounded = round(amount, 2)
-    if rounded >= 0:
-        return f"${rounded:,.2f}"
-    else:
-        return f"-${abs(rounded):,.2f}"
+def display_currency():
+    user = st.session_state.users.get(st.session_state.get("auth_user")) or {}
+    return user.get("settings", {}).get("currency", "USD")
+
+def format_money(amount, currency=None):
+    """Format a USD amount in the user's display currency (cached FX rates, no network)."""
+    currency = currency or display_currency()
+    return fx.format_amount(fx.fx_rates.convert(amount, "USD", currency), currency)
+
+TICKER_REFRESH = 5  # seconds; the sidebar reads the quote bus, so a refresh costs no upstream call
+CRYPTO_TICKERS = ['BTC-USD', 'ETH-USD']
+INDEX_NAMES = {'^GSPC': 'S&P 500', '^IXIC': 'NASDAQ', '^DJI': 'Dow Jones'}
+# app_ids that see the Metrics page; nobody unless BREAKBREAD_ADMINS lists them (janedoe is a public demo login)
+ADMIN_USERS = {a.strip() for a in os.environ.get("BREAKBREAD_ADMINS", "").split(",") if a.strip()}
 
 # ----------------------------
 # Initialize session state
@@ -121,7 +142,6 @@ for key, default in [
     ("orders", []),
     ("requests", []),
     ("auth_user", None),
-    ("notifications", []),
     ("app_nav_radio", "Dashboard"),
 ]:
     st.session_state.setdefault(key, default)
@@ -140,7 +160,7 @@ def ensure_demo_users():
                 "balance": 5000.0,
                 "portfolio": {},
                 "watchlist": [],
-                "settings": {"dark_mode": False, "price_alerts": {}}
+                "settings": {"dark_mode": False, "price_alerts": {}, "currency": "USD"}
             },
             {
                 "user_id": "user_2", 
@@ -150,7 +170,7 @@ def ensure_demo_users():
                 "balance": 3000.0,
                 "portfolio": {},
                 "watchlist": [],
-                "settings": {"dark_mode": False, "price_alerts": {}}
+                "settings": {"dark_mode": False, "price_alerts": {}, "currency": "USD"}
             }
         ]
         for user in demo_users:
@@ -226,77 +246,61 @@ def toast_info(message):
 # ----------------------------
 # Investment Vehicle Functions
 # ----------------------------
-@st.cache_data(ttl=60, show_spinner=False)
-def get_stock_data(symbol, period="1mo"):
-    try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period=period)
-        if hist.empty: return None
-        current_price = hist['Close'].iloc[-1]
-        if len(hist) > 1:
-            prev_price = hist['Close'].iloc[-2]
-            change = current_price - prev_price
-            change_percent = (change / prev_price) * 100
-        else:
-            change, change_percent = 0, 0
-        return {
-            'symbol': symbol, 'current_price': current_price, 'change': change,
-            'change_percent': change_percent, 'historical': hist
-        }
-    except Exception: return None
-
+@metrics.count_cache("get_major_indices")
 @st.cache_data(ttl=60, show_spinner=False)
 def get_major_indices():
-    indices = {'^GSPC': 'S&P 500', '^IXIC': 'NASDAQ', '^DJI': 'Dow Jones'}
-    results = []
-    for symbol, name in indices.items():
-        data = get_stock_data(symbol, '1d')
-        if data:
-            results.append({'name': name, 'symbol': symbol, 'price': data['current_price'], 'change_percent': data['change_percent']})
-        else:
-            base_prices = {'S&P 500': 5000, 'NASDAQ': 16000, 'Dow Jones': 38000}
-            results.append({'name': name, 'symbol': symbol, 'price': base_prices.get(name) + random.randint(-100,100), 'change_percent': random.uniform(-2,2)})
-    return results
-
-@st.cache_data(ttl=60, show_spinner=False)
-def get_crypto_data(coin_id="bitcoin", days=30):
-    try:
-        symbol_map = {'bitcoin': 'BTC-USD', 'ethereum': 'ETH-USD'}
-        yahoo_symbol = symbol_map.get(coin_id, 'BTC-USD')
-        ticker = yf.Ticker(yahoo_symbol)
-        hist = ticker.history(period=f"{days}d")
-        if not hist.empty:
-            current_price = hist['Close'].iloc[-1]
-            prev_price = hist['Close'].iloc[-2] if len(hist) > 1 else current_price
-            change_percent = ((current_price - prev_price) / prev_price) * 100
-        else:
-            current_price = 50000 if coin_id == 'bitcoin' else 3000
-            change_percent = random.uniform(-5, 5)
-        return {'symbol': coin_id.upper(), 'current_price': current_price, 'change_percent': change_percent}
-    except:
-        return {'symbol': coin_id.upper(), 'current_price': 50000 if coin_id=='bitcoin' else 3000, 'change_percent': random.uniform(-5,5)}
+    quotes = provider_router.market_router().quotes(list(INDEX_NAMES))
+    return [{'name': name, 'symbol': s, 'price': quotes[s].price, 'change_percent': quotes[s].change_percent}
+            for s, name in INDEX_NAMES.items() if s in quotes]
 
 @st.cache_data(ttl=60, show_spinner=False)
 def get_crypto_prices():
-    return [get_crypto_data(c, 1) for c in ['bitcoin', 'ethereum']]
+    quotes = provider_router.market_router().quotes(CRYPTO_TICKERS)
+    return [{'symbol': q.symbol, 'current_price': q.price, 'change_percent': q.change_percent} for q in quotes.values()]
+
+@metrics.count_cache("get_treasury_rates")
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_treasury_rates():
+    return treasury.get_avg_interest_rates()
 
-@st.cache_data(ttl=300, show_spinner=False)
 def get_treasury_yields():
-    return {'1_month': 5.32, '2_year': 4.89, '10_year': 4.45}
+    return treasury.get_treasury_yields(get_treasury_rates())
 
 @st.cache_data(ttl=300, show_spinner=False)
 def get_metals_prices():
-    return {'gold': 1987.65, 'silver': 23.45, 'platinum': 987.32}
+    quotes = provider_router.market_router().quotes(list(market_schema.METALS))
+    return {market_schema.METALS[s]: q.price for s, q in quotes.items()}
 
-def create_price_chart(historical_data, title):
-    if historical_data is None or historical_data.empty: return None
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=historical_data.index, y=historical_data['Close'], mode='lines', name=title, line=dict(color='#FE8B00')))
-    fig.update_layout(title=title, xaxis_title="Date", yaxis_title="Price ($)", height=400, template="plotly_dark", showlegend=False)
-    return fig
+def create_price_chart(historical_data, title, symbol=None, period=None):
+    return charts.price_figure(historical_data, title, symbol=symbol, period=period, color='#FE8B00',
+                               layout=dict(template="plotly_dark", showlegend=False))
 
 def mini_indices():
-    return [{"name": idx["name"], "price": idx["price"], "chg_pct": idx["change_percent"]} for idx in get_major_indices()]
+    """Index quotes streamed by the shared quote bus; the cached poll fills in until the first update lands."""
+    if "index_stream" not in st.session_state:
+        st.session_state.index_stream = quote_stream.quote_bus().subscribe(INDEX_NAMES)
+    latest = st.session_state.index_stream.latest()
+    if len(latest) < len(INDEX_NAMES):
+        return [{"name": idx["name"], "price": idx["price"], "chg_pct": idx["change_percent"]} for idx in get_major_indices()]
+    return [{"name": name, "price": latest[s].price, "chg_pct": latest[s].change_percent} for s, name in INDEX_NAMES.items()]
+
+@st.fragment(run_every=TICKER_REFRESH)
+def sidebar_ticker():
+    """Market overview, price alerts and resting-order matching, refreshed on their own timer without rerunning the page."""
+    user = get_user(st.session_state.get("auth_user"))
+    if user:
+        notifications.price_alerts_tick(user)
+    if "order_manager" in st.session_state:
+        for order, quantity, price in investing.match_resting_orders():
+            toast_success(f"{order.side.title()} {quantity:g} {order.symbol} @ ${price:,.2f}: {order.status.replace('_', ' ')}")
+    for index in mini_indices()[:3]:
+        color = "#00D54B" if index["chg_pct"] >= 0 else "#FF4444"
+        st.markdown(f"""
+        <div style='background-color: #1A1A1A; padding: 1rem; border-radius: 12px; border: 1px solid #333; margin-bottom: 0.5rem; display: flex; justify-content: space-between;'>
+            <span style='color: #FFFFFF;'>{index['name']}</span>
+            <div style='text-align: right;'><div style='color: #FFFFFF;'>{format_money(index['price'])}</div><div style='color: {color}; font-size: 0.8rem;'>{index['chg_pct']:+.2f}%</div></div>
+        </div>
+        """, unsafe_allow_html=True)
 
 # ----------------------------
 # Investment Vehicle Display Functions
@@ -315,7 +319,7 @@ def show_stocks_etfs():
     stock_cols = st.columns(3)
     for i, symbol in enumerate(popular_stocks):
         with stock_cols[i % 3]:
-            data = get_stock_data(symbol, '1d')
+            data = market_data.get_cached_data(symbol, '1d')
             if data: st.metric(label=symbol, value=f"${data['current_price']:,.2f}", delta=f"{data['change_percent']:+.2f}%")
             
     st.markdown("---")
@@ -415,6 +419,8 @@ def show_treasury_bonds():
         if st.button("🪙 Visit TreasuryDirect", use_container_width=True, type="primary"): 
             st.markdown("[Open TreasuryDirect](https://www.treasurydirect.gov/)")
 
+    show_bond_pricer()
+
     st.markdown("---")
     b_col, r_col = st.columns(2)
     with b_col:
@@ -434,6 +440,21 @@ def show_treasury_bonds():
         - **Opportunity Cost:** Capital tied up here misses out on stock market bull runs.
         """)
 
+def show_bond_pricer():
+    st.markdown("### Yield Curve & Bond Pricer")
+    c1, c2 = st.columns(2)
+    with c1: method = st.radio("Curve", ["nelson_siegel", "spline"], format_func=lambda m: "Nelson-Siegel" if m == "nelson_siegel" else "Cubic Spline", horizontal=True, key="curve_method")
+    with c2: coupon = st.number_input("Coupon (%)", min_value=0.0, max_value=15.0, value=4.25, step=0.125, key="bond_coupon")
+    record_date, curve = yield_curve.latest_curve(get_treasury_rates(), method)
+    tenors = [t / 4 for t in range(1, 121)]
+    fig = go.Figure(go.Scatter(x=tenors, y=curve(tenors), mode='lines', line=dict(color='#FE8B00')))
+    fig.update_layout(title=f"Treasury Curve ({record_date or 'demo'})", xaxis_title="Maturity (years)", yaxis_title="Yield (%)", height=300, template="plotly_dark", showlegend=False)
+    st.plotly_chart(fig, use_container_width=True)
+    bonds = yield_curve.bond_metrics(curve, yield_curve.STANDARD_MATURITIES, coupon)
+    st.dataframe(bonds.style.format({"maturity": "{:.2f}y", "coupon": "{:.3f}%", "price": "${:,.3f}", "zero_rate": "{:.2f}%",
+                                     "macaulay_duration": "{:.2f}", "modified_duration": "{:.2f}", "convexity": "{:.1f}"}),
+                 use_container_width=True, hide_index=True)
+
 def show_precious_metals():
     st.subheader("🥇 Precious Metals Investing")
     metals = get_metals_prices()
@@ -630,6 +651,7 @@ def show_sports_equine():
         - **Injury Risk:** Athletes and animals can suffer career-ending injuries instantly, dropping value to zero.
         - **Illiquidity:** Hard to sell shares; you are usually locked in for the athlete/horse's career length.
         """)
+@st.fragment
 def show_universal_research():
     st.subheader("🔍 Universal Research Tool")
     col1, col2, col3 = st.columns([2, 1, 1])
@@ -642,18 +664,34 @@ def show_universal_research():
             st.rerun()
     
     if "research_symbol" in st.session_state:
-        data = get_stock_data(st.session_state.research_symbol, period)
+        data = market_data.get_cached_data(st.session_state.research_symbol, period)
         if data:
             c1, c2, c3, _ = st.columns(4)
             with c1: st.metric("Price", f"${data['current_price']:,.2f}")
             with c2: st.metric("Change", f"${data['change']:+.2f}")
             with c3: st.metric("Change %", f"{data['change_percent']:+.2f}%")
+            st.caption(f"Source: {data['source']}")
             if not data['historical'].empty:
-                fig = create_price_chart(data['historical'], f"{st.session_state.research_symbol} History")
+                fig = create_price_chart(data['historical'], f"{st.session_state.research_symbol} History", st.session_state.research_symbol, period)
                 if fig: st.plotly_chart(fig, use_container_width=True)
+            show_order_ticket(st.session_state.research_symbol, data['current_price'])
         else:
             st.error("Could not fetch data.")
 
+def show_order_ticket(symbol, last_price):
+    st.write(f"**Trade {symbol}**")
+    c1, c2, c3, c4 = st.columns(4)
+    with c1: side = st.selectbox("Side", ["buy", "sell"], key="ord_side")
+    with c2: shares = st.number_input("Shares", min_value=0.0001, value=1.0, key="ord_qty")
+    with c3: order_type = st.selectbox("Type", ["market", "limit"], key="ord_type")
+    with c4: limit = st.number_input("Limit", min_value=0.01, value=float(round(last_price, 2)), key="ord_limit", disabled=order_type == "market")
+    if st.button("Place Order", type="primary", key="ord_submit"):
+        result = investing.place_order(st.session_state.auth_user, symbol, shares, limit if order_type == "limit" else None, side)
+        if result["status"] == "success":
+            toast_success(result["message"])
+            st.rerun()  # balances elsewhere on the page changed
+        else: st.error(result["message"])
+
 # ----------------------------
 # UI Components
 # ----------------------------
@@ -689,6 +727,7 @@ def show_main_app():
     if not user:
         logout()
         return
+    fx.fx_rates.start()
     
     with st.sidebar:
         display_logo(width=150)
@@ -713,6 +752,8 @@ def show_main_app():
             ("📈 Markets", "Markets"), 
             ("⚙️ Settings", "Settings")
         ]
+        if user["app_id"] in ADMIN_USERS:
+            nav_options.append(("📊 Metrics", "Metrics"))
         
         for icon_label, value in nav_options:
             is_primary = "primary" if st.session_state.get("app_nav_radio") == value else "secondary"
@@ -727,14 +768,7 @@ def show_main_app():
 
         st.markdown("---")
         st.markdown("<h4 style='color: #FFFFFF; margin-bottom: 1rem;'>Market Overview</h4>", unsafe_allow_html=True)
-        for index in mini_indices()[:3]:
-            color = "#00D54B" if index["chg_pct"] >= 0 else "#FF4444"
-            st.markdown(f"""
-            <div style='background-color: #1A1A1A; padding: 1rem; border-radius: 12px; border: 1px solid #333; margin-bottom: 0.5rem; display: flex; justify-content: space-between;'>
-                <span style='color: #FFFFFF;'>{index['name']}</span>
-                <div style='text-align: right;'><div style='color: #FFFFFF;'>{format_money(index['price'])}</div><div style='color: {color}; font-size: 0.8rem;'>{index['chg_pct']:+.2f}%</div></div>
-            </div>
-            """, unsafe_allow_html=True)
+        sidebar_ticker()
 
         st.markdown("---")
         if st.button("**🚪 Logout**", use_container_width=True, type="secondary"): 
@@ -744,16 +778,21 @@ def show_main_app():
     if nav == "Banking": show_banking(user)
     elif nav == "Markets": show_markets(user)
     elif nav == "Settings": show_settings(user)
+    elif nav == "Metrics" and user["app_id"] in ADMIN_USERS: show_admin_metrics()
     else: show_dashboard(user)
 
 def show_dashboard(user):
     st.header("🏠 Dashboard")
     st.subheader(f"Welcome back, {user['app_id']}!")
     
+    holdings_value = investing.portfolio_value(user["user_id"])
     col1, col2, col3 = st.columns(3)
     with col1: st.metric("Cash Balance", format_money(user["balance"]))
-    with col2: st.metric("Portfolio Value", "$0.00")
-    with col3: st.metric("Net Worth", format_money(user["balance"]))
+    with col2: st.metric("Portfolio Value", format_money(holdings_value))
+    with col3: st.metric("Net Worth", format_money(user["balance"] + holdings_value))
+    show_portfolio_risk(user)
+    show_projection(user, "dash")
+    show_rebalance(user)
     
     st.subheader("Quick Actions")
     c1, c2, c3, c4 = st.columns(4)
@@ -789,6 +828,75 @@ def show_dashboard(user):
                 unsafe_allow_html=True
             )
 
+@st.fragment
+def show_portfolio_risk(user):
+    if not user.get("portfolio"): return
+    with st.expander("📉 Portfolio Risk"):
+        window = st.selectbox("Window", ["3mo", "6mo", "1y", "2y"], index=2, key="risk_window")
+        risk = investing.portfolio_risk(user["user_id"], window)
+        if not risk:
+            st.info("Not enough price history to estimate risk.")
+            return
+        r1, r2, r3, r4 = st.columns(4)
+        with r1: st.metric("Volatility (ann.)", f"{risk['portfolio_volatility']:.1%}")
+        with r2: st.metric("Beta vs S&P 500", f"{risk['portfolio_beta']:.2f}" if risk["portfolio_beta"] is not None else "n/a")
+        with r3: st.metric("Max Drawdown", f"{risk['portfolio_max_drawdown']:.1%}")
+        with r4: st.metric("Diversification Ratio", f"{risk['diversification_ratio']:.2f}")
+        per_asset = pd.DataFrame({
+            "Weight": risk["weights"], "Volatility": risk["volatility"],
+            "Beta": risk["beta"], "Max Drawdown": risk["max_drawdown"],
+        })
+        st.dataframe(per_asset.style.format("{:.2f}"), use_container_width=True)
+        if len(risk["symbols"]) > 1:
+            st.write("**Correlation**")
+            st.dataframe(risk["correlation"].style.format("{:.2f}"), use_container_width=True)
+
+@st.fragment
+def show_projection(user, key):
+    if not user.get("portfolio"): return
+    with st.expander("🔮 What-if Projection"):
+        c1, c2, c3, c4 = st.columns(4)
+        with c1: years = st.slider("Years", 1, 30, 5, key=f"{key}_proj_years")
+        with c2: monthly = st.number_input("Monthly contribution", min_value=0.0, value=0.0, step=50.0, key=f"{key}_proj_monthly")
+        with c3: members = st.number_input("SuSu members", min_value=0, value=0, key=f"{key}_proj_susu")
+        with c4: paycheck = st.checkbox(f"Invest paychecks ({format_money(projection.PAYCHECK.amount)}/2wk)", key=f"{key}_proj_paycheck")
+        if st.button("Run Projection", type="primary", key=f"{key}_proj_run"):
+            contributions = [projection.Contribution("Monthly", monthly, projection.MONTH)] if monthly else []
+            if members: contributions.append(projection.susu_payout(members))
+            if paycheck: contributions.append(projection.PAYCHECK)
+            st.session_state[f"{key}_projection"] = investing.project_portfolio(user["user_id"], years, contributions=contributions)
+        result = st.session_state.get(f"{key}_projection")
+        if result is None:
+            return
+        bands = result["percentiles"]
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=bands.index, y=bands["p95"], line=dict(width=0), showlegend=False))
+        fig.add_trace(go.Scatter(x=bands.index, y=bands["p5"], fill="tonexty", fillcolor="rgba(254,139,0,0.15)", line=dict(width=0), name="5–95%"))
+        fig.add_trace(go.Scatter(x=bands.index, y=bands["p75"], line=dict(width=0), showlegend=False))
+        fig.add_trace(go.Scatter(x=bands.index, y=bands["p25"], fill="tonexty", fillcolor="rgba(254,139,0,0.35)", line=dict(width=0), name="25–75%"))
+        fig.add_trace(go.Scatter(x=bands.index, y=bands["p50"], line=dict(color="#FE8B00"), name="Median"))
+        fig.update_layout(xaxis_title="Years", yaxis_title="Value ($)", height=400, template="plotly_dark")
+        st.plotly_chart(fig, use_container_width=True)
+        m1, m2, m3 = st.columns(3)
+        with m1: st.metric("Median Outcome", format_money(bands["p50"].iloc[-1]))
+        with m2: st.metric("Contributed", format_money(result["contributed"]))
+        with m3: st.metric("Chance of Loss", f"{result['prob_loss']:.0%}")
+
+@st.fragment
+def show_rebalance(user):
+    with st.expander("⚖️ Rebalance to Target"):
+        c1, c2 = st.columns(2)
+        with c1: tolerance = st.slider("Leave drifts under (%)", 0.0, 10.0, 2.0, 0.5, key="rebal_tol") / 100
+        with c2: include_cash = st.checkbox("Invest idle cash", value=True, key="rebal_cash")
+        result = investing.rebalance_plan(user["user_id"], tolerance, include_cash)
+        st.dataframe(result["drift"].rename("Drift vs Target").to_frame().style.format("{:+.1%}"), use_container_width=True)
+        trades = result["trades"]
+        if trades.empty:
+            st.success("Within tolerance — no trades needed.")
+        else:
+            st.dataframe(trades.drop(columns="user_id").style.format({"amount": "${:,.2f}", "units": "{:,.4f}", "fee": "${:,.2f}"}), use_container_width=True)
+            st.caption(f"Estimated fees: {format_money(trades['fee'].sum())}")
+
 def show_banking(user):
     col1, col2 = st.columns([5, 1])
     with col1: st.header("💸 Banking")
@@ -836,8 +944,11 @@ def show_banking(user):
             data = []
             for tx in txs:
                 ttype = "Sent" if tx["sender_id"] == user["user_id"] else "Received"
-                data.append({"Date": tx["ts"].strftime("%Y-%m-%d"), "Type": ttype, "Amount": format_money(tx['amount'])})
-            st.dataframe(pd.DataFrame(data), use_container_width=True)
+                data.append({"Date": tx["ts"].strftime("%Y-%m-%d"), "Type": ttype, "Amount": tx['amount']})
+            currency = display_currency()
+            history = fx.fx_rates.convert_frame(pd.DataFrame(data), ["Amount"], currency)
+            history["Amount"] = history["Amount"].map(lambda a: fx.format_amount(a, currency))
+            st.dataframe(history, use_container_width=True)
         else:
             st.info("No transactions yet.")
             
@@ -870,6 +981,20 @@ def show_banking(user):
         if st.button("Collect Contributions / Issue Payout", type="primary", use_container_width=True):
             st.success("Payout initiated to DJ Bowl 38 Fund participants!")
 
+MARKET_TABS = {
+    "Stocks & ETFs": show_stocks_etfs, "Crypto": show_crypto_assets,
+    "Bonds & Treasuries": show_bonds_treasuries, "Treasury Bonds": show_treasury_bonds,
+    "Precious Metals": show_precious_metals, "Startup Investing": show_startup_investing,
+    "Business Marketplace": show_business_marketplace, "Royalty Investing": show_royalty_investing,
+    "Municipal Bonds": show_municipal_bonds, "Sports & Equine": show_sports_equine,
+}
+
+@st.fragment
+def show_market_tabs():
+    """Only the selected asset class renders (and fetches); switching reruns just this fragment."""
+    tab = st.radio("Asset class", list(MARKET_TABS), horizontal=True, key="market_tab", label_visibility="collapsed")
+    MARKET_TABS[tab]()
+
 def show_markets(user):
     col1, col2 = st.columns([5, 1])
     with col1: st.header("📈 Multi-Asset Markets")
@@ -879,25 +1004,11 @@ def show_markets(user):
             st.session_state.app_nav_radio = "Dashboard"
             st.rerun()
     
-    asset_tabs = st.tabs([
-        "Stocks & ETFs", "Crypto", "Bonds & Treasuries", "Treasury Bonds", 
-        "Precious Metals", "Startup Investing", "Business Marketplace", 
-        "Royalty Investing", "Municipal Bonds", "Sports & Equine"
-    ])
-    
-    with asset_tabs[0]: show_stocks_etfs()
-    with asset_tabs[1]: show_crypto_assets()
-    with asset_tabs[2]: show_bonds_treasuries()
-    with asset_tabs[3]: show_treasury_bonds()
-    with asset_tabs[4]: show_precious_metals()
-    with asset_tabs[5]: show_startup_investing()
-    with asset_tabs[6]: show_business_marketplace()
-    with asset_tabs[7]: show_royalty_investing()
-    with asset_tabs[8]: show_municipal_bonds()
-    with asset_tabs[9]: show_sports_equine()
+    show_market_tabs()
     
     st.markdown("---")
     show_universal_research()
+    show_projection(user, "mkt")
 def show_settings(user):
     col1, col2 = st.columns([5, 1])
     with col1: st.header("⚙️ Settings")
@@ -909,19 +1020,95 @@ def show_settings(user):
     
     st.write(f"**Username:** {user['app_id']}\n**Email:** {user['email']}")
     dark_mode = st.toggle("Dark Mode", value=True)
-    if st.button("Save Preferences", type="primary"): st.success("Saved!")
+    currencies = fx.fx_rates.currencies()
+    current = user.get("settings", {}).get("currency", "USD")
+    currency = st.selectbox("Display Currency", currencies, index=currencies.index(current) if current in currencies else 0, key="display_currency")
+    st.caption(f"1 USD = {fx.format_amount(fx.fx_rates.rate('USD', currency), currency)}" + (f" · rates updated {fx.fx_rates.updated_at:%H:%M}" if fx.fx_rates.updated_at else " · seed rates"))
+    if st.button("Save Preferences", type="primary"):
+        user.setdefault("settings", {})["currency"] = currency
+        st.success("Saved!")
     st.divider()
     if st.button("Logout", type="secondary"): logout()
 
 # ----------------------------
 # Main App
 # ----------------------------
-def main():
+def show_admin_metrics():
+    st.header("📊 Metrics")
+    st.caption("Since this server process started. Prometheus text is served on BREAKBREAD_METRICS_PORT when set.")
+    if st.button("Refresh", key="metrics_refresh"):
+        st.rerun()
+    providers = metrics.registry.provider_rows()
+    st.subheader("Providers")
+    if providers:
+        st.dataframe(pd.DataFrame(providers).set_index("provider").style.format(
+            {"mean_ms": "{:,.1f}", "p50_ms": "{:,.1f}", "p95_ms": "{:,.1f}"}, na_rep="–"), use_container_width=True)
+    else:
+        st.info("No provider calls yet.")
+    st.subheader("Circuit Breakers")
+    breakers = breaker.rows()
+    if breakers:
+        st.dataframe(pd.DataFrame(breakers).set_index("provider").style.format(
+            {"last_latency_ms": "{:,.0f}", "retry_in_s": "{:.0f}"}, na_rep="–"), use_container_width=True)
+        st.caption(f"Open after {breaker.FAILURE_THRESHOLD} failures or calls over {breaker.SLOW_CALL:.0f}s "
+                   f"within {breaker.WINDOW:.0f}s; one trial call after {breaker.COOLDOWN:.0f}s open.")
+    else:
+        st.info("No breaker has seen a call yet.")
+    routing = provider_router.market_router().rows()
+    if routing:
+        st.subheader("Provider Routing")
+        st.caption("Backends are tried fastest first per asset class; demo data answers what none could.")
+        st.dataframe(pd.DataFrame(routing).style.format({"latency_ms": "{:,.1f}"}), use_container_width=True, hide_index=True)
+    streams = quote_stream.quote_bus().rows()
+    if streams:
+        st.subheader("Quote Streams")
+        st.caption(f"One upstream poll per symbol every {quote_stream.POLL_INTERVAL}s, shared by every subscribed session.")
+        st.dataframe(pd.DataFrame(streams).style.format({"price": "{:,.2f}", "age_s": "{:,.0f}"}, na_rep="–"),
+                     use_container_width=True, hide_index=True)
+    c1, c2 = st.columns(2)
+    with c1:
+        st.subheader("Caches")
+        caches = metrics.registry.cache_rows()
+        if caches: st.dataframe(pd.DataFrame(caches).set_index("cache").style.format({"hit_rate": "{:.0%}"}), use_container_width=True)
+    with c2:
+        st.subheader("Upstream Responses")
+        upstream = metrics.registry.upstream_rows()
+        if upstream: st.dataframe(pd.DataFrame(upstream), use_container_width=True, hide_index=True)
+    with st.expander("Prometheus text"):
+        st.code(metrics.registry.render(), language="text")
+
+@st.cache_resource
+def metrics_server():
+    port = os.environ.get("BREAKBREAD_METRICS_PORT")
+    return metrics.serve(int(port)) if port else None
+
+def show_profile():
+    with st.expander(f"⏱️ Render Profile ({profiler.profile.runs} runs, all sessions)"):
+        st.dataframe(profiler.profile.summary()[:20], use_container_width=True, hide_index=True)
+        st.download_button("Download folded stacks", profiler.profile.folded_text(), file_name="profile.folded",
+                           help="Input for flamegraph.pl or speedscope")
+
+def run_page():
     ensure_demo_users()
     if not st.session_state.get("auth_user"):
         show_login()
         return
     show_main_app()
 
+def profiling_requested():
+    """``BREAKBREAD_PROFILE``, or ``?profile=1`` from an admin: the profile spans every session and is written to disk."""
+    user = get_user(st.session_state.get("auth_user"))
+    return profiler.enabled(st.query_params if user and user["app_id"] in ADMIN_USERS else None)
+
+def main():
+    metrics_server()
+    if not profiling_requested():
+        run_page()
+        return
+    profiler.instrument(globals())
+    with profiler.run():
+        run_page()
+    show_profile()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,71 @@
+import gc
+
+from app.alerts import AlertEngine
+
+
+def test_rising_price_fires_crossed_thresholds_once():
+    engine = AlertEngine()
+    engine.add_alert("u1", "BTC-USD", 100)
+    engine.add_alert("u2", "BTC-USD", 120)
+    engine.on_price("BTC-USD", 90)
+    assert engine.on_price("BTC-USD", 110) == [("u1", 100.0, "above")]
+    assert engine.on_price("BTC-USD", 115) == []
+    assert [e["threshold"] for e in engine.drain("u1")] == [100.0]
+    assert engine.drain("u1") == []
+    assert engine.drain("u2") == []
+
+
+def test_falling_alert_and_first_observation():
+    engine = AlertEngine()
+    engine.add_alert("u1", "ETH-USD", 50, direction="below")
+    assert engine.on_price("ETH-USD", 40) == [("u1", 50.0, "below")]
+    assert engine.on_price("ETH-USD", 30) == []
+
+
+def test_alert_added_after_price_already_past_fires_immediately():
+    engine = AlertEngine()
+    engine.on_price("AAPL", 200)
+    engine.add_alert("u1", "AAPL", 150)
+    assert engine.drain("u1")[0]["price"] == 200.0
+
+
+def test_sync_user_moves_and_removes_alerts():
+    engine = AlertEngine()
+    user = {"user_id": "u1", "settings": {"price_alerts": {"AAPL": 150, "MSFT": 300}}}
+    engine.sync_user(user)
+    user["settings"]["price_alerts"] = {"AAPL": 160}
+    engine.sync_user(user)
+    assert engine.symbols() == {"AAPL"}
+    engine.on_price("AAPL", 155)
+    assert engine.drain("u1") == []
+
+
+def test_owners_keep_same_user_id_apart():
+    engine = AlertEngine()
+    visitor_a = {"user_id": "user_1", "settings": {"price_alerts": {"BTC-USD": 100}}}
+    visitor_b = {"user_id": "user_1", "settings": {"price_alerts": {"BTC-USD": 200}}}
+    engine.sync_user(visitor_a, owner="session-a:user_1")
+    engine.sync_user(visitor_b, owner="session-b:user_1")
+    engine.on_price("BTC-USD", 150)
+    assert [e["threshold"] for e in engine.drain("session-a:user_1")] == [100.0]
+    assert engine.drain("session-b:user_1") == []
+
+
+def test_forget_drops_alerts_and_events():
+    engine = AlertEngine()
+    engine.add_alert("s:u1", "AAPL", 100)
+    engine.on_price("AAPL", 120)
+    engine.forget("s:u1")
+    assert engine.symbols() == set()
+    assert engine.drain("s:u1") == []
+
+
+def test_session_alerts_are_forgotten_with_the_session(monkeypatch):
+    from app import notifications
+    engine = AlertEngine()
+    monkeypatch.setattr(notifications, "alert_engine", engine)
+    session = notifications._SessionAlerts("user_1")
+    engine.add_alert(session.owner, "AAPL", 100)
+    del session
+    gc.collect()
+    assert engine.symbols() == set()
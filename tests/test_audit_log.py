@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from app.audit_log import AuditLog
+
+
+@pytest.fixture
+def make_log(tmp_path):
+    logs = []
+
+    def make(**kwargs):
+        log = AuditLog(str(tmp_path / "audit"), flush_interval=0.05, **kwargs)
+        logs.append(log)
+        return log
+    yield make
+    for log in logs:
+        log.close()
+
+
+def test_entries_come_back_in_order(make_log):
+    log = make_log()
+    for step in ("created", "checked", "completed"):
+        log.log(step, transaction_id="t1")
+    log.log("created", transaction_id="t2")
+    assert log.flush()
+    assert [e["event"] for e in log.by_transaction("t1")] == ["created", "checked", "completed"]
+    assert [e["transaction_id"] for e in log.by_event("created")] == ["t2", "t1"]
+    assert len(log) == 4
+
+
+def test_by_event_limit_takes_the_newest(make_log):
+    log = make_log()
+    for i in range(5):
+        log.log("login", user=i)
+    log.flush()
+    assert [e["user"] for e in log.by_event("login", limit=2)] == [4, 3]
+    assert [e["user"] for e in log.by_event("login", limit=10)] == [4, 3, 2, 1, 0]
+
+
+def test_rotation_drops_the_oldest_segments_from_disk_and_index(make_log, tmp_path):
+    log = make_log(segment_max_entries=2, max_segments=2)
+    for i in range(6):
+        log.log("tick", transaction_id=f"t{i}")
+    log.flush()
+    assert sorted(os.listdir(tmp_path / "audit")) == ["audit-000002.jsonl", "audit-000003.jsonl"]
+    assert log.by_transaction("t0") == []
+    assert [e["transaction_id"] for e in log.by_event("tick")] == ["t5", "t4", "t3", "t2"]
+    assert len(log) == 4
+
+
+def test_restart_rebuilds_the_index_and_writes_a_new_segment(make_log, tmp_path):
+    first = make_log()
+    first.log("transfer", transaction_id="t1")
+    first.close()
+    with open(tmp_path / "audit" / "audit-000001.jsonl", "ab") as f:
+        f.write(b'{"event": "torn')  # crash mid-line
+    second = make_log()
+    second.log("transfer", transaction_id="t2")
+    second.flush()
+    assert [e["transaction_id"] for e in second.by_event("transfer")] == ["t2", "t1"]
+    assert (tmp_path / "audit" / "audit-000002.jsonl").exists()
+
+
+def test_full_queue_drops_instead_of_blocking(make_log, monkeypatch):
+    log = make_log(queue_size=2)
+    monkeypatch.setattr(log, "_ensure_started", lambda: None)  # no writer draining the queue
+    assert [log.log("x") for _ in range(3)] == [True, True, False]
+    assert log.dropped == 1
+    log._thread = object()  # as if the writer had died with the queue full
+    assert log.flush(timeout=0.05) is False
+    log._thread = None
+
+
+def test_write_error_is_recorded_and_the_writer_keeps_going(make_log, monkeypatch):
+    log = make_log()
+    real_write = log._write
+    failures = [OSError("disk full")]
+
+    def write(entries):
+        if failures:
+            raise failures.pop()
+        real_write(entries)
+
+    monkeypatch.setattr(log, "_write", write)
+    log.log("lost")
+    assert log.flush()
+    log.log("kept")
+    assert log.flush()
+    assert log.dropped == 1
+    assert [e["event"] for e in log.by_event("kept")] == ["kept"]
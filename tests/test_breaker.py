@@ -0,0 +1,134 @@
+import pytest
+
+from app import breaker as breakers
+from app.breaker import CircuitBreaker, CircuitOpen, protected
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def _fail():
+    raise ConnectionError("down")
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cb(clock):
+    return CircuitBreaker("test", failure_threshold=3, window=60, cooldown=30, clock=clock)
+
+
+def _trip(cb):
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            cb.call(_fail)
+
+
+def test_opens_after_threshold_failures_within_window(cb, clock):
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            cb.call(_fail)
+    clock.now = 61  # the first two have aged out of the window
+    with pytest.raises(ConnectionError):
+        cb.call(_fail)
+    assert cb.state == "closed"
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            cb.call(_fail)
+    assert cb.state == "open" and cb.is_open()
+    with pytest.raises(CircuitOpen):
+        cb.call(lambda: "never called")
+
+
+def test_server_errors_count_but_client_errors_do_not(cb):
+    for _ in range(3):
+        cb.call(lambda: Response(404))
+    assert cb.state == "closed"
+    for _ in range(3):
+        cb.call(lambda: Response(503))
+    assert cb.state == "open"
+
+
+def test_half_open_trial_closes_on_success_and_reopens_on_failure(cb, clock):
+    _trip(cb)
+    clock.now += 30
+    assert not cb.is_open()
+    assert cb.acquire()
+    assert cb.state == "half_open" and cb.is_open()  # only one trial at a time
+    cb.record(False)
+    assert cb.state == "open"
+    clock.now += 30
+    assert cb.call(lambda: "ok") == "ok"
+    assert cb.state == "closed" and not cb.failures
+
+
+def test_slow_successful_calls_count_as_failures(cb):
+    for _ in range(3):
+        assert cb.acquire()
+        cb.record(True, seconds=cb.slow_call + 1)
+    assert cb.state == "open"
+    assert cb.last_error.startswith("slow call")
+
+
+def test_protected_serves_last_live_result_then_fallback_while_open(monkeypatch, cb):
+    monkeypatch.setattr(breakers, "breaker", lambda name: cb)
+    live = {"AAPL": 1}
+
+    @protected("test", lambda symbol: {"symbol": symbol, "source": "Demo Data"})
+    def quote(symbol):
+        return cb.call(lambda: {"symbol": symbol, "price": live[symbol], "source": "Live"})
+
+    assert quote("AAPL")["price"] == 1
+    _trip(cb)
+    live["AAPL"] = 2
+    assert quote("AAPL")["price"] == 1
+    assert quote("MSFT")["source"] == "Demo Data"
+
+
+
+def test_protected_covers_losing_the_half_open_race(monkeypatch, cb, clock):
+    monkeypatch.setattr(breakers, "breaker", lambda name: cb)
+    race = []
+
+    @protected("test", lambda symbol: {"symbol": symbol, "source": "Demo Data"})
+    def quote(symbol):
+        if race:
+            assert cb.acquire()  # another caller claims the trial after our is_open() check
+        return cb.call(lambda: {"symbol": symbol, "price": 1, "source": "Live"})
+
+    assert quote("AAPL")["price"] == 1
+    _trip(cb)
+    clock.now += cb.cooldown
+    race.append(True)
+    assert quote("AAPL")["price"] == 1
+    cb.record(True)  # the other caller's trial succeeds
+    race.clear()
+    assert quote("MSFT")["source"] == "Live"
+
+
+def test_provider_function_hides_the_half_open_race_from_users(monkeypatch, cb, clock):
+    from data_providers import crypto
+    monkeypatch.setattr(breakers, "breaker", lambda name: cb)
+    monkeypatch.setattr(crypto.st, "error", lambda *a, **k: pytest.fail("st.error shown for an open circuit"))
+
+    def lose_the_race(name, fn, *args, **kwargs):
+        assert cb.acquire()
+        return breakers.call(name, fn, *args, **kwargs)
+
+    monkeypatch.setattr(crypto, "call", lose_the_race)
+    _trip(cb)
+    clock.now += cb.cooldown
+    assert all(row["source"] == "Demo Data" for row in crypto.get_crypto_prices())
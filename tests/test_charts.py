@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import charts
+from app.charts import FigureCache, data_version, downsample, lttb, minmax, resample_ohlc
+
+
+def history(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    close[n // 3], close[2 * n // 3] = 500.0, -300.0  # one spike each way
+    index = pd.date_range("2020-01-01", periods=n, freq="D")
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close}, index=index)
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsampling_keeps_the_ends_and_extremes_within_budget(method):
+    full = history(5_000)
+    points = downsample(full, width=200, method=method)
+    assert len(points) <= 200
+    assert points.index.is_monotonic_increasing
+    assert points.index[0] == full.index[0] and points.index[-1] == full.index[-1]
+    assert points["Close"].max() == full["Close"].max()
+    assert points["Close"].min() == full["Close"].min()
+
+
+def test_short_series_pass_through_unchanged():
+    short = history(50)
+    assert downsample(short, width=200) is short
+    assert list(lttb(np.arange(5), np.arange(5), 10)) == [0, 1, 2, 3, 4]
+    assert list(minmax(np.arange(5), 3)) == [0, 1, 2, 3, 4]
+
+
+def test_lttb_returns_exactly_threshold_indices():
+    keep = lttb(np.arange(1_000), np.sin(np.arange(1_000) / 20), 100)
+    assert len(keep) == 100 and len(set(keep)) == 100
+
+
+def test_resampled_candles_keep_the_range():
+    full = history(2_000)
+    bars = resample_ohlc(full, width=400)
+    assert len(bars) <= 400 // charts.CANDLE_PX
+    assert bars["High"].max() == full["High"].max() and bars["Low"].min() == full["Low"].min()
+    assert bars["Open"].iloc[0] == full["Open"].iloc[0] and bars["Close"].iloc[-1] == full["Close"].iloc[-1]
+
+
+def test_figure_cache_key_follows_the_data_version(monkeypatch):
+    cache = FigureCache(size=2)
+    monkeypatch.setattr(charts, "figure_cache", cache)
+    full = history(300)
+    charts.price_figure(full, "AAPL", symbol="AAPL", period="1y")
+    charts.price_figure(full.copy(), "AAPL", symbol="AAPL", period="1y")
+    assert (cache.hits, cache.misses) == (1, 1)
+    refreshed = pd.concat([full, history(301).iloc[[-1]]])
+    assert data_version(refreshed) != data_version(full)
+    charts.price_figure(refreshed, "AAPL", symbol="AAPL", period="1y")
+    assert cache.misses == 2
+
+
+def test_figure_cache_evicts_least_recently_used():
+    cache = FigureCache(size=2)
+    built = []
+
+    def build(key):
+        def make():
+            built.append(key)
+            return charts.go.Figure()
+        return make
+
+    for key in ("a", "b", "a", "c", "b"):
+        cache.get(key, build(key))
+    assert built == ["a", "b", "c", "b"]  # "b" was the oldest when "c" arrived
@@ -0,0 +1,40 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import core
+from app.audit_log import AuditLog
+from app.fraud_rules import RulesEngine
+
+
+class SlowEngine(RulesEngine):
+    """Takes a moment to score, so racing sends overlap inside the check."""
+
+    def check(self, *args, **kwargs):
+        decision = super().check(*args, **kwargs)
+        time.sleep(0.01)
+        return decision
+
+
+@pytest.fixture
+def bank(monkeypatch, tmp_path):
+    monkeypatch.setattr(core, "users_db", {})
+    monkeypatch.setattr(core, "transactions_db", [])
+    monkeypatch.setattr(core, "fraud_engine", SlowEngine())
+    monkeypatch.setattr(core, "security_logs", AuditLog(str(tmp_path)))
+    monkeypatch.setattr(core, "break_bread_fund", 0.0)
+    for user_id in ("alice", "bob"):
+        core.users_db[user_id] = core.User(user_id)
+    core.users_db["alice"].balance = 1_000.0
+    yield core
+    core.security_logs.close()
+
+
+def test_concurrent_sends_cannot_all_slip_under_the_frequency_rule(bank):
+    with ThreadPoolExecutor(8) as pool:
+        sent = list(pool.map(lambda _: bank.transfer("alice", "bob", 10.0, 0.0), range(16)))
+    statuses = [t.status for t in sent]
+    assert statuses.count("completed") == 11  # the 12th send in 24h is over the limit of 10 prior
+    assert statuses.count("flagged") == 5
+    assert bank.users_db["alice"].balance == 1_000.0 - 110.0
@@ -0,0 +1,92 @@
+import pytest
+import requests
+
+from data_providers import fiscaldata
+from data_providers.fiscaldata import FiscalDataStore, serve_fixtures
+
+
+@pytest.fixture(autouse=True)
+def no_breaker(monkeypatch):
+    """Keep these syncs out of the process-wide fiscaldata circuit breaker."""
+    monkeypatch.setattr(fiscaldata, "call", lambda name, fn, *args, **kwargs: fn(*args, **kwargs))
+
+
+class DownSession:
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(timeout)
+        raise requests.ConnectionError("down")
+
+
+def test_failed_sync_backs_off_instead_of_retrying_every_call(tmp_path):
+    now = [1000.0]
+    store = FiscalDataStore(str(tmp_path / "fd.sqlite"), url="http://fiscaldata.invalid", clock=lambda: now[0])
+    session = DownSession()
+    with pytest.raises(requests.ConnectionError):
+        store.sync(session=session)
+    assert store.sync(session=session) == 0
+    assert session.calls == [fiscaldata.FETCH_TIMEOUT]
+
+    now[0] += fiscaldata.RETRY_AFTER
+    with pytest.raises(requests.ConnectionError):
+        store.sync(session=session)
+    assert store.retry_at == now[0] + 2 * fiscaldata.RETRY_AFTER
+    assert len(session.calls) == 2
+
+
+def test_sync_pages_through_fixture_then_checks_once_a_day(tmp_path):
+    server = serve_fixtures(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/avg_interest_rates"
+        store = FiscalDataStore(str(tmp_path / "fd.sqlite"), url=url)
+        stored = store.sync()
+        assert stored == store.count() > 0
+        assert store.watermark()[0] == max(r["record_date"] for r in store.rates())
+        assert store.sync() == 0
+        assert store.sync(force=True) == 0  # nothing past the watermark
+    finally:
+        server.shutdown()
+
+
+class PagedSession:
+    """Serves ``rows`` two to a page (honouring a ``record_date:gt`` filter); fails on request ``fail_on``."""
+
+    def __init__(self, rows, fail_on=None):
+        self.rows, self.fail_on, self.requests = rows, fail_on, 0
+
+    def get(self, url, params=None, timeout=None):
+        self.requests += 1
+        if self.requests == self.fail_on:
+            raise requests.ConnectionError("dropped mid-backfill")
+        since = params.get("filter", "").partition("record_date:gt:")[2]
+        rows = [r for r in self.rows if r["record_date"] > since]
+        number = int(params["page[number]"])
+        return Response({"data": rows[(number - 1) * 2:number * 2],
+                         "links": {"next": f"&page[number]={number + 1}" if number * 2 < len(rows) else None}})
+
+
+class Response:
+    status_code = 200
+
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+def test_interrupted_backfill_resumes_without_losing_a_split_date(tmp_path):
+    rows = [{"record_date": d, "security_type_desc": "Marketable", "security_desc": f"S{i}",
+             "avg_interest_rate_amt": "1.0"} for d in ("2024-01-31", "2024-02-29") for i in range(3)]
+    store = FiscalDataStore(str(tmp_path / "fd.sqlite"), url="http://fiscaldata.invalid")
+    with pytest.raises(requests.ConnectionError):
+        store.sync(session=PagedSession(rows, fail_on=3))  # page 2 ended part-way through 2024-02-29
+    assert store.watermark()[0] == "2024-01-31"
+    store.sync(force=True, session=PagedSession(rows))
+    assert store.count() == 6
+    assert store.watermark()[0] == "2024-02-29"
@@ -0,0 +1,17 @@
+from datetime import datetime, timedelta
+
+from app.fraud_batch import rescore
+
+T0 = datetime(2025, 1, 1)
+
+
+def _ledger(rows):
+    return [{"transaction_id": f"t{i}", "sender_id": "alice", "recipient_id": f"r{i}", "amount": amount,
+             "timestamp": T0 + timedelta(minutes=i), "status": status}
+            for i, (amount, status) in enumerate(rows)]
+
+
+def test_only_completed_blocks_count_as_missed():
+    flagged = rescore(_ledger([(600, "completed"), (20_000, "completed"), (20_000, "flagged")]), {"alice": 5_000})
+    assert list(flagged["action"]) == ["2fa", "block", "block"]
+    assert list(flagged["missed"]) == [False, True, False]
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+from app.fraud_rules import FeatureStore, RulesEngine
+
+T0 = datetime(2025, 1, 1, 12, 0)
+
+
+def test_window_count_does_not_depend_on_check_order():
+    store = FeatureStore()
+    for minutes in (0, 60, 120):
+        store.observe("alice", "bob", 10, T0 + timedelta(minutes=minutes))
+    late = store.features("alice", "bob", 10, T0 + timedelta(hours=24, minutes=30))
+    early = store.features("alice", "bob", 10, T0 + timedelta(minutes=90))
+    assert late["txn_count_24h"] == 2
+    assert early["txn_count_24h"] == 2
+    assert store.features("alice", "bob", 10, T0 + timedelta(minutes=90))["txn_count_24h"] == 2
+
+
+def test_entries_age_out_only_as_newer_ones_are_recorded():
+    store = FeatureStore()
+    store.observe("alice", "bob", 10, T0)
+    store.observe("alice", "bob", 10, T0 + timedelta(hours=30))
+    assert store.features("alice", "bob", 10, T0 + timedelta(hours=30))["txn_count_24h"] == 1
+    store.observe("alice", "carol", 10, T0 + timedelta(hours=29))
+    assert store.features("alice", "bob", 10, T0 + timedelta(hours=30))["txn_count_24h"] == 2
+
+
+def test_strongest_action_wins():
+    engine = RulesEngine()
+    decision = engine.check("t1", "alice", "bob", 20_000, T0, transaction_limit=5_000)
+    assert decision.action == "block"
+    assert {hit.name for hit in decision.hits} == {
+        "transaction_over_limit", "large_amount_new_recipient", "large_transaction"}
+    assert engine.check("t2", "alice", "bob", 600, T0, transaction_limit=5_000).action == "2fa"
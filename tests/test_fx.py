@@ -0,0 +1,19 @@
+import pytest
+
+from app.fx import FxRates, format_amount
+
+
+def test_first_live_rate_replaces_a_stale_seed_then_moves_are_capped():
+    batches = [{"NGN": 0.00065}, {"NGN": 0.002}, {"NGN": 0.0007}]
+    rates = FxRates(seed={"USD": 1.0, "NGN": 0.002}, fetcher=lambda currencies: batches.pop(0))
+    assert rates.refresh()
+    assert rates.rate("NGN", "USD") == pytest.approx(0.00065)
+    assert not rates.refresh()
+    assert rates.refresh()
+    assert rates.rate("USD", "NGN") == pytest.approx(1 / 0.0007)
+
+
+def test_convert_and_format():
+    rates = FxRates(seed={"USD": 1.0, "EUR": 1.25}, fetcher=lambda currencies: {})
+    assert rates.convert(100.0, "USD", "EUR") == pytest.approx(80.0)
+    assert format_amount(-1234.5, "EUR") == "-€1,234.50"
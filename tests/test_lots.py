@@ -0,0 +1,67 @@
+import math
+
+import pytest
+
+from app.lots import LotLedger, unrealized_pnl
+
+
+@pytest.fixture
+def ledger():
+    ledger = LotLedger()
+    ledger.buy("u1", "AAPL", 10, 10.0, lot_id="old")
+    ledger.buy("u1", "AAPL", 10, 20.0, lot_id="new")
+    return ledger
+
+
+def test_fifo_consumes_the_oldest_lot_then_part_of_the_next(ledger):
+    records = ledger.sell("u1", "AAPL", 15, 30.0)
+    assert [(r["lot_id"], r["units"], r["cost_basis"]) for r in records] == [("old", 10, 100.0), ("new", 5, 100.0)]
+    assert ledger.lot_units("u1", "AAPL", "new") == 5
+    assert ledger.position("u1", "AAPL") == (5.0, 100.0)
+
+
+def test_lifo_consumes_the_newest_lot(ledger):
+    (record,) = ledger.sell("u1", "AAPL", 4, 30.0, method="lifo")
+    assert (record["lot_id"], record["gain"]) == ("new", 40.0)
+    assert ledger.position("u1", "AAPL") == (16.0, 220.0)
+
+
+def test_selling_more_than_the_lots_leaves_the_excess_unrealized(ledger):
+    records = ledger.sell("u1", "AAPL", 25, 30.0)
+    assert sum(r["units"] for r in records) == 20
+    assert ledger.position("u1", "AAPL") == (0.0, 0.0)
+    assert ledger.open_lots("u1").empty
+
+
+def test_fees_go_into_basis_and_come_off_proceeds_pro_rata():
+    ledger = LotLedger()
+    ledger.buy("u1", "AAPL", 10, 10.0, fee=10.0, lot_id="a")  # 11 a unit all-in
+    ledger.buy("u1", "AAPL", 10, 10.0, lot_id="b")
+    records = ledger.sell("u1", "AAPL", 15, 20.0, fee=3.0)
+    assert [(r["cost_basis"], r["proceeds"]) for r in records] == [(110.0, 198.0), (50.0, 99.0)]
+    ledger.buy("u2", "MSFT", 10, 10.0, fee=10.0, lot_id="c")
+    (record,) = ledger.sell("u2", "MSFT", 5, 20.0)
+    assert record["cost_basis"] == 55.0
+    assert ledger.open_lots("u2")["cost_basis"].tolist() == [55.0]  # the rest of the fee stays with the lot
+
+
+def test_specific_lot_sells(ledger):
+    (record,) = ledger.sell("u1", "AAPL", 3, 30.0, method="specific", lot_id="new")
+    assert (record["lot_id"], record["units"]) == ("new", 3)
+    with pytest.raises(ValueError, match="not open"):
+        ledger.sell("u1", "AAPL", 1, 30.0, method="specific", lot_id="missing")
+    with pytest.raises(ValueError, match="not open"):
+        ledger.sell("u1", "MSFT", 1, 30.0, method="specific", lot_id="old")  # no lots in that symbol at all
+    with pytest.raises(ValueError):
+        ledger.sell("u1", "AAPL", 1, 30.0, method="specific")
+    assert ledger.position("u1", "AAPL") == (17.0, 240.0)
+
+
+def test_unrealized_pnl_marks_lots_and_leaves_unquoted_ones_nan(ledger):
+    ledger.buy("u1", "MSFT", 2, 50.0)
+    lots = unrealized_pnl(ledger.open_lots("u1"), {"AAPL": 15.0})
+    aapl = lots[lots["symbol"] == "AAPL"].set_index("lot_id")
+    assert aapl.loc["old", "gain"] == 50.0 and aapl.loc["new", "gain"] == -50.0
+    assert aapl.loc["old", "gain_pct"] == 0.5
+    assert math.isnan(lots.loc[lots["symbol"] == "MSFT", "gain"].iloc[0])
+    assert lots["gain"].sum() == 0.0
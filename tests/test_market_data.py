@@ -0,0 +1,30 @@
+import pytest
+
+from app import market_data
+from data_providers import router as routing
+from data_providers.base import MarketDataProvider
+from data_providers.router import ProviderRouter
+
+
+class Down(MarketDataProvider):
+    name = "down"
+    asset_classes = ("equity", "index")
+
+    def bars(self, symbol, period="1mo"):
+        raise ConnectionError("no network")
+
+
+@pytest.fixture
+def offline_router(monkeypatch):
+    monkeypatch.setattr(routing, "_router", ProviderRouter([Down()]))
+
+
+def test_unknown_symbol_gets_no_data_instead_of_a_demo_price(offline_router):
+    assert market_data.get_stock_data("ZZZNOTREAL", "1mo") is None
+
+
+def test_known_index_falls_back_to_labelled_demo_data(offline_router):
+    data = market_data.get_stock_data("^GSPC", "5d")
+    assert data["source"] == "Demo Data"
+    assert len(data["historical"]) == 5
+    assert data["current_price"] == data["historical"]["Close"].iloc[-1]
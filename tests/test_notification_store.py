@@ -0,0 +1,32 @@
+from app.notification_store import NotificationStore
+
+
+def test_reads_are_per_user_and_bounded():
+    store = NotificationStore(capacity=3)
+    for i in range(5):
+        store.add("u1", f"n{i}")
+    store.add("u2", "other")
+    assert [n["message"] for n in store.get("u1")] == ["n2", "n3", "n4"]
+    assert [n["message"] for n in store.get("u2")] == ["other"]
+    assert store.get("nobody") == []
+
+
+def test_since_cursor_and_unread_count():
+    store = NotificationStore()
+    store.add("u1", "first")
+    cursor = store.cursor("u1")
+    store.add("u1", "second")
+    assert [n["message"] for n in store.get("u1", since=cursor)] == ["second"]
+    assert store.unread_count("u1") == 2
+    store.mark_read("u1")
+    assert store.unread_count("u1") == 0
+
+
+def test_persisted_notifications_replay_as_read(tmp_path):
+    path = tmp_path / "notes.jsonl"
+    store = NotificationStore(path=str(path))
+    store.add("u1", "kept")
+    replayed = NotificationStore(path=str(path))
+    assert [n["message"] for n in replayed.get("u1")] == ["kept"]
+    assert replayed.unread_count("u1") == 0
+    assert replayed.add("u1", "next")["id"] == 2
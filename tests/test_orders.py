@@ -0,0 +1,109 @@
+import pytest
+
+from app.orders import InMemoryLedger, Order, OrderManager
+
+
+class Feed:
+    """``quote_feed`` stand-in: one (price, size) per symbol, changeable between batches."""
+
+    def __init__(self, price, size=100.0):
+        self.price, self.size = price, size
+
+    def __call__(self, symbol):
+        return self.price, self.size
+
+
+@pytest.fixture
+def users():
+    return {"u1": {"user_id": "u1", "balance": 1_000.0, "portfolio": {}}}
+
+
+def test_market_buy_fills_and_settles(users):
+    manager = OrderManager(InMemoryLedger(users), Feed(10.0))
+    order = manager.submit(Order("u1", "AAPL", "buy", 5))
+    assert manager.process_batch() == [(order.order_id, 5, 10.0)]
+    assert order.status == "filled"
+    assert users["u1"]["balance"] == 950.0
+    assert users["u1"]["portfolio"] == {"AAPL": 5}
+
+
+def test_large_order_fills_across_batches(users):
+    manager = OrderManager(InMemoryLedger(users), Feed(10.0, size=4))
+    order = manager.submit(Order("u1", "AAPL", "buy", 10))
+    manager.process_batch()
+    assert (order.status, order.filled) == ("partially_filled", 4)
+    manager.process_batch()
+    manager.process_batch()
+    assert (order.status, order.filled) == ("filled", 10)
+
+
+def test_resting_limit_fills_when_price_crosses(users):
+    feed = Feed(10.0)
+    manager = OrderManager(InMemoryLedger(users), feed)
+    order = manager.submit(Order("u1", "AAPL", "buy", 2, "limit", 9.0))
+    manager.process_batch()
+    assert order.status == "open"
+    feed.price = 8.5
+    manager.process_batch()
+    assert (order.status, order.avg_price) == ("filled", 8.5)
+
+
+def test_partial_fill_that_runs_out_of_funds_is_cancelled(users):
+    users["u1"]["balance"] = 50.0
+    manager = OrderManager(InMemoryLedger(users), Feed(10.0, size=3))
+    order = manager.submit(Order("u1", "AAPL", "buy", 10))
+    manager.process_batch()
+    manager.process_batch()
+    manager.process_batch()
+    assert (order.status, order.filled, order.reason) == ("cancelled", 5, "Insufficient funds")
+    assert manager.order_log[0]["filled"] == 5
+
+
+def test_order_with_no_capacity_is_rejected(users):
+    manager = OrderManager(InMemoryLedger(users), Feed(10.0))
+    order = manager.submit(Order("u1", "AAPL", "sell", 1))
+    manager.process_batch()
+    assert (order.status, order.reason) == ("rejected", "Insufficient holdings")
+
+
+def _seed_lot(users, units=10.0):
+    ledger = InMemoryLedger(users)
+    users["u1"]["portfolio"]["AAPL"] = units
+    lot_id = ledger.lots.buy("u1", "AAPL", units, 8.0)
+    return ledger, lot_id
+
+
+def test_specific_lot_sell_larger_than_the_lot_is_rejected(users):
+    ledger, lot_id = _seed_lot(users)
+    manager = OrderManager(ledger, Feed(10.0, size=5))
+    order = manager.submit(Order("u1", "AAPL", "sell", 15, lot_method="specific", lot_id=lot_id))
+    assert (order.status, order.reason) == ("rejected", "Order is larger than the lot")
+    manager.process_batch()
+    assert users["u1"]["portfolio"] == {"AAPL": 10.0}
+
+
+def test_specific_lot_sells_never_overdraw_the_lot(users):
+    ledger, lot_id = _seed_lot(users)
+    users["u1"]["portfolio"]["AAPL"] = 20.0  # more held than the lot covers
+    manager = OrderManager(ledger, Feed(10.0, size=5))
+    first = manager.submit(Order("u1", "AAPL", "sell", 8, lot_method="specific", lot_id=lot_id))
+    second = manager.submit(Order("u1", "AAPL", "sell", 8, lot_method="specific", lot_id=lot_id))
+    for _ in range(4):
+        manager.process_batch()
+    assert (first.status, first.filled) == ("filled", 8)
+    assert (second.status, second.filled) == ("cancelled", 2)
+    assert users["u1"]["portfolio"]["AAPL"] == 10.0
+    assert ledger.lots.lot_units("u1", "AAPL", lot_id) == 0.0
+    # The book is left clean, so later orders still match
+    later = manager.submit(Order("u1", "MSFT", "buy", 1))
+    manager.process_batch()
+    assert later.status == "filled"
+
+
+def test_failed_lot_sell_leaves_balance_and_holdings_alone(users):
+    ledger, lot_id = _seed_lot(users)
+    order = Order("u1", "AAPL", "sell", 5, lot_method="specific", lot_id="missing")
+    with pytest.raises(ValueError):
+        ledger.apply_fill(order, 5, 10.0)
+    assert users["u1"]["balance"] == 1_000.0
+    assert users["u1"]["portfolio"] == {"AAPL": 10.0}
@@ -0,0 +1,35 @@
+from app.price_oracle import PriceOracle
+
+
+def _fetcher(*batches):
+    batches = list(batches)
+
+    def fetch():
+        return batches.pop(0), "Live"
+    return fetch
+
+
+def test_first_live_price_replaces_a_stale_seed():
+    oracle = PriceOracle({"gold": 1000.0}, seed_source="seed", fetchers=[_fetcher({"gold": 3700.0})])
+    oracle.refresh()
+    assert oracle.price("gold") == (3700.0, 1)
+    assert oracle.current().sources["gold"] == "Live"
+
+
+def test_live_prices_are_checked_against_the_last_good_one():
+    fetch = _fetcher({"gold": 3700.0}, {"gold": 9000.0}, {"gold": -1.0}, {"gold": 3750.0})
+    oracle = PriceOracle({"gold": 1000.0}, seed_source="seed", fetchers=[fetch])
+    for _ in range(4):
+        oracle.refresh()
+    assert oracle.price("gold") == (3750.0, 2)
+    assert [r[0] for r in oracle.rejected] == ["gold", "gold"]
+    assert oracle.snapshot(0).prices["gold"] == 1000.0
+
+
+def test_failed_fetcher_keeps_the_last_snapshot():
+    def broken():
+        raise RuntimeError("down")
+
+    oracle = PriceOracle({"gold": 1000.0}, fetchers=[broken])
+    assert oracle.refresh().version == 0
+    assert oracle.rejected[-1] == ("broken", None, "down")
@@ -0,0 +1,22 @@
+import numpy as np
+
+from app.projection import CHUNK_MEMORY, Contribution, chunk_paths, contribution_schedule, simulate_portfolio
+
+
+def test_chunks_fit_the_memory_budget():
+    steps, assets = 30 * 252, 10
+    paths = chunk_paths(steps, assets)
+    assert paths * steps * assets * 8 <= CHUNK_MEMORY
+    assert chunk_paths(10**9, 10) == 1
+
+
+def test_same_seed_reproduces_paths_and_zero_vol_compounds_contributions():
+    kwargs = dict(years=1, paths=300, seed=3, contributions=[Contribution("Paycheck", 100.0, 21)])
+    cov = np.array([[0.04]])
+    a = simulate_portfolio(1_000, [1.0], [0.05], cov, chunk_size=64, **kwargs)
+    b = simulate_portfolio(1_000, [1.0], [0.05], cov, chunk_size=64, **kwargs)
+    assert np.array_equal(a["terminal"], b["terminal"])
+
+    flat = simulate_portfolio(1_000, [1.0], [0.0], np.zeros((1, 1)), **kwargs)
+    assert np.allclose(flat["terminal"], 1_000 + flat["contributed"], rtol=1e-3)
+    assert flat["contributed"] == contribution_schedule(kwargs["contributions"], 252).sum() == 1_200.0
@@ -0,0 +1,101 @@
+import gc
+
+import pytest
+
+from app.alerts import AlertEngine
+from app.quote_bus import FakeFeed, QuoteBus, RouterFeed, alert_listener
+from data_providers.base import Quote
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Feed:
+    """Serves the same quote per symbol every time (like a cached upstream) and records each batch."""
+
+    name = "stub"
+
+    def __init__(self, prices):
+        self.quotes = {s: Quote(s, p, 0.0, "Live") for s, p in prices.items()}
+        self.batches = []
+
+    def fetch(self, symbols):
+        self.batches.append(sorted(symbols))
+        return {s: self.quotes[s] for s in symbols}
+
+
+@pytest.fixture(autouse=True)
+def no_poller(monkeypatch):
+    monkeypatch.setattr(QuoteBus, "start", lambda self: None)  # tests drive tick() themselves
+
+
+def test_one_poll_per_symbol_fans_out_to_every_subscriber():
+    feed = Feed({"AAPL": 1.0, "MSFT": 2.0})
+    bus = QuoteBus(feed, clock=Clock())
+    a = bus.subscribe(["AAPL"])
+    b = bus.subscribe(["AAPL", "MSFT"])
+    assert bus.tick() == 2
+    assert feed.batches == [["AAPL", "MSFT"]]
+    assert a.latest()["AAPL"].price == 1.0
+    assert [q.symbol for q in b.drain()] == ["AAPL", "MSFT"]
+
+
+def test_streams_poll_once_per_interval_and_drop_unchanged_quotes():
+    clock = Clock()
+    feed = Feed({"AAPL": 1.0})
+    bus = QuoteBus(feed, interval=15, clock=clock)
+    sub = bus.subscribe(["AAPL"])
+    bus.tick()
+    bus.tick()
+    assert bus.polls == 1
+    clock.now = 15
+    assert bus.tick() == 0  # same quote as last time
+    assert len(sub.drain()) == 1
+
+
+def test_dropped_subscription_ends_its_stream():
+    feed = Feed({"AAPL": 1.0})
+    bus = QuoteBus(feed, clock=Clock())
+    sub = bus.subscribe(["AAPL"])
+    del sub
+    gc.collect()
+    assert bus.tick() == 0
+    assert feed.batches == [] and bus.rows() == []
+
+
+def test_fake_feed_is_deterministic_and_scriptable():
+    first, second = FakeFeed(seed=1), FakeFeed(seed=1)
+    walk = [first.fetch(["AAPL"])["AAPL"].price for _ in range(3)]
+    assert walk == [second.fetch(["AAPL"])["AAPL"].price for _ in range(3)]
+    first.script("AAPL", [10, 20])
+    assert [first.fetch(["AAPL"])["AAPL"].price for _ in range(2)] == [10.0, 20.0]
+
+
+def test_demo_fallback_quotes_never_fire_alerts():
+    engine = AlertEngine()
+    engine.add_alert("u1", "BTC-USD", 40_000)
+    listener = alert_listener(RouterFeed(), engine)
+    listener(Quote("BTC-USD", 30_000.0, 0.0, "Yahoo Finance"))
+    listener(Quote("BTC-USD", 51_234.56, 0.0, "Demo Data"))
+    assert engine.drain("u1") == []
+    listener(Quote("BTC-USD", 41_000.0, 0.0, "Yahoo Finance"))
+    assert [e["price"] for e in engine.drain("u1")] == [41_000.0]
+
+
+def test_fake_feed_quotes_still_fire_alerts():
+    engine = AlertEngine()
+    engine.add_alert("u1", "BTC-USD", 100_000)
+    feed = FakeFeed()
+    feed.script("BTC-USD", [99_000, 101_000])
+    bus = QuoteBus(feed, listeners=[alert_listener(feed, engine)], clock=Clock())
+    sub = bus.subscribe(["BTC-USD"])
+    bus.tick()
+    bus.clock.now = bus.interval
+    bus.tick()
+    assert [e["price"] for e in engine.drain("u1")] == [101_000.0]
+    sub.close()
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from app.rebalance import CASH, CLASSES, plan
+
+CASH_COL = CLASSES.index(CASH)
+
+
+def row(**values):
+    return np.array([[values.get(c, 0.0) for c in CLASSES]])
+
+
+WEIGHTS = row(stocks=0.5, bonds=0.3, crypto=0.1, cash=0.1)[0]
+FEES = row(stocks=0.01, bonds=0.02, crypto=0.03)[0]
+
+
+def after(values, trades, fees):
+    """Values once the trades settle: buys and sells move cash, fees come out of it."""
+    result = values + trades
+    result[:, CASH_COL] -= trades.sum(axis=1) + fees.sum(axis=1)
+    return result
+
+
+def test_post_trade_weights_land_on_target_after_fees():
+    values = row(stocks=9_000, bonds=1_000, crypto=0, cash=5_000)
+    trades, fees = plan(values, WEIGHTS, FEES, tolerance=0, min_trade=0)
+    assert fees.sum() > 0 and trades[0, CASH_COL] == 0
+    settled = after(values, trades, fees)
+    np.testing.assert_allclose(settled / settled.sum(), [WEIGHTS], atol=1e-6)
+    assert settled.sum() == pytest.approx(values.sum() - fees.sum())
+
+
+def test_small_drifts_are_left_alone_and_the_rest_still_lands():
+    values = row(stocks=5_010, bonds=2_000, crypto=2_000, cash=1_000)
+    trades, fees = plan(values, WEIGHTS, FEES, tolerance=0.02, min_trade=10)
+    stocks, bonds, crypto = (CLASSES.index(c) for c in ("stocks", "bonds", "crypto"))
+    assert trades[0, stocks] == 0  # 0.1% off target: inside the band
+    assert trades[0, bonds] > 0 and trades[0, crypto] < 0
+    settled = after(values, trades, fees)
+    free = [bonds, crypto, CASH_COL]
+    np.testing.assert_allclose(settled[0, free] / settled[0, free].sum(), WEIGHTS[free] / WEIGHTS[free].sum(), atol=1e-6)
+
+
+def test_min_trade_skips_tiny_accounts():
+    trades, fees = plan(row(stocks=5, cash=5), WEIGHTS, FEES, tolerance=0, min_trade=10)
+    assert not trades.any() and not fees.any()
+
+
+def test_without_cash_sells_fund_the_buys_and_idle_cash_stays():
+    values = row(stocks=9_000, bonds=1_000, crypto=0, cash=5_000)
+    trades, fees = plan(values, WEIGHTS, FEES, tolerance=0, min_trade=0, include_cash=False)
+    assert trades.sum() + fees.sum() == pytest.approx(0, abs=1e-6)
+    settled = after(values, trades, fees)
+    assert settled[0, CASH_COL] == pytest.approx(5_000)
+    invested = [c for c in range(len(CLASSES)) if c != CASH_COL]
+    np.testing.assert_allclose(settled[0, invested] / settled[0, invested].sum(),
+                               WEIGHTS[invested] / WEIGHTS[invested].sum(), atol=1e-6)
+
+
+def test_rows_are_planned_independently():
+    values = np.vstack([row(stocks=10_000), row(cash=10_000)])
+    trades, _ = plan(values, WEIGHTS, FEES, tolerance=0, min_trade=0)
+    single, _ = plan(values[1:], WEIGHTS, FEES, tolerance=0, min_trade=0)
+    np.testing.assert_allclose(trades[1:], single)
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.risk import RiskEngine, align_prices, max_drawdown, periods_per_year, risk_metrics
+
+
+def _frame(index, closes):
+    return pd.DataFrame({"Close": closes}, index=index)
+
+
+def _walk(n, seed, vol=0.01):
+    return 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, vol, n)))
+
+
+DAYS = pd.date_range("2024-01-01", periods=364, freq="D")
+WEEKDAYS = DAYS[DAYS.dayofweek < 5]
+
+
+def test_align_keeps_only_common_dates():
+    prices = align_prices({"AAPL": _frame(WEEKDAYS, _walk(len(WEEKDAYS), 1)),
+                           "BTC-USD": _frame(DAYS, _walk(len(DAYS), 2))})
+    assert len(prices) == len(WEEKDAYS)
+    assert (prices.index.dayofweek < 5).all()
+
+
+def test_tz_aware_and_naive_indexes_line_up():
+    aware = _frame(WEEKDAYS.tz_localize("America/New_York") + pd.Timedelta(hours=16), _walk(len(WEEKDAYS), 1))
+    prices = align_prices({"AAPL": aware, "MSFT": _frame(WEEKDAYS, _walk(len(WEEKDAYS), 2))})
+    assert len(prices) == len(WEEKDAYS)
+
+
+def test_periods_per_year_follows_the_calendar():
+    assert periods_per_year(DAYS) == pytest.approx(365.25, rel=0.01)
+    assert periods_per_year(WEEKDAYS) == pytest.approx(261, rel=0.01)
+    assert periods_per_year(DAYS[:3]) == 252
+
+
+def test_volatility_is_annualized_at_the_observed_frequency():
+    closes = _walk(len(DAYS), 3, vol=0.02)
+    risk = risk_metrics(align_prices({"BTC-USD": _frame(DAYS, closes)}), {"BTC-USD": 1})
+    daily = np.std(np.diff(closes) / closes[:-1], ddof=1)
+    assert risk["volatility"]["BTC-USD"] == pytest.approx(daily * np.sqrt(risk["periods_per_year"]))
+
+
+def test_benchmark_beta_and_drawdown():
+    bench = _walk(len(WEEKDAYS), 4)
+    prices = align_prices({"^GSPC": _frame(WEEKDAYS, bench), "SPY": _frame(WEEKDAYS, bench * 2)})
+    risk = risk_metrics(prices, {"SPY": 3})
+    assert risk["beta"]["SPY"] == pytest.approx(1.0)
+    assert risk["correlation"].loc["SPY", "SPY"] == pytest.approx(1.0)
+    assert max_drawdown([100, 120, 90, 130]) == pytest.approx(-0.25)
+
+
+def test_engine_memoizes_per_holdings_and_window():
+    calls = []
+
+    def loader(symbols, window):
+        calls.append((tuple(symbols), window))
+        return align_prices({s: _frame(WEEKDAYS, _walk(len(WEEKDAYS), i)) for i, s in enumerate(symbols)})
+
+    engine = RiskEngine(loader=loader)
+    first = engine.analyze({"AAPL": 2}, "1y")
+    assert engine.analyze({"AAPL": 2.0}, "1y") is first
+    engine.analyze({"AAPL": 2}, "6mo")
+    assert len(calls) == 2
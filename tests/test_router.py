@@ -0,0 +1,81 @@
+import pytest
+
+from app.breaker import CircuitBreaker
+from data_providers import router as routing
+from data_providers.base import MarketDataProvider, Quote, Unsupported
+from data_providers.demo import DemoProvider
+from data_providers.router import ProviderRouter
+
+
+class Backend(MarketDataProvider):
+    """Prices a fixed set of stocks and indices; ``down`` makes every call raise."""
+
+    asset_classes = ("equity", "index")
+
+    def __init__(self, name, prices, down=False):
+        self.name, self.source = name, name.title()
+        self.prices, self.down = prices, down
+        self.calls = []
+
+    def quotes(self, symbols):
+        self.calls.append(list(symbols))
+        if self.down:
+            raise ConnectionError(f"{self.name} down")
+        return {s: Quote(s, self.prices[s], 0.0, self.source) for s in symbols if s in self.prices}
+
+    def bars(self, symbol, period="1mo"):
+        if self.down:
+            raise ConnectionError(f"{self.name} down")
+        raise Unsupported(f"{self.name} has no bar history")
+
+
+@pytest.fixture
+def breakers(monkeypatch):
+    created = {}
+    monkeypatch.setattr(routing, "breaker", lambda name: created.setdefault(name, CircuitBreaker(name)))
+    return created
+
+
+def test_symbols_fall_through_to_the_next_backend_then_demo(breakers):
+    first = Backend("first", {"AAPL": 1.0})
+    second = Backend("second", {"MSFT": 2.0})
+    quotes = ProviderRouter([first, second]).quotes(["AAPL", "MSFT", "ZZZZ", "^GSPC", "^NOPE"])
+    assert (quotes["AAPL"].source, quotes["MSFT"].source) == ("First", "Second")
+    assert sorted(second.calls) == [["MSFT", "ZZZZ"], ["^GSPC", "^NOPE"]]  # classes fetch concurrently
+    assert quotes["^GSPC"].is_demo
+    assert "ZZZZ" not in quotes and "^NOPE" not in quotes  # unknown to the demo table: no made-up price
+
+
+def test_failing_backend_falls_through_and_is_ranked_last(breakers):
+    broken = Backend("broken", {"AAPL": 1.0}, down=True)
+    healthy = Backend("healthy", {"AAPL": 2.0})
+    router = ProviderRouter([broken, healthy])
+    assert router.quotes(["AAPL"])["AAPL"].source == "Healthy"
+    assert router.calls[("broken", "equity")] == [1, 1]
+    assert router.candidates("equity")[:2] == [healthy, broken]
+
+
+def test_open_breaker_skips_the_backend(breakers):
+    tripped = Backend("tripped", {"AAPL": 1.0})
+    breakers["tripped"] = CircuitBreaker("tripped", failure_threshold=1)
+    breakers["tripped"].record(False)
+    quotes = ProviderRouter([tripped]).quotes(["AAPL", "^GSPC"])
+    assert tripped.calls == []
+    assert list(quotes) == ["^GSPC"] and quotes["^GSPC"].is_demo
+
+
+def test_live_quotes_are_cached_and_demo_quotes_are_not(breakers):
+    backend = Backend("live", {"AAPL": 1.0})
+    router = ProviderRouter([backend])
+    router.quotes(["AAPL", "^GSPC"])
+    router.quotes(["AAPL", "^GSPC"])
+    assert sorted(backend.calls) == [["AAPL"], ["^GSPC"], ["^GSPC"]]
+
+
+def test_history_reports_the_backend_that_answered(breakers):
+    router = ProviderRouter([Backend("nobars", {})])
+    bars, provider = router.history("^GSPC", "5d")
+    assert isinstance(provider, DemoProvider)
+    assert len(bars) == 5
+    assert ("nobars", "index") not in router.calls  # unsupported isn't a call or a failure
+    assert router.history("ZZZNOTREAL") == (None, None)
@@ -0,0 +1,32 @@
+from app.rebalance import rebalance_all
+from app.valuation import PortfolioValuer
+
+
+def test_quote_moves_adjust_only_holders_and_match_a_full_revalue():
+    valuer = PortfolioValuer()
+    valuer.update_quotes({"AAPL": 10.0, "MSFT": 20.0})
+    valuer.set_holdings("u1", {"AAPL": 2})
+    valuer.set_holdings("u2", {"MSFT": 1})
+    assert valuer.update_quotes({"AAPL": 12.0, "MSFT": 20.0}) == {"AAPL"}
+    assert valuer.value("u1")["total"] == 24.0
+    assert valuer.value("u2")["total"] == 20.0
+    assert valuer.revalue().to_dict() == {"u1": 24.0, "u2": 20.0}
+
+
+def test_session_valuers_keep_the_same_user_id_apart():
+    session_a, session_b = PortfolioValuer(), PortfolioValuer()
+    for valuer in (session_a, session_b):
+        valuer.update_quotes({"AAPL": 10.0})
+    session_a.set_holdings("user_1", {"AAPL": 1})
+    session_b.set_holdings("user_1", {"AAPL": 5})
+    assert session_a.value("user_1")["total"] == 10.0
+    assert session_b.value("user_1")["total"] == 50.0
+
+
+def test_rebalance_all_plans_from_the_given_valuer():
+    valuer = PortfolioValuer()
+    valuer.update_quotes({"AAPL": 10.0})
+    valuer.set_holdings("u1", {"AAPL": 100})
+    trades = rebalance_all(valuer, {"u1": 0.0})
+    assert set(trades["user_id"]) == {"u1"}
+    assert (trades.loc[trades["symbol"] == "AAPL", "side"] == "sell").all()
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from benchmarks.fixtures import fixture_download
+from data_providers import yahoo
+from data_providers.yahoo import YahooProvider
+
+
+def test_quotes_come_from_one_download(monkeypatch):
+    calls = []
+
+    def download(tickers, **kwargs):
+        calls.append(list(tickers))
+        return fixture_download(tickers, **kwargs)
+
+    monkeypatch.setattr(yahoo.yf, "download", download)
+    quotes = YahooProvider().quotes(["AAPL", "MSFT", "^GSPC"])
+    assert calls == [["AAPL", "MSFT", "^GSPC"]]
+    assert sorted(quotes) == ["AAPL", "MSFT", "^GSPC"]
+    assert quotes["AAPL"].source == "Yahoo Finance"
+
+
+def test_one_bad_symbol_keeps_the_rest_of_the_batch(monkeypatch):
+    def download(tickers, **kwargs):
+        data = fixture_download(tickers, **kwargs)
+        data[("GONE", "Close")] = float("nan")  # delisted: all-NaN columns
+        return data.drop(columns=[("MSFT", "Volume")])  # malformed: missing a column
+
+    monkeypatch.setattr(yahoo.yf, "download", download)
+    quotes = YahooProvider().quotes(["AAPL", "MSFT", "GONE"])
+    assert list(quotes) == ["AAPL"]
+    assert isinstance(quotes["AAPL"].price, float) and not pd.isna(quotes["AAPL"].price)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from app import yield_curve
+from app.yield_curve import (TAU_GRID, CubicSplineCurve, CurveCache, NelsonSiegel, bond_metrics, latest_curve,
+                             par_yields)
+
+
+def flat(rate):
+    return lambda t: np.full_like(np.asarray(t, dtype=float), rate)
+
+
+def test_bond_with_coupon_equal_to_a_flat_curve_prices_at_par():
+    bonds = bond_metrics(flat(5.0), [1, 2.5, 10, 30], 5.0)
+    np.testing.assert_allclose(bonds["price"], 100.0, rtol=1e-12)
+    np.testing.assert_allclose(par_yields(flat(5.0), [2, 10]), 5.0, rtol=1e-12)
+
+
+def test_zero_coupon_duration_and_convexity_match_closed_form():
+    t, y = 10.0, 0.05
+    (row,) = bond_metrics(flat(y * 100), t, 0.0).itertuples()
+    growth = 1 + y / 2
+    assert row.price == pytest.approx(100 * growth ** (-2 * t), rel=1e-12)
+    assert row.macaulay_duration == pytest.approx(t, rel=1e-12)
+    assert row.modified_duration == pytest.approx(t / growth, rel=1e-6)
+    assert row.convexity == pytest.approx(t * (2 * t + 1) / (2 * growth ** 2), rel=1e-4)
+
+
+def test_nelson_siegel_recovers_a_curve_it_could_have_drawn():
+    tenors = np.array([0.25, 1, 2, 5, 10, 20, 30])
+    truth = NelsonSiegel([4.5, 1.0, -0.5], TAU_GRID[8])
+    fitted = NelsonSiegel.fit(tenors, truth(tenors))
+    assert fitted.tau == pytest.approx(truth.tau)
+    np.testing.assert_allclose(fitted.betas, truth.betas, atol=1e-8)
+
+
+def test_spline_passes_through_its_nodes_and_is_flat_outside():
+    curve = CubicSplineCurve([0.5, 5, 20], [5.0, 4.0, 4.5])
+    np.testing.assert_allclose(curve([0.5, 5, 20]), [5.0, 4.0, 4.5])
+    np.testing.assert_allclose(curve([0.1, 30]), [5.0, 4.5])
+
+
+def test_curves_are_cached_by_record_date(monkeypatch):
+    cache = CurveCache()
+    monkeypatch.setattr(yield_curve, "curve_cache", cache)
+    fits = []
+    real_fit = yield_curve.fit_curve
+    monkeypatch.setattr(yield_curve, "fit_curve", lambda nodes, method="nelson_siegel": fits.append(nodes) or real_fit(nodes, method))
+    rows = [{"record_date": "2024-01-31", "security_desc": s, "avg_interest_rate_amt": r}
+            for s, r in (("Treasury Bills", "5.3"), ("Treasury Notes", "4.2"), ("Treasury Bonds", "4.4"))]
+    date, curve = latest_curve(rows)
+    assert date == "2024-01-31"
+    assert latest_curve(rows)[1] is curve
+    assert len(fits) == 1
+    later = [dict(r, record_date="2024-02-29") for r in rows]
+    assert latest_curve(rows + later)[1] is not curve
+    assert len(fits) == 2
+    assert cache.get("2024-01-31", {}, "nelson_siegel") is curve